@@ -1,6 +1,8 @@
 """FastAPI application main entry point"""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+import logging
 import sys
 import os
 
@@ -8,7 +10,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared.config import settings
-from shared.database import init_db
+from shared.database import engine, init_db
+from shared.async_database import async_engine
+from shared.metrics import instrument_engine, observe_request, render_metrics, track_request
+from scrapers.parse_pool import close_parse_pool
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,10 +33,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class MetricsMiddleware:
+    """
+    Times requests and counts their SQL statements.
+
+    Each request is recorded under its route template once the last body
+    chunk is sent (background tasks that run afterwards are not included).
+    A Server-Timing header reports DB and total time up to the response
+    start, and requests over METRICS_QUERY_BUDGET statements log a warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        finished = False
+
+        def finish(stats):
+            nonlocal finished
+            finished = True
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            budget = settings.metrics_query_budget
+            over_budget = bool(budget) and stats.queries > budget
+            if over_budget:
+                logger.warning("%s %s ran %d SQL statements (budget %d)",
+                               scope["method"], template, stats.queries, budget)
+            observe_request(scope["method"], template, status, stats, over_budget)
+
+        with track_request() as stats:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    timing = (f'db;dur={stats.db_s * 1000:.2f};desc="{stats.queries} queries", '
+                              f"app;dur={stats.elapsed_s * 1000:.2f}")
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.encode())
+                    ]
+                elif message["type"] == "http.response.body" and not message.get("more_body"):
+                    if not finished:
+                        finish(stats)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if not finished:
+                    finish(stats)
+
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on application startup"""
+    """Check the schema version (migrating in development) on application startup"""
     init_db()
     print("✅ Application started successfully")
 
@@ -37,6 +105,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown"""
+    await async_engine.dispose()
+    close_parse_pool()
     print("👋 Application shutting down")
 
 
@@ -51,6 +121,13 @@ async def health_check():
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request latency, SQL statement counts and DB time per route"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -64,11 +141,21 @@ async def root():
 
 
 # Import and include routers
-from api.routes import search, results, mock
+from api.routes import search, results, hotels, locations, analytics
 
 app.include_router(search.router, prefix="/api", tags=["search"])
 app.include_router(results.router, prefix="/api", tags=["results"])
-app.include_router(mock.router, prefix="/api", tags=["mock"])
+app.include_router(hotels.router, prefix="/api", tags=["hotels"])
+app.include_router(locations.router, prefix="/api", tags=["locations"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+
+# Mock data endpoints are for frontend development only
+mock_routes = settings.mock_routes
+if mock_routes is None:
+    mock_routes = settings.environment != "production"
+if mock_routes:
+    from api.routes import mock
+    app.include_router(mock.router, prefix="/api", tags=["mock"])
 
 
 if __name__ == "__main__":
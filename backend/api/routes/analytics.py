@@ -0,0 +1,36 @@
+"""Analytics API endpoints"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import asyncio
+
+from shared.database import SessionLocal
+
+router = APIRouter()
+
+
+def _discount_report(by: str, chain: Optional[str]) -> dict:
+    # NumPy is only imported once analytics are first requested
+    from shared.analytics import get_discount_report
+
+    with SessionLocal() as db:
+        return get_discount_report(db, by=by, chain=chain)
+
+
+@router.get("/analytics/discounts")
+async def get_discount_analytics(
+    by: str = Query(default="chain", pattern="^(chain|chain_city)$",
+                    description="Group by chain, or by chain and city"),
+    chain: Optional[str] = Query(default=None, description="Only hotels of this chain")
+):
+    """
+    Discount program effectiveness.
+
+    For each (chain, [city,] discount type) returns how often the discount
+    returned a rate, how often it beat the same search's "none" rate for the
+    same hotel, and savings percentiles. Reports are cached for a few minutes.
+    """
+    # The report is CPU-bound NumPy work on a sync session, so keep it off the event loop
+    try:
+        return await asyncio.to_thread(_discount_report, by, chain)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
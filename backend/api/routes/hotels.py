@@ -0,0 +1,147 @@
+"""Hotel API endpoints"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+from shared.async_database import get_async_db, AsyncDatabaseClient
+from shared.catalog import catalog_stats
+from shared.config import settings
+from shared.price_history import price_history_stats
+
+router = APIRouter()
+
+
+class NearbyHotel(BaseModel):
+    """Hotel with its distance from the query point"""
+    id: str
+    name: str
+    chain: str
+    city: Optional[str] = None
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+class NearbyHotelsResponse(BaseModel):
+    """Response model for hotels near a point"""
+    latitude: float
+    longitude: float
+    radius_km: Optional[float] = None
+    hotels: List[NearbyHotel]
+
+
+class PricePoint(BaseModel):
+    """Single scraped price"""
+    scraped_at: datetime
+    check_in: str
+    total_price: float
+
+
+class PriceBucket(BaseModel):
+    """Prices scraped within one hour or day"""
+    bucket_start: datetime
+    min: float
+    avg: float
+    max: float
+    count: int
+
+
+class PriceHistoryResponse(BaseModel):
+    """Response model for a hotel's price history"""
+    hotel_id: str
+    hotel_name: str
+    bucket: str
+    history: Dict[str, List[PricePoint]] = {}
+    buckets: Dict[str, List[PriceBucket]] = {}
+
+
+@router.get("/hotels/catalog")
+async def get_catalog_stats():
+    """
+    Hotel and discount code catalog counters.
+
+    Returns hit rate, load counts and staleness for each database's catalog.
+    """
+    return {"enabled": settings.catalog_enabled, "catalogs": catalog_stats()}
+
+
+@router.get("/hotels/near", response_model=NearbyHotelsResponse)
+async def get_hotels_near(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the point"),
+    radius_km: Optional[float] = Query(default=None, gt=0, le=settings.search_max_radius_km,
+                                       description="Hotels within this distance; omit for the nearest `limit`"),
+    limit: int = Query(default=20, ge=1, le=500),
+    chain: Optional[str] = Query(default=None, description="Only this chain"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Find hotels near a point, nearest first.
+
+    With `radius_km`, returns up to `limit` hotels within that distance;
+    without it, the `limit` nearest hotels. Hotels without coordinates are
+    never returned.
+    """
+    db_client = AsyncDatabaseClient(db)
+    if radius_km is None:
+        matches = await db_client.get_nearest_hotels(lat, lon, limit, chain=chain)
+    else:
+        matches = await db_client.get_hotels_near(lat, lon, radius_km, chain=chain, limit=limit)
+
+    return NearbyHotelsResponse(latitude=lat, longitude=lon, radius_km=radius_km, hotels=[
+        NearbyHotel(id=hotel.id, name=hotel.name, chain=hotel.chain, city=hotel.city, latitude=hotel.latitude,
+                    longitude=hotel.longitude, distance_km=round(distance_km, 3))
+        for distance_km, hotel in matches
+    ])
+
+
+@router.get("/hotels/history/stats")
+async def get_price_history_stats():
+    """
+    Price history store counters.
+
+    Returns tracked hotels, points and memory use for each database's store.
+    """
+    return {"enabled": settings.price_history_enabled, "stores": price_history_stats()}
+
+
+@router.get("/hotels/{hotel_id}/history", response_model=PriceHistoryResponse)
+async def get_price_history(
+    hotel_id: str,
+    discount_type: Optional[str] = Query(default=None, description="Only this discount type"),
+    start: Optional[datetime] = Query(default=None, description="Scraped at or after (UTC)"),
+    end: Optional[datetime] = Query(default=None, description="Scraped before (UTC)"),
+    check_in: Optional[str] = Query(default=None, description="Only prices for this stay date (YYYY-MM-DD)"),
+    bucket: str = Query(default="day", pattern="^(raw|hour|day)$",
+                        description="Return every point, or min/avg/max per hour or day"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the price history of a hotel.
+
+    Returns the scraped total prices per discount type in scrape order
+    (`bucket=raw`, under `history`) or downsampled to min/avg/max per hour
+    or day (under `buckets`).
+    """
+    db_client = AsyncDatabaseClient(db)
+    hotel = await db_client.get_hotel(hotel_id)
+    if not hotel:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+
+    try:
+        history = await db_client.get_price_history(
+            hotel_id,
+            discount_type=discount_type,
+            start=start,
+            end=end,
+            check_in=check_in,
+            bucket=None if bucket == "raw" else bucket
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if bucket == "raw":
+        return PriceHistoryResponse(hotel_id=hotel.id, hotel_name=hotel.name, bucket=bucket, history=history)
+    return PriceHistoryResponse(hotel_id=hotel.id, hotel_name=hotel.name, bucket=bucket, buckets=history)
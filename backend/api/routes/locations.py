@@ -0,0 +1,51 @@
+"""Location API endpoints"""
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.async_database import get_async_db, AsyncDatabaseClient
+
+router = APIRouter()
+
+
+class LocationSuggestion(BaseModel):
+    """City or hotel matching what has been typed"""
+    kind: str  # "city" or "hotel"
+    label: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    hotel_count: int
+    hotel_id: Optional[str] = None  # For a hotel that is the only one of its name in its city
+    score: float
+
+
+class LocationSuggestResponse(BaseModel):
+    """Response model for location autocomplete"""
+    query: str
+    suggestions: List[LocationSuggestion]
+
+
+@router.get("/locations/suggest", response_model=LocationSuggestResponse)
+async def suggest_locations(
+    q: str = Query(..., min_length=1, max_length=200, description="What has been typed so far"),
+    limit: int = Query(default=10, ge=1, le=50),
+    kind: Optional[str] = Query(default=None, pattern="^(city|hotel)$", description="Only cities or only hotels"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Autocomplete a search location, best match first.
+
+    Matches cities ("New York, NY") and hotels by name or address, tolerating
+    typos; the last word of `q` may be incomplete. Any suggestion's `label`
+    can be used as a search's `location`.
+    """
+    db_client = AsyncDatabaseClient(db)
+    matches = await db_client.suggest_locations(q, limit, kind)
+
+    return LocationSuggestResponse(query=q, suggestions=[
+        LocationSuggestion(kind=match.kind, label=match.label, city=match.city, state=match.state,
+                           hotel_count=len(match.hotels), score=match.score,
+                           hotel_id=match.hotels[0].id if match.kind == "hotel" and len(match.hotels) == 1 else None)
+        for match in matches
+    ])
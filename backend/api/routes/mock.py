@@ -1,27 +1,23 @@
 """Mock data endpoints for frontend testing"""
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from shared.database import get_db, DatabaseClient
+from shared.async_database import get_async_db, AsyncDatabaseClient
 
 router = APIRouter()
 
 
 @router.post("/mock/search")
-async def create_mock_search(db: Session = Depends(get_db)):
+async def create_mock_search(db: AsyncSession = Depends(get_async_db)):
     """
     Create a mock search with sample data for testing.
     This generates fake results immediately.
     """
-    db_client = DatabaseClient(db)
+    db_client = AsyncDatabaseClient(db)
 
     # Create search
-    search = db_client.create_search(
+    search = await db_client.create_search(
         user_id="demo",
         location="New York, NY",
         check_in=(datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
@@ -31,27 +27,26 @@ async def create_mock_search(db: Session = Depends(get_db)):
     )
 
     # Get sample hotels
-    from shared.models import Hotel
-    hotels = db.query(Hotel).all()
+    hotels = await db_client.get_hotels()
 
     if not hotels:
         # Create sample hotels if they don't exist
         hotels = [
-            db_client.create_hotel(
+            await db_client.create_hotel(
                 name="Marriott Times Square",
                 chain="Marriott",
                 city="New York",
                 state="NY",
                 address="1535 Broadway, New York, NY 10036"
             ),
-            db_client.create_hotel(
+            await db_client.create_hotel(
                 name="Hilton Midtown",
                 chain="Hilton",
                 city="New York",
                 state="NY",
                 address="1335 Avenue of the Americas, New York, NY 10019"
             ),
-            db_client.create_hotel(
+            await db_client.create_hotel(
                 name="Holiday Inn Times Square",
                 chain="IHG",
                 city="New York",
@@ -63,6 +58,7 @@ async def create_mock_search(db: Session = Depends(get_db)):
     # Generate mock results for each hotel and discount type
     discount_types = ["none", "aarp", "aaa", "senior"]
 
+    results = []
     for hotel in hotels:
         base_price = 250.0 if "Marriott" in hotel.name else 220.0 if "Hilton" in hotel.name else 180.0
 
@@ -82,12 +78,10 @@ async def create_mock_search(db: Session = Depends(get_db)):
             fees = 25.0  # Flat fee
             total = discounted_price + taxes + fees
 
-            # Create result
-            db_client.create_result(
-                search_id=search.id,
-                hotel_id=hotel.id,
-                discount_type=discount_type,
-                prices={
+            results.append({
+                "hotel_id": hotel.id,
+                "discount_type": discount_type,
+                "prices": {
                     "original": original_price,
                     "discounted": discounted_price,
                     "taxes": taxes,
@@ -95,11 +89,14 @@ async def create_mock_search(db: Session = Depends(get_db)):
                     "total": total,
                     "currency": "USD"
                 },
-                available=True
-            )
+                "available": True
+            })
+
+    # Write all results in one batch
+    await db_client.create_results_bulk(search.id, results)
 
     # Update search status to completed
-    db_client.update_search_status(search.id, "completed")
+    await db_client.update_search_status(search.id, "completed")
 
     return {
         "search_id": search.id,
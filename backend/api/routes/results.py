@@ -1,15 +1,20 @@
 """Results API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from sqlalchemy.orm import Session
-import sys
-import os
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from operator import itemgetter
+import json
+import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import orjson
 
-from shared.database import get_db, DatabaseClient
-from shared.models import Search, Result, Hotel
+from shared.config import settings
+from shared.async_database import get_async_db, AsyncSessionLocal, AsyncDatabaseClient
+from shared.change_notifier import get_change_notifier
+from shared.database import RESULT_ROW_SORTS
+from shared.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
@@ -40,63 +45,170 @@ class ResultsResponse(BaseModel):
     guests: int
     result_count: int
     results: List[ResultItem]
+    next_cursor: Optional[str] = None
+    version: int  # Pass as `since` to get only rows added after this response
+
+
+def result_item(row) -> ResultItem:
+    """Build a ResultItem from a joined result row"""
+    return ResultItem(
+        result_id=row.result_id,
+        hotel_name=row.hotel_name or "Unknown",
+        hotel_chain=row.hotel_chain or "Unknown",
+        discount_type=row.discount_type,
+        original_price=row.original_price,
+        discounted_price=row.discounted_price,
+        taxes=row.taxes or 0.0,
+        fees=row.fees or 0.0,
+        total_price=row.total_price,
+        currency=row.currency,
+        available=row.available,
+        scraped_at=row.scraped_at.isoformat()
+    )
+
+
+# Fallbacks for nullable columns, matching result_item
+RESULT_DEFAULTS = {"hotel_name": "Unknown", "hotel_chain": "Unknown", "taxes": 0.0, "fees": 0.0}
+RESULT_FIELDS = list(ResultItem.model_fields)
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def encode_results(envelope: dict, rows: Sequence, fields: List[str]) -> bytes:
+    """
+    Encode a results response straight from joined row tuples.
+
+    Produces the same JSON as ResultsResponse (or, with a subset of fields,
+    partial items) without building a model per row: each row becomes a
+    dict of the requested fields and orjson encodes the whole response,
+    datetimes included, in one call.
+    """
+    results = []
+    if rows:
+        positions = [rows[0]._fields.index(name) for name in fields]
+        pick = itemgetter(*positions) if len(positions) > 1 else (lambda row: (row[positions[0]],))
+        defaults = [(name, value) for name, value in RESULT_DEFAULTS.items() if name in fields]
+        for row in rows:
+            item = dict(zip(fields, pick(row)))
+            for name, value in defaults:
+                if item[name] is None:
+                    item[name] = value
+            results.append(item)
+    return orjson.dumps({**envelope, "results": results})
+
+
+async def _wait_for_change(db: AsyncSession, search_id: str, since: int, wait_s: float):
+    """Hold until the search's version passes ``since``, it finishes, or ``wait_s`` elapses"""
+    db_client = AsyncDatabaseClient(db)
+    notifier = get_change_notifier()
+    deadline = time.monotonic() + wait_s
+    while True:
+        # Ends the read transaction (and returns the connection to the pool
+        # while waiting), so the next read sees changes committed meanwhile
+        await db.rollback()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await notifier.wait(search_id, since, min(remaining, settings.results_longpoll_recheck_s))
+        state = await db_client.get_search_state(search_id)
+        if state is None or state.version > since or state.status in TERMINAL_STATUSES:
+            return
 
 
 @router.get("/results/{search_id}", response_model=ResultsResponse)
 async def get_results(
     search_id: str,
-    db: Session = Depends(get_db)
+    sort: str = Query(default="scraped_at", pattern="^(scraped_at|price)$",
+                      description="Order by scrape time or by total price (unpriced last)"),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Page size (default: all results)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    discount_type: Optional[List[str]] = Query(default=None, description="Only these discount types"),
+    chain: Optional[str] = Query(default=None, description="Only hotels of this chain"),
+    available: Optional[bool] = Query(default=None, description="Only available (or unavailable) rates"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated result fields to return"),
+    since: Optional[int] = Query(default=None, ge=0, description="Only results added after this version"),
+    wait: float = Query(default=0, ge=0, description="With since: seconds to hold the request until a change"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get results for a specific search.
 
-    Returns all scraped results for the given search_id.
+    Returns the scraped results for the given search_id, optionally filtered
+    and paginated. With `limit`, pass the returned `next_cursor` as `cursor`
+    to get the next page. With `fields`, only those fields are read from the
+    database and returned for each result.
+
+    Every response carries the search's `version`, which goes up whenever
+    results are added or the status changes. With `since`, only results
+    added after that version are returned; with `wait` as well, a request
+    for a search with no changes since then is held (up to
+    RESULTS_LONGPOLL_MAX_WAIT_S) until results arrive or the status changes,
+    so clients without SSE can long-poll by passing back each `version`.
+
+    The response is encoded directly from the query rows with orjson;
+    `response_model` documents its schema but isn't used to re-validate it.
     """
+    selected = None
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(selected) - set(ResultItem.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown result fields: {', '.join(sorted(unknown))}")
+
+    try:
+        after = decode_cursor(cursor, sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    discount_types = [t.strip() for value in discount_type or [] for t in value.split(",") if t.strip()]
+
     try:
-        db_client = DatabaseClient(db)
+        db_client = AsyncDatabaseClient(db)
 
         # Get search record
-        search = db_client.get_search(search_id)
+        search = await db_client.get_search(search_id)
         if not search:
             raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
 
-        # Get results
-        results = db_client.get_results_by_search(search_id)
-
-        # Format results with hotel information
-        formatted_results = []
-        for result in results:
-            # Get hotel info
-            hotel = db.query(Hotel).filter(Hotel.id == result.hotel_id).first()
-
-            formatted_results.append(
-                ResultItem(
-                    result_id=result.id,
-                    hotel_name=hotel.name if hotel else "Unknown",
-                    hotel_chain=hotel.chain if hotel else "Unknown",
-                    discount_type=result.discount_type,
-                    original_price=result.original_price,
-                    discounted_price=result.discounted_price,
-                    taxes=result.taxes or 0.0,
-                    fees=result.fees or 0.0,
-                    total_price=result.total_price,
-                    currency=result.currency,
-                    available=result.available,
-                    scraped_at=result.scraped_at.isoformat()
-                )
-            )
-
-        return ResultsResponse(
-            search_id=search.id,
-            status=search.status,
-            location=search.location,
-            check_in=search.check_in_date,
-            check_out=search.check_out_date,
-            guests=search.guests,
-            result_count=len(formatted_results),
-            results=formatted_results
+        wait_s = min(wait, settings.results_longpoll_max_wait_s)
+        if since is not None and wait_s and search.version <= since and search.status not in TERMINAL_STATUSES:
+            await _wait_for_change(db, search_id, since, wait_s)
+            search = await db_client.get_search(search_id)
+            if not search:
+                raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
+        version = search.version
+
+        # Get results joined with hotel information
+        rows = await db_client.get_result_rows(
+            search_id,
+            fields=selected or RESULT_FIELDS,
+            sort=sort,
+            after=after,
+            limit=limit,
+            discount_types=discount_types,
+            chain=chain,
+            available=available,
+            # Rows committed after the version was read come with the next one
+            versions=(since if since is not None else -1, version)
         )
 
+        next_cursor = None
+        if limit and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, getattr(last, RESULT_ROW_SORTS[sort]), last.result_id)
+
+        envelope = {
+            "search_id": search.id,
+            "status": search.status,
+            "location": search.location,
+            "check_in": search.check_in_date,
+            "check_out": search.check_out_date,
+            "guests": search.guests,
+            "result_count": len(rows),
+            "next_cursor": next_cursor,
+            "version": version
+        }
+        return Response(encode_results(envelope, rows, selected or RESULT_FIELDS), media_type="application/json")
+
     except HTTPException:
         raise
     except Exception as e:
@@ -106,68 +218,163 @@ async def get_results(
 @router.get("/results/{search_id}/summary")
 async def get_results_summary(
     search_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a summary of results grouped by hotel and discount type.
 
-    Returns statistics and best deals.
+    Returns statistics, the best deal overall and per hotel, and savings of
+    each discount type against the regular rate. The summary is aggregated in
+    the database and stored once the search completes, so repeat calls for a
+    completed search are a single lookup.
     """
     try:
-        db_client = DatabaseClient(db)
-
-        # Get search record
-        search = db_client.get_search(search_id)
-        if not search:
-            raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
+        db_client = AsyncDatabaseClient(db)
 
-        # Get results
-        results = db_client.get_results_by_search(search_id)
+        # Completed searches have a stored summary
+        summary = await db_client.get_search_summary(search_id)
+        if summary is not None:
+            status = "completed"
+        else:
+            search = await db_client.get_search(search_id)
+            if not search:
+                raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
+            status = search.status
+            summary = await db_client.compute_search_summary(search_id)
 
-        if not results:
+        if not summary["total_results"]:
             return {
                 "search_id": search_id,
-                "status": search.status,
+                "status": status,
                 "message": "No results available yet"
             }
 
-        # Group by hotel
-        by_hotel = {}
-        best_deal = None
-        best_price = float('inf')
-
-        for result in results:
-            hotel = db.query(Hotel).filter(Hotel.id == result.hotel_id).first()
-            hotel_key = hotel.name if hotel else result.hotel_id
-
-            if hotel_key not in by_hotel:
-                by_hotel[hotel_key] = []
-
-            by_hotel[hotel_key].append({
-                "discount_type": result.discount_type,
-                "total_price": result.total_price,
-                "available": result.available
-            })
-
-            # Track best deal
-            if result.available and result.total_price and result.total_price < best_price:
-                best_price = result.total_price
-                best_deal = {
-                    "hotel": hotel_key,
-                    "discount_type": result.discount_type,
-                    "price": result.total_price
-                }
-
-        return {
-            "search_id": search_id,
-            "status": search.status,
-            "total_results": len(results),
-            "hotels_compared": len(by_hotel),
-            "best_deal": best_deal,
-            "by_hotel": by_hotel
-        }
+        return {"search_id": search_id, "status": status, **summary}
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
+
+
+@router.get("/results/{search_id}/raw/{result_id}")
+async def get_result_raw_data(
+    search_id: str,
+    result_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the raw scraped data of one result.
+
+    Raw data is stored compressed apart from the results and only read
+    here; `raw_data` is null when the scraper saved none.
+    """
+    try:
+        raw = await AsyncDatabaseClient(db).get_result_raw_data(search_id, result_id)
+        if raw is None:
+            raise HTTPException(status_code=404, detail=f"Result {result_id} not found in search {search_id}")
+        return Response(
+            orjson.dumps({"search_id": search_id, "result_id": result_id, **raw}),
+            media_type="application/json"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve raw data: {str(e)}")
+
+
+def encode_result_cursor(version: int, result_id: str) -> str:
+    """Encode a (version, id) position as an SSE event ID"""
+    return f"{version}:{result_id}"
+
+
+def decode_result_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """Decode an SSE event ID back into (version, id); None if absent or invalid"""
+    if not cursor or ":" not in cursor:
+        return None
+    version, result_id = cursor.split(":", 1)
+    try:
+        return int(version), result_id
+    except ValueError:
+        return None
+
+
+def _sse_event(event: str, data: dict, event_id: str = None) -> str:
+    """Format one Server-Sent Event"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _poll_results(search_id: str, cursor: Optional[tuple]):
+    """Read the search state and any rows after the cursor in a short-lived session"""
+    async with AsyncSessionLocal() as db:
+        db_client = AsyncDatabaseClient(db)
+        state = await db_client.get_search_state(search_id)
+        if state is None:
+            return None, []
+        # Rows committed after the version was read come with the next poll
+        rows = await db_client.get_result_rows_after(search_id, cursor, until=state.version)
+        return state, rows
+
+
+async def _stream_results(search_id: str, cursor: Optional[tuple]):
+    """Yield result events until the search finishes, then a final status event"""
+    result_count = 0
+    poll_s = settings.results_stream_poll_ms / 1000
+    deadline = time.monotonic() + settings.results_stream_timeout_s
+    notifier = get_change_notifier()
+    status = None
+
+    while True:
+        # Read status before rows so no row committed before completion is missed
+        state, rows = await _poll_results(search_id, cursor)
+        status = state.status if state is not None else None
+        for row in rows:
+            cursor = (row.version, row.result_id)
+            result_count += 1
+            yield _sse_event("result", result_item(row).model_dump(), encode_result_cursor(*cursor))
+
+        if status is None or status in TERMINAL_STATUSES or time.monotonic() >= deadline:
+            break
+        if not rows:
+            yield ": keep-alive\n\n"
+        # Woken by the next commit to the search, like a long poll; the poll
+        # interval still bounds the wait for commits made in other processes
+        await notifier.wait(search_id, state.version, poll_s)
+
+    yield _sse_event("status", {
+        "search_id": search_id,
+        "status": status or "not_found",
+        "result_count": result_count
+    })
+
+
+@router.get("/results/{search_id}/stream")
+async def stream_results(
+    search_id: str,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream results for a search as Server-Sent Events.
+
+    Emits a `result` event per row as soon as it is committed, then a final
+    `status` event once the search is completed or failed. Each result event
+    carries an ID (the search version that added the row, and the row's
+    ID); reconnecting with `Last-Event-ID` replays only the rows after it.
+    The `status` event's result_count covers this connection only.
+    """
+    search = await AsyncDatabaseClient(db).get_search(search_id)
+    if not search:
+        raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
+
+    return StreamingResponse(
+        _stream_results(search_id, decode_result_cursor(last_event_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,14 +1,18 @@
 """Search API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Optional
-from sqlalchemy.orm import Session
-import sys
-import os
+import asyncio
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.database import get_db, DatabaseClient
+from shared.async_database import get_async_db, AsyncDatabaseClient
+from shared.config import settings
+from shared.models import generate_uuid
+from shared.pagination import encode_cursor, decode_cursor
+from shared.search_cache import get_search_cache, search_cache_key
+from scrapers.orchestrator import get_fetchers, run_search
+from scrapers.rate_control import get_rate_control
 
 router = APIRouter()
 
@@ -23,6 +27,26 @@ class SearchRequest(BaseModel):
         default=["aarp", "aaa", "senior"],
         description="Discount types to test"
     )
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90,
+                                      description="Search hotels around this point instead of the location's city")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(default=None, gt=0, le=settings.search_max_radius_km,
+                                       description="Radius around the point (default: SEARCH_RADIUS_KM)")
+
+    @model_validator(mode="after")
+    def _check_point(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        if self.radius_km is not None and self.latitude is None:
+            raise ValueError("radius_km needs latitude and longitude")
+        return self
+
+    def near(self) -> Optional[dict]:
+        """The radius filter stored with the search, if coordinates were given"""
+        if self.latitude is None:
+            return None
+        return {"latitude": self.latitude, "longitude": self.longitude,
+                "radius_km": self.radius_km or settings.search_radius_km}
 
 
 class SearchResponse(BaseModel):
@@ -35,30 +59,62 @@ class SearchResponse(BaseModel):
 @router.post("/search", response_model=SearchResponse)
 async def create_search(
     request: SearchRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Initiate a new hotel discount search.
 
     This endpoint creates a search record and will trigger scraping tasks.
+    Identical searches made within the cache TTL reuse the completed search,
+    or attach to it while it is still running.
     Use the returned search_id to poll for results.
     """
     try:
         # Create database client
-        db_client = DatabaseClient(db)
-
-        # Create search record
-        search = db_client.create_search(
-            user_id="anonymous",  # TODO: Get from auth when implemented
-            location=request.location,
-            check_in=request.check_in,
-            check_out=request.check_out,
-            guests=request.guests,
-            filters={"discount_types": request.discount_types}
+        db_client = AsyncDatabaseClient(db)
+
+        # Reuse an identical recent or in-flight search if there is one
+        search_id = generate_uuid()
+        cache = get_search_cache()
+        near = request.near()
+        cache_key = search_cache_key(
+            request.location, request.check_in, request.check_out,
+            request.guests, request.discount_types, near
         )
+        # The cache may be Redis; its calls run in a worker thread, off the event loop
+        if cache:
+            existing = await db_client.run_in_thread(lambda client: cache.claim(client, cache_key, search_id))
+            if existing:
+                return SearchResponse(
+                    search_id=existing.id,
+                    status=existing.status,
+                    message=f"Reusing search for {request.location}. Use /api/results/{existing.id} to check progress."
+                )
 
-        # TODO: Trigger scraping tasks via Celery
-        # For now, we'll just create the search record
+        # Create search record
+        try:
+            search = await db_client.create_search(
+                user_id="anonymous",  # TODO: Get from auth when implemented
+                location=request.location,
+                check_in=request.check_in,
+                check_out=request.check_out,
+                guests=request.guests,
+                filters={"discount_types": request.discount_types, **({"near": near} if near else {})},
+                search_id=search_id
+            )
+        except Exception:
+            if cache:
+                await asyncio.to_thread(cache.release, cache_key, search_id)
+            raise
+        if cache:
+            await asyncio.to_thread(cache.confirm, cache_key, search_id)
+
+        # Scrape in the background once the response is sent. With the job
+        # queue enabled the search stays pending for a worker to pick up, as
+        # it does when there are no registered fetchers.
+        if not settings.scraper_queue_enabled and get_fetchers():
+            background_tasks.add_task(run_search, search.id)
 
         return SearchResponse(
             search_id=search.id,
@@ -70,23 +126,59 @@ async def create_search(
         raise HTTPException(status_code=500, detail=f"Failed to create search: {str(e)}")
 
 
+@router.get("/search/cache")
+async def get_search_cache_stats():
+    """
+    Search cache counters.
+
+    Returns hits, misses and coalesced (attached to an in-flight search) counts.
+    """
+    cache = get_search_cache()
+    if not cache:
+        return {"backend": None}
+    return cache.stats()
+
+
+@router.get("/search/rate-control")
+async def get_rate_control_stats():
+    """
+    Scraping rate control per chain, for the scrapes this process runs.
+
+    Returns achieved requests/sec over the last 10 seconds, response counts
+    (fast, slow, throttled, timeouts, errors) and the current rate and
+    concurrency limits. Scrape workers log the same at exit.
+    """
+    control = get_rate_control()
+    return {"enabled": control.enabled, "backend": type(control.store).__name__, "chains": control.stats()}
+
+
 @router.get("/searches")
 async def list_searches(
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    limit: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List recent searches.
+    List recent searches, newest first.
 
-    Returns the most recent searches (for debugging/testing).
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
     """
     try:
-        from shared.models import Search
+        before = decode_cursor(cursor, "created") if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        searches = await AsyncDatabaseClient(db).list_searches(limit, before)
 
-        searches = db.query(Search).order_by(Search.created_at.desc()).limit(limit).all()
+        next_cursor = None
+        if len(searches) == limit:
+            last = searches[-1]
+            next_cursor = encode_cursor("created", last.created_at, last.id)
 
         return {
             "count": len(searches),
+            "next_cursor": next_cursor,
             "searches": [
                 {
                     "search_id": s.id,
@@ -0,0 +1,141 @@
+"""Concurrency benchmark: blocking vs async database access in API routes.
+
+Starts the API under uvicorn in a subprocess and has many concurrent clients
+call GET /api/results/{search_id} two ways: the real route (AsyncSession), and
+a copy that uses the blocking Session the routes used before. Clients run in
+this process over real sockets, so time spent queued behind a blocked event
+loop is part of the measured latency.
+
+The blocking copy opens its session inside the handler. With the old get_db
+dependency, sessions are closed in the threadpool after the response. Once
+more requests are in flight than the pool holds, the next query blocks the
+event loop while it waits for a connection, the close that would free one
+cannot run, and every worker stalls for pool_timeout.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./data/bench.db python -m benchmarks.concurrency --clients 200
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from api.main import app
+from api.routes.results import ResultsResponse, result_item
+from shared.database import init_db, get_db_context, SessionLocal, DatabaseClient
+
+
+@app.get("/bench/blocking/results/{search_id}", response_model=ResultsResponse, include_in_schema=False)
+async def get_results_blocking(search_id: str):
+    """The results route as it was before async DB access: sync calls inside async def"""
+    with SessionLocal() as db:
+        db_client = DatabaseClient(db)
+        search = db_client.get_search(search_id)
+        rows = db_client.get_result_rows_by_search(search_id)
+    return ResultsResponse(
+        search_id=search.id,
+        status=search.status,
+        location=search.location,
+        check_in=search.check_in_date,
+        check_out=search.check_out_date,
+        guests=search.guests,
+        result_count=len(rows),
+        results=[result_item(row) for row in rows],
+        version=search.version
+    )
+
+
+def seed(results: int) -> str:
+    """Create one search with the given number of results"""
+    with get_db_context() as db:
+        db_client = DatabaseClient(db)
+        hotels = [db_client.create_hotel(name=f"Bench Hotel {i}", chain="Marriott", city="Bench")
+                  for i in range(max(1, results // 4))]
+        search = db_client.create_search("bench", "Bench", "2025-01-01", "2025-01-02", 2)
+        db_client.create_results_bulk(search.id, [
+            {"hotel_id": hotels[i // 4].id, "discount_type": ["none", "aarp", "aaa", "senior"][i % 4],
+             "prices": {"original": 200.0, "discounted": 180.0, "total": 207.0}}
+            for i in range(results)
+        ])
+        return search.id
+
+
+def percentile(ordered: list, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run(base_url: str, path: str, clients: int, requests_per_client: int) -> dict:
+    """Fire concurrent requests at a path and collect latency percentiles"""
+    latencies = []
+    errors = 0
+
+    async def client(http):
+        nonlocal errors
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            try:
+                response = await http.get(path)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {"requests": len(latencies), "errors": errors, "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99)}
+
+
+def wait_until_up(base_url: str, timeout_s: float = 20.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per client")
+    parser.add_argument("--results", type=int, default=40, help="Results in the benchmark search")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    init_db()
+    search_id = seed(args.results)
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.concurrency:app",
+         "--port", str(args.port), "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, "ENVIRONMENT": os.environ.get("ENVIRONMENT", "benchmark")}
+    )
+    try:
+        wait_until_up(base_url)
+        for label, path in [("blocking", f"/bench/blocking/results/{search_id}"),
+                            ("async", f"/api/results/{search_id}")]:
+            stats = asyncio.run(run(base_url, path, args.clients, args.requests))
+            print(f"{label:>8}: {stats['requests']} requests ({stats['errors']} errors), "
+                  f"{stats['rps']:.0f} req/s, p50 {stats['p50_ms']:.1f} ms, "
+                  f"p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Deterministic synthetic data for benchmarks.
+
+Fills a database with hotels across realistic chains and cities, their
+discount codes, searches and results. The same tier and seed always produce
+the same rows (IDs included), so benchmark runs are comparable.
+
+Each search covers every hotel in its city for every discount type, like a
+real scrape, so a tier's result count sets the number of searches. Searches
+are spread over the 90 days before 2026-01-01.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --tier 100k --url sqlite:///./data/bench-100k.db
+"""
+import argparse
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+TIERS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+CHAINS = {
+    "Marriott": ["Marriott", "Courtyard", "Residence Inn", "Sheraton"],
+    "Hilton": ["Hilton", "Hampton Inn", "DoubleTree", "Embassy Suites"],
+    "Hyatt": ["Hyatt Regency", "Hyatt Place", "Grand Hyatt"],
+    "IHG": ["Holiday Inn", "Holiday Inn Express", "Crowne Plaza"],
+    "Wyndham": ["Wyndham", "La Quinta", "Days Inn"],
+    "Choice": ["Comfort Inn", "Quality Inn", "Cambria"],
+}
+
+CITIES = [
+    ("New York", "NY", 40.7128, -74.0060), ("Chicago", "IL", 41.8781, -87.6298),
+    ("Los Angeles", "CA", 34.0522, -118.2437), ("Orlando", "FL", 28.5383, -81.3792),
+    ("Las Vegas", "NV", 36.1699, -115.1398), ("Boston", "MA", 42.3601, -71.0589),
+    ("Seattle", "WA", 47.6062, -122.3321), ("Denver", "CO", 39.7392, -104.9903),
+    ("Nashville", "TN", 36.1627, -86.7816), ("San Diego", "CA", 32.7157, -117.1611),
+]
+
+# Discount type -> (mean price factor vs the "none" rate, share of lookups with a rate)
+DISCOUNTS = {
+    "none": (1.0, 0.97),
+    "aarp": (0.90, 0.92),
+    "aaa": (0.92, 0.93),
+    "senior": (0.95, 0.85),
+    "military": (0.88, 0.80),
+    "corporate": (0.93, 0.75),
+}
+
+HOTELS_PER_CHAIN_CITY = 3
+CHUNK_SIZE = 20_000
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate(url: str, results: int, seed: int = 42) -> dict:
+    """
+    Create the schema and fill it with ``results`` results.
+
+    Returns a manifest describing the data set: row counts and the IDs of
+    a representative search, hotel, chain and city to benchmark against.
+    """
+    from shared.models import Base, Hotel, Search, Result, DiscountCode, RawPayload
+    from shared.raw_payloads import encode_payload
+
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    hotels, hotel_rows, code_rows = {}, [], []
+    for city, state, lat, lng in CITIES:
+        for chain, brands in CHAINS.items():
+            for i in range(HOTELS_PER_CHAIN_CITY):
+                hotel_id = _uuid(rng)
+                base_rate = round(rng.uniform(110, 420), 2)
+                hotels.setdefault(city, []).append((hotel_id, base_rate))
+                hotel_rows.append({
+                    "id": hotel_id, "name": f"{brands[i % len(brands)]} {city} {i + 1}", "chain": chain,
+                    "address": f"{rng.randint(1, 9999)} Main St", "city": city, "state": state,
+                    "country": "USA", "latitude": lat + rng.uniform(-0.1, 0.1),
+                    "longitude": lng + rng.uniform(-0.1, 0.1), "star_rating": rng.choice([2.5, 3.0, 3.5, 4.0, 4.5]),
+                    "created_at": now - timedelta(days=365), "updated_at": now - timedelta(days=365),
+                })
+    for chain in CHAINS:
+        for discount_type in DISCOUNTS:
+            if discount_type != "none":
+                code_rows.append({
+                    "id": _uuid(rng), "code": f"{chain[:3].upper()}-{discount_type.upper()}",
+                    "type": discount_type, "hotel_chain": chain, "requirements": None, "active": True,
+                    "created_at": now - timedelta(days=365), "updated_at": now - timedelta(days=365),
+                })
+
+    search_rows, result_rows = [], []
+    written = searches = 0
+    first_search_id = None
+    with Session(engine) as db:
+        db.execute(insert(Hotel), hotel_rows)
+        db.execute(insert(DiscountCode), code_rows)
+        raw_hashes = {}
+        for refundable in (True, False):
+            payload = encode_payload({"room_type": "King", "refundable": refundable})
+            db.execute(insert(RawPayload), [{"hash": payload.hash, "data": payload.data, "size": payload.size}])
+            raw_hashes[refundable] = payload.hash
+
+        while written < results:
+            city = CITIES[searches % len(CITIES)][0]
+            created_at = now - timedelta(seconds=rng.uniform(0, 90 * 86400))
+            check_in = created_at + timedelta(days=rng.randint(7, 90))
+            search_id = _uuid(rng)
+            first_search_id = first_search_id or search_id
+            search_rows.append({
+                "id": search_id, "user_id": "bench", "location": city,
+                "check_in_date": check_in.strftime("%Y-%m-%d"),
+                "check_out_date": (check_in + timedelta(days=rng.randint(1, 5))).strftime("%Y-%m-%d"),
+                "guests": rng.randint(1, 4), "filters": {"discount_types": list(DISCOUNTS)[1:]},
+                "status": "completed", "created_at": created_at,
+                "completed_at": created_at + timedelta(minutes=2),
+            })
+            searches += 1
+
+            for hotel_id, base_rate in hotels[city]:
+                for discount_type, (factor, availability) in DISCOUNTS.items():
+                    if written >= results:
+                        break
+                    available = rng.random() < availability
+                    discounted = round(base_rate * rng.gauss(factor, 0.04), 2) if available else None
+                    taxes = round(discounted * 0.15, 2) if available else 0.0
+                    result_rows.append({
+                        "id": _uuid(rng), "search_id": search_id, "hotel_id": hotel_id,
+                        "discount_type": discount_type, "original_price": base_rate if available else None,
+                        "discounted_price": discounted, "taxes": taxes, "fees": 0.0,
+                        "total_price": round(discounted + taxes, 2) if available else None,
+                        "currency": "USD", "available": available,
+                        "raw_hash": raw_hashes[rng.random() < 0.5],
+                        "scraped_at": created_at + timedelta(seconds=rng.uniform(1, 120)),
+                    })
+                    written += 1
+
+            if len(result_rows) >= CHUNK_SIZE or written >= results:
+                db.execute(insert(Search), search_rows)
+                db.execute(insert(Result), result_rows)
+                db.commit()
+                search_rows, result_rows = [], []
+        db.commit()
+    engine.dispose()
+
+    city = CITIES[0][0]
+    return {
+        "results": results,
+        "seed": seed,
+        "hotels": len(hotel_rows),
+        "searches": searches,
+        "discount_codes": len(code_rows),
+        "search_id": first_search_id,
+        "hotel_id": hotels[city][0][0],
+        "hotel_name": hotel_rows[0]["name"],
+        "chain": hotel_rows[0]["chain"],
+        "city": city,
+    }
+
+
+def ensure_dataset(tier: str, data_dir: str, seed: int = 42) -> Tuple[str, dict]:
+    """
+    Path and manifest of a tier's SQLite database, generating it if needed.
+
+    The manifest is stored next to the database, so later runs reuse it.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench-{tier}-{seed}.db")
+    manifest_path = path + ".json"
+    if os.path.exists(path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return path, json.load(f)
+
+    manifest = generate(f"sqlite:///{path}", TIERS[tier], seed)
+    manifest["tier"] = tier
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return path, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tier", choices=TIERS, default="1k")
+    parser.add_argument("--url", required=True, help="Database URL to (re)create")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    manifest = generate(args.url, TIERS[args.tier], args.seed)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
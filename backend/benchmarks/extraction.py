@@ -0,0 +1,115 @@
+"""Rate page extraction benchmark: compiled lxml selectors vs BeautifulSoup.
+
+Runs every page of the fixtures corpus (scrapers/fixtures) through:
+
+  bs4        BeautifulSoup with the stdlib html.parser and CSS selects for
+             the offers' code and price (what a straightforward scraper does)
+  lxml       the chain's RateExtractor over a fully parsed tree
+  iterparse  the same extractor parsing incrementally
+
+Each page is also run padded with guest reviews to ``--large-kb`` (real
+booking pages are mostly markup around the rates), which is where
+iterparse kicks in by default. Every extractor run is first checked against
+the fixture's expected quotes.
+
+Usage (from backend/):
+    python -m benchmarks.extraction --repeat 50 --large-kb 1024
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from scrapers.extraction import SPECS, fixture_pages, get_extractor
+
+# CSS for the BeautifulSoup baseline: offer, code attribute (or id prefix), price element
+BS4_SELECTORS = {
+    "Marriott": ("div.room-rate-card", "data-rate-code", "span.rate-price"),
+    "Hilton": ("li.rate", "id", "p.price span.amount"),
+    "IHG": ("div.rateCard", "data-ratecode", "span.rateCard__price"),
+}
+
+REVIEW = (
+    '<div class="review"><h5 class="review__title">Great location, friendly staff</h5>'
+    '<p class="review__body">Stayed three nights for a conference. The room was clean and quiet, '
+    'breakfast had plenty of options and the front desk helped us with a late checkout. '
+    'Parking is expensive but that is the neighborhood.</p>'
+    '<span class="review__score" data-score="4.5">4.5</span></div>\n'
+)
+
+
+def chain_of(path: str) -> str:
+    return next(chain for chain in SPECS if f"{os.sep}{chain.lower()}{os.sep}" in path)
+
+
+def pad(page: bytes, size: int) -> bytes:
+    """The page with enough reviews appended to the body to reach ``size`` bytes"""
+    reviews = REVIEW.encode() * max(0, (size - len(page)) // len(REVIEW) + 1)
+    head, _, tail = page.rpartition(b"</body>")
+    return head + b'<section class="reviews">\n' + reviews + b"</section>\n</body>" + tail
+
+
+def bs4_extract(chain: str, page: bytes) -> dict:
+    from bs4 import BeautifulSoup
+
+    offer_css, code_attr, price_css = BS4_SELECTORS[chain]
+    soup = BeautifulSoup(page, "html.parser")
+    prices = {}
+    for offer in soup.select(offer_css):
+        price = offer.select_one(price_css)
+        prices[offer.get(code_attr, "").replace("rate-", "")] = price.get_text(strip=True) if price else None
+    return prices
+
+
+def pages_per_second(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return 1 / statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--large-kb", type=int, default=1024, help="Size of the padded pages")
+    parser.add_argument("--chain", choices=sorted(SPECS), help="Only this chain's fixtures")
+    args = parser.parse_args()
+
+    try:
+        import bs4  # noqa: F401
+        baseline = True
+    except ImportError:
+        print("beautifulsoup4 is not installed; skipping the bs4 baseline")
+        baseline = False
+
+    print(f"{'page':<28} {'size':>8}  {'bs4':>10} {'lxml':>10} {'iterparse':>10}  pages/s")
+    for path in fixture_pages(args.chain):
+        chain = chain_of(path)
+        extractor = get_extractor(chain)
+        with open(path, "rb") as f:
+            fixture = f.read()
+        with open(path[:-len(".html")] + ".json") as f:
+            expected = json.load(f)
+
+        for label, page in (("", fixture), (" (large)", pad(fixture, args.large_kb * 1024))):
+            def run(incremental):
+                return [extractor.extract(page, code, expected["nights"], incremental) for code in expected["quotes"]]
+
+            for incremental in (False, True):
+                assert run(incremental) == list(expected["quotes"].values()), f"{path}: extraction differs"
+
+            name = f"{chain.lower()}/{os.path.basename(path)}{label}"
+            row = [
+                pages_per_second(lambda: bs4_extract(chain, page), args.repeat) if baseline else None,
+                pages_per_second(lambda: extractor.rates(page, incremental=False), args.repeat),
+                pages_per_second(lambda: extractor.rates(page, incremental=True), args.repeat),
+            ]
+            cells = " ".join(f"{value:10,.0f}" if value else f"{'-':>10}" for value in row)
+            print(f"{name:<28} {len(page) / 1024:6.0f}KB  {cells}")
+
+
+if __name__ == "__main__":
+    main()
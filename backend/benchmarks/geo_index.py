@@ -0,0 +1,98 @@
+"""Spatial index benchmark: radius and nearest-hotel queries at catalog scale.
+
+Builds a GeoIndex of ``--hotels`` points clustered like hotels: most
+around ``--cities`` city centers (normal spread of ~8 km), the rest spread
+over land-ish latitudes. Queries are drawn near the points, like searches
+around a city or landmark, and each kind is timed per query:
+
+  within R km    GeoIndex.within, every hotel within the radius
+  nearest k      GeoIndex.nearest
+  scan           a vectorized NumPy haversine over every hotel, the cost of
+                 answering the same question without an index
+
+Also reports the time to build the index by adding hotels one at a time
+(as catalog loads and inserts do).
+
+Usage (from backend/):
+    python -m benchmarks.geo_index --hotels 1000000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from shared.geo_index import EARTH_RADIUS_KM, GeoIndex
+
+
+def make_points(hotels: int, cities: int, seed: int = 11) -> list:
+    """(lat, lon) for each hotel; 80% in cities, 20% scattered"""
+    rng = random.Random(seed)
+    centers = [(rng.uniform(-40, 60), rng.uniform(-125, 150)) for _ in range(cities)]
+    points = []
+    for _ in range(hotels):
+        if rng.random() < 0.8:
+            lat, lon = rng.choice(centers)
+            points.append((lat + rng.gauss(0, 0.07), lon + rng.gauss(0, 0.09)))
+        else:
+            points.append((rng.uniform(-55, 70), rng.uniform(-180, 180)))
+    return points
+
+
+def scan(lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> np.ndarray:
+    """Distances in km from a point to every hotel"""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def timed(fn, queries: list) -> tuple:
+    """(p50 ms, p99 ms, mean results) of fn over the queries"""
+    times, sizes = [], []
+    for lat, lon in queries:
+        started = time.perf_counter()
+        sizes.append(len(fn(lat, lon)))
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)], statistics.mean(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=1_000_000)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=20, help="Queries for the full-scan comparison")
+    args = parser.parse_args()
+
+    points = make_points(args.hotels, args.cities)
+    rng = random.Random(5)
+    queries = [(lat + rng.gauss(0, 0.01), lon + rng.gauss(0, 0.01))
+               for lat, lon in (rng.choice(points) for _ in range(args.queries))]
+
+    index = GeoIndex()
+    started = time.perf_counter()
+    for i, (lat, lon) in enumerate(points):
+        index.add(i, lat, lon)
+    build_s = time.perf_counter() - started
+    print(f"{len(index):,} hotels in {len(index._cells):,} cells, built in {build_s:.2f}s "
+          f"({build_s / len(index) * 1e6:.2f}us per insert)")
+
+    print(f"{'query':<16} {'p50 ms':>8} {'p99 ms':>8} {'hotels':>8}")
+    for radius_km in (1, 2, 5):
+        p50, p99, size = timed(lambda lat, lon: index.within(lat, lon, radius_km), queries)
+        print(f"{f'within {radius_km} km':<16} {p50:8.3f} {p99:8.3f} {size:8.1f}")
+    for k in (1, 10, 50):
+        p50, p99, size = timed(lambda lat, lon: index.nearest(lat, lon, k), queries)
+        print(f"{f'nearest {k}':<16} {p50:8.3f} {p99:8.3f} {size:8.1f}")
+
+    lats = np.array([lat for lat, _ in points])
+    lons = np.array([lon for _, lon in points])
+    p50, p99, size = timed(lambda lat, lon: np.flatnonzero(scan(lats, lons, lat, lon) <= 2),
+                           queries[:args.scan_queries])
+    print(f"{'scan (2 km)':<16} {p50:8.3f} {p99:8.3f} {size:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Location index benchmark: autocomplete and resolution at catalog scale.
+
+Builds a LocationIndex of ``--hotels`` synthetic hotels: brand + place
+names ("Courtyard Velmora Harbor"), street addresses, and ``--cities``
+made-up cities with a long tail of hotel counts. Queries are drawn from
+what was indexed, the way people type them:
+
+  prefix      the first 3-8 characters of a city or hotel name
+  words       one or two whole words ("velmora harbor")
+  typo        a full city or hotel name with one character changed
+  address     a street address
+
+Each kind is timed through LocationIndex.search as the suggest endpoint
+calls it (prefix mode, 10 matches), and the typo queries also report how
+often the intended entry is the top match. Then LocationIndex.resolve, as
+the search fan-out calls it, is timed on hotel names with a typo, with how
+often the hotel is among those resolved. Also reports the index build
+time per hotel.
+
+Usage (from backend/):
+    python -m benchmarks.location_index --hotels 1000000 --queries 2000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from shared.location_index import LocationIndex, normalize
+
+BRANDS = ["Marriott", "Courtyard", "Residence Inn", "Hilton", "Hampton Inn", "DoubleTree", "Embassy Suites",
+          "Holiday Inn", "Holiday Inn Express", "Crowne Plaza", "InterContinental", "Hyatt Place", "Westin",
+          "Sheraton", "Best Western", "Comfort Inn", "La Quinta", "Motel 6", "Radisson", "Fairfield Inn"]
+PLACES = ["Downtown", "Airport", "Harbor", "Convention Center", "Midtown", "Riverside", "University",
+          "Old Town", "Station", "Beach", "North", "South", "East", "West", "Medical Center", "Lakefront"]
+STREETS = ["Main St", "Broadway", "Oak Ave", "Market St", "Park Blvd", "Lake Dr", "1st Ave", "Elm St"]
+SYLLABLES = ["vel", "mor", "a", "ka", "ston", "ville", "ber", "lin", "ford", "ton", "ash", "bro",
+             "ok", "san", "ta", "ri", "dal", "em", "wood", "port", "mont", "cla", "re", "ven"]
+
+
+def made_up_city(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def make_hotels(hotels: int, cities: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    city_names = sorted({made_up_city(rng) for _ in range(cities * 2)})
+    rng.shuffle(city_names)
+    city_names = city_names[:cities]
+    states = {city: rng.choice(["CA", "TX", "NY", "FL", "IL", "WA", "GA", "OH"]) for city in city_names}
+    weights = [1 / (rank + 1) for rank in range(len(city_names))]  # Long tail
+    rows = []
+    for i, city in enumerate(rng.choices(city_names, weights, k=hotels)):
+        name = f"{rng.choice(BRANDS)} {city} {rng.choice(PLACES)}"
+        if rng.random() < 0.3:
+            name += f" {rng.randint(2, 99)}"
+        rows.append(SimpleNamespace(id=f"hotel-{i}", name=name, city=city, state=states[city],
+                                    address=f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"))
+    return rows
+
+
+def typo(rng: random.Random, text: str) -> str:
+    position = rng.randrange(1, len(text))
+    return text[:position] + rng.choice("aeiourstln") + text[position + 1:]
+
+
+def make_queries(rng: random.Random, hotels: list, count: int) -> dict:
+    sample = [rng.choice(hotels) for _ in range(count)]
+    return {
+        "prefix": [(rng.choice([h.city, h.name])[:rng.randint(3, 8)], None) for h in sample],
+        "words": [(" ".join(h.name.split()[-2:]), None) for h in sample],
+        "typo": [(typo(rng, target), normalize(target)) for target in (rng.choice([h.city, h.name]) for h in sample)],
+        "address": [(h.address, None) for h in sample],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=1_000_000)
+    parser.add_argument("--cities", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    hotels = make_hotels(args.hotels, args.cities)
+    index = LocationIndex()
+    started = time.perf_counter()
+    for hotel in hotels:
+        index.add_hotel(hotel)
+    build_s = time.perf_counter() - started
+    print(f"{len(hotels):,} hotels as {len(index):,} entries, {index.vocabulary_size:,} words, "
+          f"built in {build_s:.1f}s ({build_s / len(hotels) * 1e6:.1f}us per hotel)")
+
+    print(f"{'query':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'top-1':>7}")
+    for kind, queries in make_queries(random.Random(8), hotels, args.queries).items():
+        times, found = [], 0
+        for query, expected in queries:
+            started = time.perf_counter()
+            matches = index.search(query, limit=10)
+            times.append((time.perf_counter() - started) * 1000)
+            if expected is not None and matches and normalize(matches[0].label).startswith(expected):
+                found += 1
+        times.sort()
+        top = f"{found / len(queries):7.1%}" if kind == "typo" else f"{'-':>7}"
+        print(f"{kind:<10} {times[len(times) // 2]:8.3f} {times[int(len(times) * 0.99)]:8.3f} {times[-1]:8.3f} {top}")
+
+    rng = random.Random(9)
+    times, found = [], 0
+    for hotel in (rng.choice(hotels) for _ in range(args.queries)):
+        started = time.perf_counter()
+        resolved = index.resolve(typo(rng, hotel.name))
+        times.append((time.perf_counter() - started) * 1000)
+        found += any(other is hotel for other in resolved)
+    times.sort()
+    print(f"{'resolve':<10} {times[len(times) // 2]:8.3f} {times[int(len(times) * 0.99)]:8.3f} {times[-1]:8.3f} "
+          f"{found / len(times):7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Event loop lag while async routes build the in-memory hotel indexes.
+
+Seeds a scratch SQLite database with ``--hotels`` hotels, then, on a cold
+process, awaits the AsyncDatabaseClient calls that build the catalog and
+location index (a location suggestion, then a chain/city lookup) while a
+ticker task measures how late the event loop runs it. Every other request
+on the loop would see the same delay.
+
+``--on-loop`` runs the calls on the async session with ``run_sync``, which
+is how they ran before they moved to a worker thread, for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.loop_lag --hotels 100000
+    python -m benchmarks.loop_lag --hotels 100000 --on-loop
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.datagen import CHAINS, CITIES
+
+TICK_S = 0.001
+
+
+def seed(hotels: int, seed: int = 7):
+    """Bulk insert hotels spread over the benchmark chains and cities"""
+    from sqlalchemy import insert
+    from shared.database import SessionLocal, init_db
+    from shared.models import Hotel, generate_uuid
+
+    init_db()
+    rng = random.Random(seed)
+    rows = []
+    for i in range(hotels):
+        chain = rng.choice(list(CHAINS))
+        city, state, lat, lng = rng.choice(CITIES)
+        rows.append({"id": generate_uuid(), "name": f"{rng.choice(CHAINS[chain])} {city} {i}", "chain": chain,
+                     "address": f"{rng.randint(1, 9999)} Main St", "city": city, "state": state,
+                     "latitude": lat + rng.uniform(-0.2, 0.2), "longitude": lng + rng.uniform(-0.2, 0.2)})
+    with SessionLocal() as db:
+        for start in range(0, len(rows), 20_000):
+            db.execute(insert(Hotel), rows[start:start + 20_000])
+        db.commit()
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append(time.perf_counter() - started - TICK_S)
+
+
+async def measure(label: str, call) -> None:
+    lags, stop = [], asyncio.Event()
+    task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await call()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await task
+    print(f"{label:<22} {elapsed * 1000:9.1f} {max(lags, default=0) * 1000:12.1f} {len(lags):7d}")
+
+
+async def run(on_loop: bool):
+    from shared.async_database import AsyncSessionLocal, AsyncDatabaseClient, async_engine
+
+    async with AsyncSessionLocal() as db:
+        db_client = AsyncDatabaseClient(db)
+        # With --on-loop, route the thread calls back onto the async session
+        if on_loop:
+            db_client.run_in_thread = db_client.run_sync
+        print(f"{'call':<22} {'elapsed ms':>9} {'max lag ms':>12} {'ticks':>7}")
+        await measure("suggest (cold)", lambda: db_client.suggest_locations("new yo"))
+        await measure("suggest (warm)", lambda: db_client.suggest_locations("chicag"))
+        await measure("chain/city (warm)", lambda: db_client.get_hotels_by_chain_city("Hilton", "Boston"))
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=100_000)
+    parser.add_argument("--on-loop", action="store_true", help="Run the calls on the event loop (run_sync)")
+    args = parser.parse_args()
+
+    # Settings and engines are created at import; use a scratch database
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-loop-lag-')}/bench.db"
+    os.environ["DATABASE_ECHO"] = "false"
+    seed(args.hotels)
+    print(f"{args.hotels} hotels, calls {'on the event loop' if args.on_loop else 'in a worker thread'}")
+    asyncio.run(run(args.on_loop))
+
+
+if __name__ == "__main__":
+    main()
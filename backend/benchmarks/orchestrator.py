@@ -0,0 +1,88 @@
+"""Orchestrator benchmark: jobs/s and fetch latency of one search's fan-out.
+
+Seeds a scratch SQLite database with ``--hotels`` hotels spread over the
+offline stand-in sites' chains (Marriott, Hilton, IHG) in one city, with a
+discount code per type, then runs ScrapeOrchestrator on a search for that
+city with FakeSiteFetcher at ``--latency-ms`` median latency. Concurrency is
+fixed: ``--global`` slots overall and ``--per-chain`` per chain, with rate
+control off. Reports jobs/s and fetch latency percentiles per run; results
+are written to the database as in production.
+
+Usage (from backend/):
+    python -m benchmarks.orchestrator --hotels 300 --latency-ms 20 --global 30 --per-chain 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from dataclasses import replace
+
+DISCOUNT_TYPES = ["aarp", "aaa", "senior"]
+
+
+def seed(hotels: int) -> str:
+    """Create the hotels and discount codes; returns the city searched"""
+    from scrapers.orchestrator import FAKE_SITE_CHAINS
+    from shared.database import get_db_context, init_db, DatabaseClient
+
+    init_db()
+    with get_db_context() as db:
+        db_client = DatabaseClient(db)
+        for i in range(hotels):
+            chain = FAKE_SITE_CHAINS[i % len(FAKE_SITE_CHAINS)]
+            db_client.create_hotel(name=f"{chain} Bench {i}", chain=chain, city="Bench", state="XX")
+        for chain in FAKE_SITE_CHAINS:
+            for discount_type in DISCOUNT_TYPES:
+                db_client.create_discount_code(code=discount_type.upper(), type=discount_type, hotel_chain=chain)
+    return "Bench, XX"
+
+
+def run_once(location: str, args, day: int):
+    """Create a search and scrape it; returns the ScrapeReport"""
+    from scrapers.fake_site import FakeSiteFetcher
+    from scrapers.orchestrator import FAKE_SITE_CHAINS, ScrapeOrchestrator
+    from scrapers.rate_control import RateControl, RateLimits
+    from shared.database import get_db_context, DatabaseClient
+
+    with get_db_context() as db:
+        search = DatabaseClient(db).create_search(
+            "bench", location, f"2026-03-{day:02d}", f"2026-03-{day + 1:02d}", 2,
+            {"discount_types": DISCOUNT_TYPES}
+        )
+        search_id = search.id
+
+    limits = replace(RateLimits.from_settings(), max_concurrency=args.per_chain)
+    orchestrator = ScrapeOrchestrator(
+        {chain: FakeSiteFetcher(latency_ms=args.latency_ms, seed=day) for chain in FAKE_SITE_CHAINS},
+        max_concurrency=args.global_slots,
+        rate_control=RateControl(limits=limits, enabled=False),
+    )
+    return asyncio.run(orchestrator.run(search_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Median fake site latency")
+    parser.add_argument("--global", dest="global_slots", type=int, default=30, help="Fetches in flight overall")
+    parser.add_argument("--per-chain", type=int, default=10, help="Fetches in flight per chain")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # Settings and engines are created at import; use a scratch database
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-orchestrator-')}/bench.db"
+    os.environ["DATABASE_ECHO"] = "false"
+    location = seed(args.hotels)
+
+    print(f"{args.hotels} hotels x {len(DISCOUNT_TYPES) + 1} rate types, {args.latency_ms:g} ms median latency, "
+          f"{args.global_slots} global / {args.per_chain} per-chain slots")
+    print(f"{'run':>3} {'jobs':>6} {'jobs/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'written':>8}")
+    for run in range(1, args.runs + 1):
+        report = run_once(location, args, run)
+        print(f"{run:>3} {report.jobs:>6} {report.jobs_per_second:8.0f} "
+              f"{report.latency_percentile(50):8.1f} {report.latency_percentile(99):8.1f} "
+              f"{report.results_written:>8}")
+
+
+if __name__ == "__main__":
+    main()
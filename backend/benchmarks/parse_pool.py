@@ -0,0 +1,76 @@
+"""Parse pool benchmark: extraction throughput vs worker processes.
+
+Builds a batch of tasks from the fixtures corpus (scrapers/fixtures), every
+expected quote of every page, with each page padded to ``--page-kb`` the
+way benchmarks.extraction pads its large pages. The batch then runs
+through ParsePool.extract_many with 0 workers (inline, on one core) and
+with each ``--workers`` count, and the results are checked against the
+fixtures' expected quotes. Speedup is relative to the inline run.
+
+Process start-up and the first compile of each spec happen in a warm-up
+batch, outside the timing. Speedup cannot exceed the number of cores
+(printed first): counts above it only add scheduling overhead.
+
+Usage (from backend/):
+    python -m benchmarks.parse_pool --workers 1 2 4 8 --page-kb 256 --pages 400
+"""
+import argparse
+import json
+import os
+import time
+
+from scrapers.extraction import SPECS, fixture_pages
+from scrapers.parse_pool import ParsePool
+
+from .extraction import chain_of, pad
+
+
+def build_tasks(page_kb: int, pages: int) -> tuple:
+    """``pages`` extraction tasks cycling through the corpus, and their expected results"""
+    corpus = []
+    for path in fixture_pages():
+        with open(path, "rb") as f:
+            page = pad(f.read(), page_kb * 1024)
+        with open(path[:-len(".html")] + ".json") as f:
+            expected = json.load(f)
+        spec = SPECS[chain_of(path)]
+        corpus += [((spec, page, code, expected["nights"]), prices) for code, prices in expected["quotes"].items()]
+
+    tasks = [corpus[i % len(corpus)] for i in range(pages)]
+    return [task for task, _ in tasks], [prices for _, prices in tasks]
+
+
+def run(workers: int, tasks: list, expected: list, batch_size: int) -> float:
+    """Pages per second through a pool of ``workers`` processes"""
+    pool = ParsePool(workers)
+    try:
+        pool.extract_many(tasks[:max(workers, 1) * batch_size], batch_size)
+        started = time.perf_counter()
+        results = pool.extract_many(tasks, batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+    assert results == expected, f"{workers} worker(s): extraction differs from the fixtures"
+    return len(tasks) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--page-kb", type=int, default=256, help="Size of the padded pages")
+    parser.add_argument("--pages", type=int, default=400, help="Pages per run")
+    parser.add_argument("--batch-size", type=int, default=8, help="Pages per round trip to a process")
+    args = parser.parse_args()
+
+    tasks, expected = build_tasks(args.page_kb, args.pages)
+    print(f"{os.cpu_count()} core(s), {len(tasks)} pages of {args.page_kb}KB")
+    print(f"{'workers':>8} {'pages/s':>10} {'speedup':>8}")
+    baseline = run(0, tasks, expected, args.batch_size)
+    print(f"{'inline':>8} {baseline:10,.0f} {1:7.2f}x")
+    for workers in args.workers:
+        rate = run(workers, tasks, expected, args.batch_size)
+        print(f"{workers:>8} {rate:10,.0f} {rate / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Price history benchmark: the in-memory history store vs the results table.
+
+Seeds a fresh database with synthetic results (default 10M rows spread over
+90 days of scrapes, each carrying a small raw payload like the
+scrapers write), then answers "daily min/avg/max of one hotel's AARP rate
+over the last 90 days" four ways:
+
+  orm       db.query(Result) on idx_hotel_scraped, bucketed in Python
+  columns   the same range as a column-projected select, bucketed in Python
+  cold      the history store's first query (backfills the hotel from results)
+  warm      the history store once the hotel is loaded (a top-up query of
+            the rows scraped since, then the in-memory scan)
+
+Usage (from backend/):
+    python -m benchmarks.price_history --rows 10000000 --hotels 500
+    python -m benchmarks.price_history --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+
+from shared.models import Base, Hotel, RawPayload, Result, Search
+from shared.price_history import PriceHistoryStore, downsample, to_epoch
+from shared.raw_payloads import encode_payload
+from shared.storage import create_storage_engine
+
+DISCOUNT_TYPES = ["none", "aarp", "aaa", "senior"]
+
+
+def seed(Session, rows: int, hotels: int, searches: int, days: int, chunk_size: int = 50000):
+    """Insert hotels, searches and ``rows`` results scraped over the last ``days`` days"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    hotel_ids = [f"hotel-{i:05d}" for i in range(hotels)]
+    search_ids = [f"search-{i:06d}" for i in range(searches)]
+
+    with Session() as db:
+        db.execute(insert(Hotel), [
+            {"id": hotel_id, "name": f"Bench Hotel {i}", "chain": "Marriott", "city": "Bench"}
+            for i, hotel_id in enumerate(hotel_ids)
+        ])
+        db.execute(insert(Search), [
+            {"id": search_id, "location": "Bench", "check_in_date": (now + timedelta(days=i % 60)).strftime("%Y-%m-%d"),
+             "check_out_date": (now + timedelta(days=i % 60 + 2)).strftime("%Y-%m-%d"), "guests": 2,
+             "status": "completed", "created_at": now}
+            for i, search_id in enumerate(search_ids)
+        ])
+        payload = encode_payload({"room": "King", "refundable": True, "source": "bench"})
+        db.execute(insert(RawPayload), [{"hash": payload.hash, "data": payload.data, "size": payload.size}])
+        db.commit()
+
+        span_s = days * 86400
+        for start in range(0, rows, chunk_size):
+            batch = []
+            for i in range(start, min(rows, start + chunk_size)):
+                total = round(rng.uniform(120, 400), 2)
+                batch.append({
+                    "id": f"result-{i:09d}",
+                    "search_id": search_ids[i % searches],
+                    "hotel_id": hotel_ids[rng.randrange(hotels)],
+                    "discount_type": DISCOUNT_TYPES[i % len(DISCOUNT_TYPES)],
+                    "original_price": total, "discounted_price": total, "taxes": 0.0, "fees": 0.0,
+                    "total_price": total, "currency": "USD", "available": True,
+                    "raw_hash": payload.hash,
+                    "scraped_at": now - timedelta(seconds=span_s * (rows - i) / rows),
+                })
+            db.execute(insert(Result), batch)
+            db.commit()
+    return hotel_ids, now
+
+
+def timed(fn, repeat: int) -> tuple:
+    """Run fn ``repeat`` times; returns (median ms, last result)"""
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'history.db')}"
+        engine = create_storage_engine(url)
+        engine.echo = False
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        started = time.perf_counter()
+        hotel_ids, now = seed(Session, args.rows, args.hotels, args.searches, args.days)
+        print(f"Seeded {args.rows} results in {time.perf_counter() - started:.1f}s")
+
+        hotel_id = hotel_ids[0]
+        start = now - timedelta(days=args.days)
+
+        with Session() as db:
+            def orm():
+                results = db.query(Result).filter(
+                    Result.hotel_id == hotel_id,
+                    Result.scraped_at >= start
+                ).order_by(Result.scraped_at).all()
+                db.expunge_all()
+                return downsample(
+                    ((0, to_epoch(r.scraped_at), r.total_price) for r in results
+                     if r.discount_type == "aarp" and r.available and r.total_price is not None),
+                    86400
+                )
+
+            def columns():
+                rows = db.execute(
+                    select(Result.scraped_at, Result.total_price)
+                    .where(Result.hotel_id == hotel_id, Result.scraped_at >= start,
+                           Result.discount_type == "aarp", Result.available == True,
+                           Result.total_price.isnot(None))
+                    .order_by(Result.scraped_at)
+                )
+                return downsample(((0, to_epoch(ts), price) for ts, price in rows), 86400)
+
+            def cold():
+                return PriceHistoryStore().query(db, hotel_id, "aarp", start=start, bucket="day")["aarp"]
+
+            store = PriceHistoryStore()
+            store.query(db, hotel_id, "aarp")
+
+            def warm():
+                return store.query(db, hotel_id, "aarp", start=start, bucket="day")["aarp"]
+
+            for name, fn in (("orm", orm), ("columns", columns), ("cold", cold), ("warm", warm)):
+                ms, buckets = timed(fn, args.repeat)
+                points = sum(bucket["count"] for bucket in buckets)
+                print(f"{name:>8}: {ms:9.2f} ms  ({len(buckets)} daily buckets, {points} points)")
+
+            stats = store.stats()
+            print(f"Store holds {stats['points']} points of 1 hotel in {stats['segments']} segments, "
+                  f"{stats['bytes'] / 1024:.1f} KiB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Job queue benchmark: throughput vs worker count, and crash recovery.
+
+Seeds a SQLite database with pending searches over the offline stand-in
+sites (SCRAPER_FAKE_SITES), then starts N ``python -m scrapers.worker
+--exit-when-idle`` processes and waits for them to drain the queue. For
+each worker count it reports wall time and the steady rate (jobs over the
+span between the first and last job finishing, so interpreter start-up is
+left out).
+
+With ``--crash`` one worker is SIGKILLed part way through instead. The
+surviving workers must sweep its expired leases and finish the run, and
+the check fails (exit status 1) unless every search completed with exactly
+one result per job.
+
+Usage (from backend/):
+    python -m benchmarks.queue --workers 1 2 4 --searches 10 --hotels 30
+    python -m benchmarks.queue --crash --workers 3
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISCOUNT_TYPES = ["aarp", "aaa", "senior"]
+
+
+def seed(url: str, searches: int, hotels: int) -> int:
+    """Create hotels, codes and pending searches; returns the number of jobs they expand to"""
+    os.environ["DATABASE_URL"] = url
+    os.environ["DATABASE_ECHO"] = "false"
+    from scrapers.orchestrator import FAKE_SITE_CHAINS
+    from shared.database import engine, init_db, get_db_context, DatabaseClient
+
+    init_db()
+    with get_db_context() as db:
+        db_client = DatabaseClient(db)
+        for chain in FAKE_SITE_CHAINS:
+            for i in range(hotels):
+                db_client.create_hotel(name=f"{chain} Bench {i}", chain=chain, city="Bench")
+            for discount_type in DISCOUNT_TYPES:
+                db_client.create_discount_code(code=discount_type.upper(), type=discount_type, hotel_chain=chain)
+        for i in range(searches):
+            db_client.create_search("bench", "Bench, XX", f"2026-03-{i % 28 + 1:02d}", f"2026-03-{i % 28 + 2:02d}",
+                                    2, {"discount_types": DISCOUNT_TYPES})
+    # Closing the last connection checkpoints the WAL, so the file can be copied
+    engine.dispose()
+    return searches * hotels * len(FAKE_SITE_CHAINS) * (len(DISCOUNT_TYPES) + 1)
+
+
+def verify(url: str, expected_jobs: int) -> dict:
+    """Job, result and search counts after a run"""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        scalar = lambda sql: conn.execute(text(sql)).scalar()
+        stats = {
+            "jobs_done": scalar("SELECT count(*) FROM jobs WHERE status = 'done'"),
+            "results": scalar("SELECT count(*) FROM results"),
+            "distinct_results": scalar(
+                "SELECT count(*) FROM (SELECT DISTINCT search_id, hotel_id, discount_type FROM results) AS r"
+            ),
+            "searches_open": scalar("SELECT count(*) FROM searches WHERE status != 'completed'"),
+            "retried_jobs": scalar("SELECT count(*) FROM jobs WHERE attempts > 1"),
+            "span_s": scalar("SELECT (julianday(max(finished_at)) - julianday(min(finished_at))) * 86400 FROM jobs"),
+        }
+    engine.dispose()
+    stats["ok"] = (stats["jobs_done"] == stats["results"] == stats["distinct_results"] == expected_jobs
+                   and stats["searches_open"] == 0)
+    return stats
+
+
+def run_workers(url: str, count: int, concurrency: int, lease_s: int, crash_after_s: float = None) -> float:
+    env = {
+        **os.environ, "DATABASE_URL": url, "DATABASE_ECHO": "false", "SCRAPER_FAKE_SITES": "true",
+        "SCRAPER_RATE_CONTROL": "false", "MAX_CONCURRENT_SCRAPERS": str(concurrency),
+        "MAX_CONCURRENT_PER_CHAIN": str(concurrency), "QUEUE_LEASE_S": str(lease_s),
+        "QUEUE_POLL_INTERVAL_MS": "100", "LOG_LEVEL": "WARNING",
+    }
+    started = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "scrapers.worker", "--exit-when-idle", "--worker-id", f"bench-{i}"],
+                         cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+        for i in range(count)
+    ]
+    if crash_after_s is not None:
+        time.sleep(crash_after_s)
+        workers[0].send_signal(signal.SIGKILL)
+        print(f"  killed worker bench-0 after {crash_after_s:g}s")
+    for worker in workers:
+        worker.wait()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--searches", type=int, default=10)
+    parser.add_argument("--hotels", type=int, default=30, help="Hotels per chain")
+    parser.add_argument("--concurrency", type=int, default=10, help="Jobs in flight per worker")
+    parser.add_argument("--crash", action="store_true", help="Kill one worker mid-run and check recovery")
+    parser.add_argument("--lease-s", type=int, default=None, help="QUEUE_LEASE_S (default: 2 with --crash, else 60)")
+    args = parser.parse_args()
+    lease_s = args.lease_s or (2 if args.crash else 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        jobs = seed(f"sqlite:///{template}", args.searches, args.hotels)
+        print(f"{args.searches} searches, {jobs} jobs")
+
+        failed = False
+        for count in ([max(args.workers)] if args.crash else args.workers):
+            path = os.path.join(tmp, f"queue-{count}.db")
+            shutil.copy(template, path)
+            url = f"sqlite:///{path}"
+            crash_after_s = None
+            if args.crash:
+                # Roughly a third of the way through at ~20 jobs/s per slot
+                crash_after_s = 1.5 + jobs / (count * args.concurrency * 20) / 3
+            wall_s = run_workers(url, count, args.concurrency, lease_s, crash_after_s)
+            stats = verify(url, jobs)
+            failed |= not stats["ok"]
+            steady = jobs / stats["span_s"] if stats["span_s"] else float("nan")
+            print(f"  {count} worker(s): {wall_s:6.2f}s wall  {steady:8,.0f} jobs/s steady  "
+                  f"retried={stats['retried_jobs']} results={stats['results']} "
+                  f"{'ok' if stats['ok'] else 'MISMATCH ' + str(stats)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Rate control benchmark: fixed politeness delay vs adaptive per-chain limits.
+
+Three offline stand-in sites (FakeSiteFetcher) with different capacity are
+scraped for ``--seconds`` by clients that always have another job waiting:
+
+  Marriott   fast: 40 req/s capacity, 40ms responses
+  Hilton     medium: 10 req/s, 150ms
+  IHG        fragile: 3 req/s, 400ms, 5% errors
+
+``fixed`` is the old scheme: MAX_CONCURRENT_PER_CHAIN slots per chain, each
+holding a 2 second delay after its request. ``adaptive`` runs the same load
+through RateControl with ``--workers`` instances sharing one store, which is
+how worker processes share the Redis store. With ``--http`` every site is
+served by a FakeSiteServer on localhost and scraped with HttpSiteFetcher,
+so requests go through a real HTTP client and server; without it the sites
+are called in-process. For each chain it reports the
+achieved requests/sec (successful responses) over the whole run and over its
+second half, the 429s and timeouts, and the limits it ended on.
+
+Usage (from backend/):
+    python -m benchmarks.rate_control --seconds 30 --workers 2
+    python -m benchmarks.rate_control --seconds 30 --workers 2 --http
+"""
+import argparse
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+
+from scrapers.base import FetchError, RateLimitError, ScrapeJob
+from scrapers.fake_server import FakeSiteServer, HttpSiteFetcher
+from scrapers.fake_site import FakeSiteFetcher
+from scrapers.rate_control import InMemoryRateStore, RateControl, RateLimits
+
+SITES = {
+    "Marriott": dict(capacity_rps=40, latency_ms=40),
+    "Hilton": dict(capacity_rps=10, latency_ms=150),
+    "IHG": dict(capacity_rps=3, latency_ms=400, error_rate=0.05),
+}
+
+
+@dataclass
+class Tally:
+    ok: int = 0
+    ok_second_half: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    errors: int = 0
+
+
+def job_for(chain: str, i: int) -> ScrapeJob:
+    return ScrapeJob(search_id="bench", hotel_id=f"{chain}-{i}", hotel_name=f"{chain} {i}", chain=chain,
+                     city="Bench", discount_type="none", discount_code=None,
+                     check_in="2026-03-01", check_out="2026-03-02", guests=2)
+
+
+@asynccontextmanager
+async def serve_sites(http: bool):
+    """The benchmark sites by chain, in-process or behind local HTTP servers"""
+    sites = {chain: FakeSiteFetcher(seed=1, **site) for chain, site in SITES.items()}
+    if not http:
+        yield sites
+        return
+    async with AsyncExitStack() as stack:
+        fetchers = {}
+        for chain, site in sites.items():
+            server = await stack.enter_async_context(FakeSiteServer(site, chain))
+            fetchers[chain] = HttpSiteFetcher(server.url)
+            stack.push_async_callback(fetchers[chain].close)
+        yield fetchers
+
+
+async def attempt(site, job: ScrapeJob, timeout_s: float, tally: Tally, halfway: float):
+    try:
+        await asyncio.wait_for(site.fetch(job), timeout_s)
+    except RateLimitError:
+        tally.throttled += 1
+        raise
+    except asyncio.TimeoutError:
+        tally.timeouts += 1
+        raise
+    except FetchError:
+        tally.errors += 1
+        raise
+    tally.ok += 1
+    tally.ok_second_half += time.monotonic() >= halfway
+
+
+async def run_fixed(seconds: float, slots: int, delay_s: float, timeout_s: float, http: bool) -> dict:
+    async with serve_sites(http) as sites:
+        return await _run_fixed(sites, seconds, slots, delay_s, timeout_s)
+
+
+async def _run_fixed(sites: dict, seconds: float, slots: int, delay_s: float, timeout_s: float) -> dict:
+    tallies = {chain: Tally() for chain in SITES}
+    deadline = time.monotonic() + seconds
+    halfway = deadline - seconds / 2
+
+    async def slot(chain: str, n: int):
+        i = n
+        while time.monotonic() < deadline:
+            try:
+                await attempt(sites[chain], job_for(chain, i), timeout_s, tallies[chain], halfway)
+            except (FetchError, asyncio.TimeoutError):
+                pass
+            i += slots
+            await asyncio.sleep(delay_s)
+
+    await asyncio.gather(*(slot(chain, n) for chain in SITES for n in range(slots)))
+    return {chain: (tally, None) for chain, tally in tallies.items()}
+
+
+async def run_adaptive(seconds: float, workers: int, clients: int, limits: RateLimits, timeout_s: float,
+                       http: bool) -> dict:
+    async with serve_sites(http) as sites:
+        return await _run_adaptive(sites, seconds, workers, clients, limits, timeout_s)
+
+
+async def _run_adaptive(sites: dict, seconds: float, workers: int, clients: int, limits: RateLimits,
+                        timeout_s: float) -> dict:
+    tallies = {chain: Tally() for chain in SITES}
+    store = InMemoryRateStore()
+    controls = [RateControl(store, limits, enabled=True) for _ in range(workers)]
+    deadline = time.monotonic() + seconds
+    halfway = deadline - seconds / 2
+
+    async def client(control: RateControl, chain: str, n: int):
+        i = n
+        while time.monotonic() < deadline:
+            try:
+                async with control.request(chain):
+                    await attempt(sites[chain], job_for(chain, i), timeout_s, tallies[chain], halfway)
+            except (FetchError, asyncio.TimeoutError):
+                pass
+            i += clients * workers
+
+    await asyncio.gather(*(
+        client(control, chain, w * clients + n)
+        for w, control in enumerate(controls) for chain in SITES for n in range(clients)
+    ))
+    # Limits as the last worker saw them
+    return {chain: (tally, controls[-1].stats()[chain]) for chain, tally in tallies.items()}
+
+
+def report(label: str, seconds: float, results: dict):
+    print(label)
+    print(f"  {'chain':<9} {'req/s':>7} {'2nd half':>9} {'429s':>6} {'timeouts':>9} {'errors':>7}  final limits")
+    for chain, (tally, stats) in results.items():
+        limits = f"{stats['rps_limit']:.1f} req/s, concurrency {stats['concurrency_limit']}" if stats else "-"
+        print(f"  {chain:<9} {tally.ok / seconds:7.2f} {tally.ok_second_half / (seconds / 2):9.2f} "
+              f"{tally.throttled:6d} {tally.timeouts:9d} {tally.errors:7d}  {limits}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=2, help="RateControl instances sharing one store")
+    parser.add_argument("--clients", type=int, default=8, help="Jobs waiting per chain per worker")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="MAX_CONCURRENT_PER_CHAIN for adaptive")
+    parser.add_argument("--max-rps", type=float, default=100.0)
+    parser.add_argument("--timeout-s", type=float, default=5.0)
+    parser.add_argument("--http", action="store_true", help="Serve the sites over HTTP on localhost")
+    args = parser.parse_args()
+
+    fixed = asyncio.run(run_fixed(args.seconds, slots=2, delay_s=2.0, timeout_s=args.timeout_s, http=args.http))
+    report("fixed (2 slots per chain, 2s delay)", args.seconds, fixed)
+
+    limits = RateLimits(
+        initial_rps=1.0, min_rps=0.1, max_rps=args.max_rps, burst=2.0, increase_rps=2.0, backoff=0.5,
+        cooldown_s=2.0, max_concurrency=args.max_concurrency, slow_s=2.0,
+    )
+    adaptive = asyncio.run(run_adaptive(args.seconds, args.workers, args.clients, limits, args.timeout_s,
+                                        args.http))
+    report(f"adaptive ({args.workers} workers sharing one store)", args.seconds, adaptive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Raw payload storage benchmark: inline JSON column vs compressed side table.
+
+Builds the same results twice in fresh SQLite databases:
+
+  inline     raw_data as a JSON column on results (the layout before
+             raw_payloads), added to today's schema
+  payloads   raw_data moved to raw_payloads by create_results_bulk: zlib,
+             one row per distinct payload, results keep the hash
+
+Each payload is what a page scraper would save: the rate code, room and
+name, plus the offer's HTML snippet from the fixtures corpus. Every search
+is scraped ``--repeats`` times with unchanged prices, as cached and
+re-run searches are, so repeat payloads are identical.
+
+Reports the database file size and how fast a search's results are read
+with every column (SELECT *, JSON decoded as the ORM would) and with
+get_results_by_search, plus single raw lookups for the side table.
+
+Usage (from backend/):
+    python -m benchmarks.raw_payloads --searches 200 --hotels 25 --repeats 2
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import JSON, Column, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from scrapers.extraction import SPECS, fixture_pages, get_extractor
+from shared.database import DatabaseClient
+from shared.models import Base, Hotel, Result, Search
+from shared.storage import create_storage_engine
+
+from .extraction import chain_of
+
+DISCOUNT_TYPES = ["none", "aarp", "aaa", "senior"]
+
+
+def offer_snippets() -> dict:
+    """Chain -> HTML of each rate offer on the chain's standard fixture page"""
+    from lxml import etree, html
+
+    snippets = {}
+    for path in fixture_pages():
+        if not path.endswith("standard.html"):
+            continue
+        chain = chain_of(path)
+        with open(path, "rb") as f:
+            tree = html.document_fromstring(f.read())
+        offers = get_extractor(chain)._offers(tree)
+        snippets[chain] = [etree.tostring(offer, encoding="unicode") for offer in offers]
+    return snippets
+
+
+def build_results(searches: int, hotels: int, repeats: int) -> tuple:
+    """Hotels, searches and their result items (create_results_bulk shape), deterministic"""
+    rng = random.Random(7)
+    snippets = offer_snippets()
+    chains = sorted(SPECS)
+    hotel_rows = [{"id": f"hotel-{i:04d}", "name": f"Bench Hotel {i}", "chain": chains[i % len(chains)],
+                   "city": "Bench"} for i in range(hotels)]
+    search_rows, items = [], {}
+    for s in range(searches):
+        base = {h["id"]: round(rng.uniform(120, 400), 2) for h in hotel_rows}
+        for repeat in range(repeats):
+            search_id = f"search-{s:05d}-{repeat}"
+            search_rows.append({"id": search_id, "location": "Bench", "check_in_date": "2026-03-01",
+                                "check_out_date": "2026-03-02", "guests": 2, "status": "completed"})
+            items[search_id] = []
+            for h in hotel_rows:
+                for d, discount_type in enumerate(DISCOUNT_TYPES):
+                    offer = snippets[h["chain"]][d % len(snippets[h["chain"]])]
+                    total = round(base[h["id"]] * (1 - 0.05 * d), 2)
+                    items[search_id].append({
+                        "hotel_id": h["id"], "discount_type": discount_type,
+                        "prices": {"original": base[h["id"]], "discounted": total, "total": total,
+                                   "raw_data": {"rate_code": discount_type.upper(), "room": "King",
+                                                "rate_name": f"{discount_type} rate", "nights": 1,
+                                                "snippet": offer.replace("189", f"{total:.0f}")}},
+                    })
+    return hotel_rows, search_rows, items
+
+
+def fresh_database(path: str, inline: bool):
+    engine = create_storage_engine(f"sqlite:///{path}")
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    if inline:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE results ADD COLUMN raw_data JSON"))
+    return engine
+
+
+def write(engine, hotel_rows, search_rows, items, inline: bool):
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.execute(insert(Hotel), hotel_rows)
+        db.execute(insert(Search), search_rows)
+        db.commit()
+        db_client = DatabaseClient(db)
+        for search_id, search_items in items.items():
+            if not inline:
+                db_client.create_results_bulk(search_id, search_items)
+                continue
+            rows = [db_client._result_values(search_id, i["hotel_id"], i["discount_type"], i["prices"])
+                    for i in search_items]
+            for row in rows:
+                row["id"] = f"{search_id}-{row['hotel_id']}-{row['discount_type']}"
+            db.execute(text(
+                "INSERT INTO results (id, search_id, hotel_id, discount_type, original_price, discounted_price, "
+                "taxes, fees, total_price, currency, available, raw_data, scraped_at, version) VALUES "
+                "(:id, :search_id, :hotel_id, :discount_type, :original_price, :discounted_price, :taxes, :fees, "
+                ":total_price, :currency, :available, :raw_data, CURRENT_TIMESTAMP, 0)"
+            ), [{**row, "raw_data": _json(row["raw_data"])} for row in rows])
+            db.commit()
+
+
+def _json(value) -> str:
+    import orjson
+    return orjson.dumps(value).decode()
+
+
+def per_second(fn, search_ids, repeat: int) -> float:
+    """Rows read per second, median over ``repeat`` passes of every search"""
+    rates = []
+    for _ in range(repeat):
+        rows = 0
+        started = time.perf_counter()
+        for search_id in search_ids:
+            rows += fn(search_id)
+        rates.append(rows / (time.perf_counter() - started))
+    return statistics.median(rates)
+
+
+def measure(path: str, inline: bool, sample: list, repeat: int) -> dict:
+    engine = create_storage_engine(f"sqlite:///{path}")
+    engine.echo = False
+    Session = sessionmaker(bind=engine)
+    results = Result.__table__
+    raw_json = Column("raw_data", JSON)
+    columns = list(results.c) + ([raw_json] if inline else [])
+    with Session() as db:
+        db_client = DatabaseClient(db)
+
+        def select_all(search_id):
+            return len(db.execute(select(*columns).select_from(results).where(results.c.search_id == search_id)).all())
+
+        def orm(search_id):
+            rows = len(db_client.get_results_by_search(search_id))
+            db.expunge_all()
+            return rows
+
+        stats = {"select_all": per_second(select_all, sample, repeat)}
+        if not inline:
+            stats["orm"] = per_second(orm, sample, repeat)
+            keys = db.execute(select(results.c.search_id, results.c.id)
+                              .where(results.c.search_id.in_(sample))).all()
+            started = time.perf_counter()
+            for search_id, result_id in keys:
+                db_client.get_result_raw_data(search_id, result_id)
+            stats["raw_lookups"] = len(keys) / (time.perf_counter() - started)
+            stats["payloads"] = db.execute(text("SELECT count(*), sum(size), sum(length(data)) FROM raw_payloads")).one()
+    engine.dispose()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--hotels", type=int, default=25, help="Hotels per search")
+    parser.add_argument("--repeats", type=int, default=2, help="Scrapes of each search with unchanged prices")
+    parser.add_argument("--repeat", type=int, default=3, help="Read passes")
+    args = parser.parse_args()
+
+    hotel_rows, search_rows, items = build_results(args.searches, args.hotels, args.repeats)
+    result_count = sum(len(search_items) for search_items in items.values())
+    sample = [row["id"] for row in search_rows[:50]]
+    print(f"{len(search_rows)} searches, {result_count:,} results")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = {}
+        for label, inline in (("inline", True), ("payloads", False)):
+            path = os.path.join(tmp, f"{label}.db")
+            engine = fresh_database(path, inline)
+            started = time.perf_counter()
+            write(engine, hotel_rows, search_rows, items, inline)
+            write_s = time.perf_counter() - started
+            # Closing the last connection checkpoints the WAL into the file
+            engine.dispose()
+            report[label] = {"size": os.path.getsize(path), "write_s": write_s,
+                             **measure(path, inline, sample, args.repeat)}
+
+    print(f"{'':<10} {'db size':>10} {'write':>8} {'SELECT * rows/s':>16} {'ORM rows/s':>11} {'raw lookups/s':>14}")
+    for label, stats in report.items():
+        orm = f"{stats['orm']:11,.0f}" if "orm" in stats else f"{'-':>11}"
+        raw = f"{stats['raw_lookups']:14,.0f}" if "raw_lookups" in stats else f"{'-':>14}"
+        print(f"{label:<10} {stats['size'] / 2 ** 20:8.1f}MB {stats['write_s']:7.1f}s "
+              f"{stats['select_all']:16,.0f} {orm} {raw}")
+    count, size, stored = report["payloads"]["payloads"]
+    print(f"raw_payloads: {count:,} distinct of {result_count:,}, {size / 2 ** 20:.1f}MB JSON "
+          f"stored as {stored / 2 ** 20:.1f}MB ({stored / size:.0%})")
+
+
+if __name__ == "__main__":
+    main()
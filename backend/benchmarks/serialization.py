@@ -0,0 +1,130 @@
+"""Results serialization benchmark: Pydantic models vs direct orjson encoding.
+
+Seeds searches with 1k and 10k results and compares, for each size:
+
+  encode    building the response body from already-fetched rows
+  endpoint  GET /api/results/{search_id} through an in-process ASGI client
+
+The Pydantic side builds a ResultItem per row and a ResultsResponse, which
+FastAPI then validates against response_model and JSON-encodes again (the
+route as it was before). The orjson side is the current route. Both
+responses are checked to decode to the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --sizes 1000 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings and engines are created at import, so point them at a scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'serialization.db')}"
+        os.environ["DATABASE_ECHO"] = "false"
+        asyncio.run(run(args.sizes, args.repeat))
+
+
+async def run(sizes, repeat: int):
+    import httpx
+    from fastapi.responses import JSONResponse
+
+    from api.main import app
+    from api.routes.results import RESULT_FIELDS, ResultsResponse, encode_results, result_item
+    from shared.async_database import AsyncSessionLocal, AsyncDatabaseClient
+    from shared.database import init_db, get_db_context, DatabaseClient
+
+    @app.get("/bench/pydantic/results/{search_id}", response_model=ResultsResponse, include_in_schema=False)
+    async def get_results_pydantic(search_id: str):
+        """The results route as it was before: one model per row, validated again by FastAPI"""
+        async with AsyncSessionLocal() as db:
+            db_client = AsyncDatabaseClient(db)
+            search = await db_client.get_search(search_id)
+            rows = await db_client.get_result_rows(search_id)
+        return ResultsResponse(**envelope(search, rows), results=[result_item(row) for row in rows])
+
+    def envelope(search, rows) -> dict:
+        return {
+            "search_id": search.id, "status": search.status, "location": search.location,
+            "check_in": search.check_in_date, "check_out": search.check_out_date,
+            "guests": search.guests, "result_count": len(rows), "next_cursor": None,
+        }
+
+    init_db()
+    search_ids = {}
+    with get_db_context() as db:
+        db_client = DatabaseClient(db)
+        hotels = [db_client.create_hotel(name=f"Bench Hotel {i}", chain="Marriott", city="Bench")
+                  for i in range(250)]
+        for size in sizes:
+            search = db_client.create_search("bench", "Bench", "2026-01-01", "2026-01-02", 2)
+            db_client.create_results_bulk(search.id, [
+                {"hotel_id": hotels[i % len(hotels)].id, "discount_type": ["none", "aarp", "aaa", "senior"][i % 4],
+                 "prices": {"original": 200.0 + i % 50, "discounted": 180.0, "taxes": 27.0, "total": 207.0 + i % 50},
+                 "available": i % 17 != 0}
+                for i in range(size)
+            ])
+            search_ids[size] = search.id
+
+    def timed(fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    async def timed_async(fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in sizes:
+            search_id = search_ids[size]
+            async with AsyncSessionLocal() as db:
+                db_client = AsyncDatabaseClient(db)
+                search = await db_client.get_search(search_id)
+                rows = await db_client.get_result_rows(search_id, fields=RESULT_FIELDS)
+
+            def pydantic_encode():
+                # What FastAPI does with a returned model: dump, validate against
+                # response_model, serialize in JSON mode, then json.dumps
+                model = ResultsResponse(**envelope(search, rows), results=[result_item(row) for row in rows])
+                validated = ResultsResponse.model_validate(model.model_dump())
+                return JSONResponse(validated.model_dump(mode="json")).body
+
+            def orjson_encode():
+                return encode_results(envelope(search, rows), rows, RESULT_FIELDS)
+
+            old = await client.get(f"/bench/pydantic/results/{search_id}")
+            new = await client.get(f"/api/results/{search_id}")
+            assert old.json() == new.json(), "Responses differ"
+            assert json.loads(pydantic_encode()) == json.loads(orjson_encode()), "Encoded bodies differ"
+
+            print(f"{size} rows ({len(new.content) / 1024:.0f} KiB response):")
+            for name, seconds in (
+                ("encode   pydantic", timed(pydantic_encode)),
+                ("encode   orjson", timed(orjson_encode)),
+                ("endpoint pydantic", await timed_async(lambda: client.get(f"/bench/pydantic/results/{search_id}"))),
+                ("endpoint orjson", await timed_async(lambda: client.get(f"/api/results/{search_id}"))),
+            ):
+                print(f"  {name:<18} {seconds * 1000:9.2f} ms  {size / seconds:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
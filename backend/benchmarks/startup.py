@@ -0,0 +1,91 @@
+"""Cold-start benchmark: import time, startup and first-request latency.
+
+Each run is a fresh interpreter that imports api.main, runs the startup
+handlers and serves its first two requests through an in-process ASGI
+client, timing each step. The database is created and migrated once up
+front, so runs measure a worker joining an already deployed database. For
+comparison each run also times Base.metadata.create_all, which the startup
+handler used to run on every boot.
+
+Usage (from backend/):
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --runs 10 --environment production
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of timings in ms
+CHILD = r"""
+import time
+started = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+
+import asyncio, json, httpx
+from shared.database import engine
+from shared.models import Base
+
+async def main():
+    timings = {"import_ms": (imported - started) * 1000}
+    t = time.perf_counter()
+    await api.main.app.router.startup()
+    timings["startup_ms"] = (time.perf_counter() - t) * 1000
+    transport = httpx.ASGITransport(app=api.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("first_request_ms", "second_request_ms"):
+            t = time.perf_counter()
+            (await client.get("/api/searches?limit=10")).raise_for_status()
+            timings[name] = (time.perf_counter() - t) * 1000
+    timings["ready_ms"] = (time.perf_counter() - started) * 1000
+    t = time.perf_counter()
+    Base.metadata.create_all(engine)
+    timings["create_all_ms"] = (time.perf_counter() - t) * 1000
+    await api.main.app.router.shutdown()
+    print(json.dumps(timings))
+
+asyncio.run(main())
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--environment", default="development",
+                        help="ENVIRONMENT for the workers (production leaves out mock routes)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        env = {**os.environ, "DATABASE_URL": url, "DATABASE_ECHO": "false", "PYTHONDONTWRITEBYTECODE": "0"}
+
+        # Create and migrate the database before timing anything
+        subprocess.run([sys.executable, "-c", "from shared.database import init_db; init_db()"],
+                       cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+        env["ENVIRONMENT"] = args.environment
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts ({args.environment}), median / max:")
+    for key in runs[0]:
+        values = [run[key] for run in runs]
+        print(f"  {key:<18} {statistics.median(values):9.2f} ms  {max(values):9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Concurrent read/write stress test for the storage profiles.
+
+Runs writer threads (batched result inserts, as the scrapers do) alongside
+reader threads (the joined results query the API serves) against a fresh
+database for each profile. It reports throughput and lock errors for the
+"default" (driver defaults) and "tuned" (WAL, pragmas, pooling) profiles.
+
+Usage (from backend/):
+    python -m benchmarks.storage --seconds 10 --writers 2 --readers 8
+    python -m benchmarks.storage --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from shared.database import DatabaseClient
+from shared.models import Base
+from shared.storage import create_storage_engine
+
+
+def stress(url: str, profile: str, seconds: float, writers: int, readers: int,
+           batch_size: int) -> dict:
+    """Run readers and writers against one engine and count completed operations"""
+    engine = create_storage_engine(url, profile)
+    engine.echo = False
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        db_client = DatabaseClient(db)
+        hotel_ids = [db_client.create_hotel(name=f"Stress Hotel {i}", chain="Marriott", city="Stress").id
+                     for i in range(25)]
+        search_ids = [db_client.create_search("stress", "Stress", "2025-01-01", "2025-01-02", 2).id
+                      for _ in range(writers)]
+
+    counts = {"rows_written": 0, "write_batches": 0, "reads": 0, "rows_read": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer(search_id):
+        batch = [{"hotel_id": hotel_ids[i % len(hotel_ids)], "discount_type": "aarp",
+                  "prices": {"original": 200.0, "discounted": 180.0, "total": 207.0}}
+                 for i in range(batch_size)]
+        with Session() as db:
+            db_client = DatabaseClient(db)
+            while not stop.is_set():
+                try:
+                    written = db_client.create_results_bulk(search_id, batch)
+                    with lock:
+                        counts["rows_written"] += written
+                        counts["write_batches"] += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        counts["errors"] += 1
+
+    def reader(index):
+        with Session() as db:
+            db_client = DatabaseClient(db)
+            while not stop.is_set():
+                try:
+                    rows = db_client.get_result_rows_by_search(search_ids[index % len(search_ids)])
+                    db.rollback()  # End the read transaction so each read sees new rows
+                    with lock:
+                        counts["reads"] += 1
+                        counts["rows_read"] += len(rows)
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        counts["errors"] += 1
+
+    threads = [threading.Thread(target=writer, args=(search_id,)) for search_id in search_ids]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {key: value / seconds if key != "errors" else value for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file per profile)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in ("default", "tuned"):
+            url = args.url or f"sqlite:///{os.path.join(tmp, profile + '.db')}"
+            stats = stress(url, profile, args.seconds, args.writers, args.readers, args.batch_size)
+            print(f"{profile:>8}: {stats['rows_written']:.0f} rows/s written "
+                  f"({stats['write_batches']:.1f} batches/s), {stats['reads']:.1f} reads/s "
+                  f"({stats['rows_read']:.0f} rows/s read), {stats['errors']} lock errors")
+
+
+if __name__ == "__main__":
+    main()
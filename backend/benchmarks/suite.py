@@ -0,0 +1,277 @@
+"""Micro-benchmark suite with JSON output and regression checks.
+
+``run`` generates (or reuses) a synthetic data set for a tier, copies it to
+a scratch database and times:
+
+- every DatabaseClient method, against a representative search and hotel
+- GET /api/results/{id}, GET /api/results/{id}/summary and GET /api/searches
+  through an in-process ASGI client (no sockets, no server)
+- building a ResultsResponse from joined rows and serializing it to JSON
+
+Each benchmark runs once to warm up, then ``--repeat`` times; the median,
+p95 and min are written as JSON. In-process caches (catalog, price
+history) are warm after the warm-up run, so their benchmarks measure the
+cached path.
+
+``compare`` checks a run against a baseline and exits with status 1 if any
+benchmark's median got slower by more than ``--threshold``.
+
+Usage (from backend/):
+    python -m benchmarks.suite run --tier 100k --output bench-100k.json
+    python -m benchmarks.suite compare baseline.json bench-100k.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from benchmarks.datagen import TIERS, ensure_dataset
+
+TRACKED_METRIC = "median_ms"
+
+
+class Runner:
+    """Times callables and collects their stats by name"""
+
+    def __init__(self, repeat: int, only: str = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: Dict[str, dict] = {}
+
+    def _record(self, name: str, timings: list):
+        timings.sort()
+        self.results[name] = {
+            "median_ms": round(statistics.median(timings), 4),
+            "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 4),
+            "min_ms": round(timings[0], 4),
+            "runs": len(timings),
+        }
+        print(f"  {name:<48} {self.results[name]['median_ms']:>10.3f} ms", flush=True)
+
+    def skip(self, name: str) -> bool:
+        return self.only is not None and self.only not in name
+
+    def measure(self, name: str, fn: Callable[[], object]):
+        """Time a blocking callable"""
+        if self.skip(name):
+            return
+        fn()
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        self._record(name, timings)
+
+    async def measure_async(self, name: str, fn: Callable[[], object]):
+        """Time a coroutine function"""
+        if self.skip(name):
+            return
+        await fn()
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            await fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        self._record(name, timings)
+
+
+def bench_database_client(runner: Runner, manifest: dict):
+    """Every DatabaseClient method; writes go to the scratch copy"""
+    from shared.database import SessionLocal, DatabaseClient
+
+    search_id, hotel_id = manifest["search_id"], manifest["hotel_id"]
+    chain, city = manifest["chain"], manifest["city"]
+    prices = {"original": 200.0, "discounted": 180.0, "taxes": 27.0, "total": 207.0}
+    batch = [{"hotel_id": hotel_id, "discount_type": "aarp", "prices": prices}] * 100
+    counter = iter(range(10 ** 9))
+
+    with SessionLocal() as db:
+        c = DatabaseClient(db)
+        scratch = c.create_search("bench", city, "2026-02-01", "2026-02-03", 2).id
+
+        # Search operations
+        runner.measure("db.create_search", lambda: c.create_search("bench", city, "2026-02-01", "2026-02-03", 2))
+        runner.measure("db.get_search", lambda: (c.get_search(search_id), db.expire_all()))
+        runner.measure("db.list_searches", lambda: c.list_searches(limit=50))
+        runner.measure("db.update_search_status", lambda: c.update_search_status(scratch, "processing"))
+
+        # Summary operations
+        runner.measure("db.compute_search_summary", lambda: c.compute_search_summary(search_id))
+        runner.measure("db.save_search_summary", lambda: c.save_search_summary(search_id))
+        runner.measure("db.get_search_summary", lambda: (c.get_search_summary(search_id), db.expire_all()))
+
+        # Result operations
+        runner.measure("db.create_result", lambda: c.create_result(scratch, hotel_id, "aarp", prices))
+        runner.measure("db.create_results_bulk[100]", lambda: c.create_results_bulk(scratch, batch))
+
+        def write_with_writer():
+            with c.result_writer(scratch, chunk_size=50) as writer:
+                for _ in range(100):
+                    writer.add(hotel_id, "aaa", prices)
+        runner.measure("db.result_writer[100]", write_with_writer)
+
+        runner.measure("db.get_results_by_search", lambda: (c.get_results_by_search(search_id), db.expunge_all()))
+        runner.measure("db.get_result_rows_by_search", lambda: c.get_result_rows_by_search(search_id))
+        runner.measure("db.get_result_rows_after", lambda: c.get_result_rows_after(search_id, limit=50))
+        runner.measure("db.get_result_rows[price,limit=20]",
+                       lambda: c.get_result_rows(search_id, sort="price", limit=20))
+        runner.measure("db.get_result_rows[filtered,fields]", lambda: c.get_result_rows(
+            search_id, fields=["hotel_name", "total_price"], discount_types=["aarp", "aaa"],
+            chain=chain, available=True
+        ))
+
+        # Hotel operations
+        runner.measure("db.create_hotel", lambda: c.create_hotel(f"Bench Hotel {next(counter)}", chain, city="Bench"))
+        runner.measure("db.get_hotels", lambda: (c.get_hotels(), db.expunge_all()))
+        runner.measure("db.get_hotel", lambda: (c.get_hotel(hotel_id), db.expire_all()))
+        runner.measure("db.get_hotel_by_name_city", lambda: c.get_hotel_by_name_city(manifest["hotel_name"], city))
+        runner.measure("db.get_hotels_by_chain_city", lambda: c.get_hotels_by_chain_city(chain, city))
+        runner.measure("db.get_price_history[day]", lambda: c.get_price_history(hotel_id, bucket="day"))
+
+        # Discount code operations
+        runner.measure("db.get_discount_codes", lambda: c.get_discount_codes(chain, "aarp"))
+        runner.measure("db.create_discount_code",
+                       lambda: c.create_discount_code(f"BENCH{next(counter)}", "corporate", chain))
+
+
+async def bench_endpoints(runner: Runner, manifest: dict):
+    """Results and search listing endpoints through an in-process ASGI client"""
+    import httpx
+    from api.main import app
+
+    search_id = manifest["search_id"]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get(path):
+            response = await client.get(path)
+            response.raise_for_status()
+            return response
+
+        await runner.measure_async("api.get_results", lambda: get(f"/api/results/{search_id}"))
+        await runner.measure_async("api.get_results[price,limit=20]",
+                                   lambda: get(f"/api/results/{search_id}?sort=price&limit=20"))
+        await runner.measure_async("api.get_results_summary", lambda: get(f"/api/results/{search_id}/summary"))
+        await runner.measure_async("api.list_searches", lambda: get("/api/searches?limit=50"))
+
+
+def bench_serialization(runner: Runner, manifest: dict):
+    """ResultsResponse construction and JSON serialization"""
+    from api.routes.results import ResultsResponse, result_item
+    from shared.database import SessionLocal, DatabaseClient
+
+    with SessionLocal() as db:
+        c = DatabaseClient(db)
+        search = c.get_search(manifest["search_id"])
+        rows = c.get_result_rows_by_search(search.id)
+
+    def build():
+        return ResultsResponse(
+            search_id=search.id, status=search.status, location=search.location,
+            check_in=search.check_in_date, check_out=search.check_out_date, guests=search.guests,
+            result_count=len(rows), results=[result_item(row) for row in rows]
+        )
+
+    response = build()
+    runner.measure(f"serialize.build_results_response[{len(rows)}]", build)
+    runner.measure(f"serialize.model_dump_json[{len(rows)}]", response.model_dump_json)
+
+
+def run(args) -> dict:
+    path, manifest = ensure_dataset(args.tier, args.data_dir, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = os.path.join(tmp, "bench.db")
+        shutil.copyfile(path, scratch)
+        # Settings and engines are created at import, so point them at the copy first
+        os.environ["DATABASE_URL"] = f"sqlite:///{scratch}"
+        os.environ["DATABASE_ECHO"] = "false"
+
+        runner = Runner(args.repeat, args.only)
+        print(f"Tier {args.tier}: {manifest['results']} results, {manifest['searches']} searches")
+        bench_database_client(runner, manifest)
+        asyncio.run(bench_endpoints(runner, manifest))
+        bench_serialization(runner, manifest)
+
+    return {
+        "tier": args.tier,
+        "seed": args.seed,
+        "dataset": manifest,
+        "repeat": args.repeat,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": runner.results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = TRACKED_METRIC) -> list:
+    """Benchmarks whose metric grew by more than ``threshold`` (a fraction) over the baseline"""
+    regressions = []
+    for name, stats in sorted(current["benchmarks"].items()):
+        before = baseline["benchmarks"].get(name, {}).get(metric)
+        after = stats.get(metric)
+        if before is None or after is None:
+            print(f"  {name:<48} {'new':>10}")
+            continue
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSED" if change > threshold else ""
+        print(f"  {name:<48} {before:>10.3f} -> {after:>10.3f} ms {change:>+8.1%} {flag}")
+        if change > threshold:
+            regressions.append({"name": name, "baseline": before, "current": after, "change": change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and write JSON results")
+    run_parser.add_argument("--tier", choices=TIERS, default="1k")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--only", help="Only benchmarks whose name contains this")
+    run_parser.add_argument("--data-dir", default="./data/bench", help="Where generated data sets are kept")
+    run_parser.add_argument("--output", help="JSON file to write (default: stdout)")
+
+    compare_parser = commands.add_parser("compare", help="Fail if a run regressed against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Allowed slowdown as a fraction (0.2 = 20%%)")
+    compare_parser.add_argument("--metric", default=TRACKED_METRIC)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {args.output}")
+        else:
+            print(json.dumps(report, indent=2))
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get("tier") != current.get("tier"):
+        print(f"Warning: comparing tier {current.get('tier')} against baseline tier {baseline.get('tier')}")
+    regressions = compare(baseline, current, args.threshold, args.metric)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
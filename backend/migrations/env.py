@@ -0,0 +1,52 @@
+"""Alembic environment: runs migrations against settings.database_url"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from shared.config import settings
+from shared.models import Base
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL for the migrations instead of running them"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations on a connection (passed in by shared.schema, or a new one)"""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        from shared.storage import create_storage_engine
+
+        engine = create_storage_engine(settings.database_url)
+        with engine.connect() as connection:
+            _run(connection)
+        engine.dispose()
+    else:
+        _run(connection)
+
+
+def _run(connection):
+    # Batch mode lets ALTER-style operations work on SQLite
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
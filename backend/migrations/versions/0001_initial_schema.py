@@ -0,0 +1,137 @@
+"""Initial schema
+
+Creates every table and index as of the first versioned release. Databases
+created earlier by Base.metadata.create_all already have some or all of
+them, so existing tables and indexes are skipped and indexes since
+replaced are dropped; an existing database is brought up to this revision
+and then stamped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(inspector, name, *columns):
+    if not inspector.has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_index(inspector, name, table, columns, unique=False):
+    if name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    _create_table(
+        inspector, "hotels",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("chain", sa.String(), nullable=False),
+        sa.Column("address", sa.String()),
+        sa.Column("city", sa.String()),
+        sa.Column("state", sa.String()),
+        sa.Column("country", sa.String()),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("star_rating", sa.Float()),
+        sa.Column("amenities", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_index(inspector, "ix_hotels_name", "hotels", ["name"])
+    _create_index(inspector, "ix_hotels_chain", "hotels", ["chain"])
+    _create_index(inspector, "ix_hotels_city", "hotels", ["city"])
+    _create_index(inspector, "idx_chain_city", "hotels", ["chain", "city"])
+
+    _create_table(
+        inspector, "searches",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String()),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("check_in_date", sa.String(), nullable=False),
+        sa.Column("check_out_date", sa.String(), nullable=False),
+        sa.Column("guests", sa.Integer()),
+        sa.Column("filters", sa.JSON()),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    _create_index(inspector, "ix_searches_user_id", "searches", ["user_id"])
+    _create_index(inspector, "ix_searches_created_at", "searches", ["created_at"])
+    _create_index(inspector, "idx_user_created", "searches", ["user_id", "created_at"])
+    _create_index(inspector, "idx_created_id", "searches", ["created_at", "id"])
+
+    _create_table(
+        inspector, "search_summaries",
+        sa.Column("search_id", sa.String(), sa.ForeignKey("searches.id"), primary_key=True),
+        sa.Column("summary", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime()),
+    )
+
+    _create_table(
+        inspector, "results",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("search_id", sa.String(), sa.ForeignKey("searches.id"), nullable=False),
+        sa.Column("hotel_id", sa.String(), sa.ForeignKey("hotels.id"), nullable=False),
+        sa.Column("discount_type", sa.String(), nullable=False),
+        sa.Column("original_price", sa.Float()),
+        sa.Column("discounted_price", sa.Float()),
+        sa.Column("taxes", sa.Float()),
+        sa.Column("fees", sa.Float()),
+        sa.Column("total_price", sa.Float()),
+        sa.Column("currency", sa.String()),
+        sa.Column("available", sa.Boolean()),
+        sa.Column("raw_data", sa.JSON()),
+        sa.Column("scraped_at", sa.DateTime()),
+    )
+    _create_index(inspector, "ix_results_search_id", "results", ["search_id"])
+    _create_index(inspector, "ix_results_hotel_id", "results", ["hotel_id"])
+    _create_index(inspector, "ix_results_scraped_at", "results", ["scraped_at"])
+    _create_index(inspector, "idx_search_scraped_id", "results", ["search_id", "scraped_at", "id"])
+    _create_index(inspector, "idx_search_price_id", "results", ["search_id", "total_price", "id"])
+    _create_index(inspector, "idx_search_discount", "results", ["search_id", "discount_type"])
+    _create_index(inspector, "idx_hotel_scraped", "results", ["hotel_id", "scraped_at"])
+    _create_index(inspector, "idx_discount_type", "results", ["discount_type"])
+    # Superseded by idx_search_scraped_id; create_all databases still have it
+    op.drop_index("idx_search_scraped", table_name="results", if_exists=True)
+
+    _create_table(
+        inspector, "discount_codes",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("code", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("hotel_chain", sa.String(), nullable=False),
+        sa.Column("requirements", sa.String()),
+        sa.Column("active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_index(inspector, "ix_discount_codes_hotel_chain", "discount_codes", ["hotel_chain"])
+    _create_index(inspector, "idx_chain_type", "discount_codes", ["hotel_chain", "type"])
+
+    _create_table(
+        inspector, "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("memberships", sa.JSON()),
+        sa.Column("preferences", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_index(inspector, "ix_users_email", "users", ["email"], unique=True)
+
+
+def downgrade():
+    for table in ("users", "discount_codes", "results", "search_summaries", "searches", "hotels"):
+        op.drop_table(table)
@@ -0,0 +1,47 @@
+"""Job queue
+
+Adds the jobs table that scrape workers claim (search, hotel, discount)
+jobs from.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("search_id", sa.String(), sa.ForeignKey("searches.id"), nullable=False),
+        sa.Column("hotel_id", sa.String(), sa.ForeignKey("hotels.id"), nullable=False),
+        sa.Column("chain", sa.String(), nullable=False),
+        sa.Column("discount_type", sa.String(), nullable=False),
+        sa.Column("discount_code", sa.String()),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("lease_owner", sa.String()),
+        sa.Column("lease_expires_at", sa.DateTime()),
+        sa.Column("last_error", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_jobs_search_id", "jobs", ["search_id"])
+    op.create_index("idx_job_claim", "jobs", ["status", "priority", "run_after"])
+    op.create_index("idx_job_lease", "jobs", ["status", "lease_expires_at"])
+    op.create_index("idx_job_search_hotel_discount", "jobs", ["search_id", "hotel_id", "discount_type"], unique=True)
+
+
+def downgrade():
+    op.drop_table("jobs")
@@ -0,0 +1,33 @@
+"""Search versions
+
+Adds the change counter that result inserts and status changes bump on
+searches, and the version that added each result, for long polling.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("searches") as batch:
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("results") as batch:
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("idx_search_version", "results", ["search_id", "version"])
+
+
+def downgrade():
+    op.drop_index("idx_search_version", table_name="results")
+    with op.batch_alter_table("results") as batch:
+        batch.drop_column("version")
+    with op.batch_alter_table("searches") as batch:
+        batch.drop_column("version")
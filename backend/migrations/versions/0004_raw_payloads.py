@@ -0,0 +1,94 @@
+"""Raw payloads
+
+Moves results.raw_data into the raw_payloads table, compressed and stored
+once per distinct content, leaving results with the payload's hash.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from shared.raw_payloads import decode_payload, encode_payload
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    payloads = op.create_table(
+        "raw_payloads",
+        sa.Column("hash", sa.String(), primary_key=True),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    with op.batch_alter_table("results") as batch:
+        batch.add_column(sa.Column("raw_hash", sa.String()))
+
+    conn = op.get_bind()
+    results = sa.table("results", sa.column("id", sa.String()), sa.column("raw_data", sa.JSON()),
+                       sa.column("raw_hash", sa.String()))
+    stored = set()
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            sa.select(results.c.id, results.c.raw_data)
+            .where(results.c.id > last_id, results.c.raw_data.isnot(None))
+            .order_by(results.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        new, hashes = [], []
+        for row in rows:
+            raw_data = json.loads(row.raw_data) if isinstance(row.raw_data, str) else row.raw_data
+            if raw_data is None:
+                continue
+            payload = encode_payload(raw_data)
+            hashes.append({"result_id": row.id, "raw_hash": payload.hash})
+            if payload.hash not in stored:
+                stored.add(payload.hash)
+                new.append({"hash": payload.hash, "data": payload.data, "size": payload.size,
+                            "created_at": datetime.utcnow()})
+        if new:
+            conn.execute(payloads.insert(), new)
+        if hashes:
+            conn.execute(
+                results.update().where(results.c.id == sa.bindparam("result_id"))
+                .values(raw_hash=sa.bindparam("raw_hash")),
+                hashes
+            )
+
+    with op.batch_alter_table("results") as batch:
+        batch.drop_column("raw_data")
+        batch.create_foreign_key("fk_results_raw_hash", "raw_payloads", ["raw_hash"], ["hash"])
+    op.create_index("idx_result_raw_hash", "results", ["raw_hash"])
+
+
+def downgrade():
+    op.drop_index("idx_result_raw_hash", table_name="results")
+    with op.batch_alter_table("results") as batch:
+        batch.add_column(sa.Column("raw_data", sa.JSON()))
+
+    conn = op.get_bind()
+    payloads = sa.table("raw_payloads", sa.column("hash", sa.String()), sa.column("data", sa.LargeBinary()))
+    for row in conn.execute(sa.select(payloads.c.hash, payloads.c.data)).all():
+        conn.execute(
+            sa.text("UPDATE results SET raw_data = :raw_data WHERE raw_hash = :raw_hash"),
+            {"raw_data": json.dumps(decode_payload(row.data)), "raw_hash": row.hash}
+        )
+
+    with op.batch_alter_table("results") as batch:
+        batch.drop_constraint("fk_results_raw_hash", type_="foreignkey")
+        batch.drop_column("raw_hash")
+    op.drop_table("raw_payloads")
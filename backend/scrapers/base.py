@@ -0,0 +1,51 @@
+"""Base types shared by the scraping subsystem"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+
+class FetchError(Exception):
+    """Raised by a fetcher when a rate page could not be retrieved"""
+
+
+class RateLimitError(FetchError):
+    """Raised by a fetcher when the site throttles it (HTTP 429 and the like)"""
+
+    def __init__(self, message: str, retry_after_s: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s  # From Retry-After, if the site sent one
+
+
+@dataclass(frozen=True)
+class ScrapeJob:
+    """A single (hotel, discount code) rate lookup for a search"""
+    search_id: str
+    hotel_id: str
+    hotel_name: str
+    chain: str
+    city: Optional[str]
+    discount_type: str  # "none" for the baseline rate
+    discount_code: Optional[str]
+    check_in: str
+    check_out: str
+    guests: int
+
+
+class Fetcher(ABC):
+    """
+    Retrieves the rate for one scrape job.
+
+    Implementations return a price dict in the shape accepted by
+    DatabaseClient.create_result, or None when the hotel has no availability
+    for the job. Any other failure should raise (FetchError or otherwise);
+    the orchestrator records it and moves on.
+    """
+
+    @abstractmethod
+    async def fetch(self, job: ScrapeJob) -> Optional[dict]:
+        """Fetch the rate for a job"""
+        pass
+
+    async def close(self):
+        """Release any resources held by the fetcher"""
+        pass
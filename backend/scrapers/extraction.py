@@ -0,0 +1,283 @@
+"""Rate page extraction with precompiled lxml XPath selectors"""
+import os
+import re
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Union
+
+from lxml import etree, html
+
+from shared.config import settings
+
+from .base import Fetcher, ScrapeJob
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_AMOUNT = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements whose class attribute contains ``name``"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+@dataclass(frozen=True)
+class RatePageSpec:
+    """
+    Where the rates are on one chain's booking page.
+
+    ``offer_tag`` and ``offer_match`` locate a rate offer element (an XPath
+    predicate over that tag); every other selector is an XPath string
+    expression evaluated relative to the offer, and ``available`` a boolean
+    one. ``public_rate_code`` is the rate quoted when no discount code is
+    requested and the baseline for ``original``.
+    """
+    chain: str
+    offer_tag: str
+    offer_match: str
+    code: str
+    name: str
+    room: str
+    price: str
+    taxes: str
+    fees: str
+    currency: str
+    available: str
+    public_rate_code: str
+
+
+@dataclass(frozen=True)
+class Rate:
+    """One rate offer read from a booking page"""
+    code: str
+    name: str
+    room: str
+    nightly: Optional[float]
+    taxes: float
+    fees: float
+    currency: str
+    available: bool
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Parse a displayed amount such as '$1,189.00' or '189 USD'"""
+    match = _AMOUNT.search(text or "")
+    if not match:
+        return None
+    return float(match.group().replace(",", ""))
+
+
+def stay_nights(check_in: str, check_out: str) -> int:
+    """Number of nights between two YYYY-MM-DD dates (at least 1)"""
+    nights = (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days
+    return max(nights, 1)
+
+
+class RateExtractor:
+    """Compiled selectors for one RatePageSpec"""
+
+    def __init__(self, spec: RatePageSpec, iterparse_min_bytes: Optional[int] = None):
+        self.spec = spec
+        self.iterparse_min_bytes = (
+            settings.scraper_iterparse_min_bytes if iterparse_min_bytes is None else iterparse_min_bytes
+        )
+        self._offers = etree.XPath(f"//{spec.offer_tag}[{spec.offer_match}]")
+        self._is_offer = etree.XPath(f"boolean(self::{spec.offer_tag}[{spec.offer_match}])")
+        self._code = etree.XPath(f"normalize-space({spec.code})")
+        self._name = etree.XPath(f"normalize-space({spec.name})")
+        self._room = etree.XPath(f"normalize-space({spec.room})")
+        self._price = etree.XPath(f"string({spec.price})")
+        self._taxes = etree.XPath(f"string({spec.taxes})")
+        self._fees = etree.XPath(f"string({spec.fees})")
+        self._currency = etree.XPath(f"normalize-space({spec.currency})")
+        self._available = etree.XPath(f"boolean({spec.available})")
+
+    def _rate(self, offer) -> Rate:
+        nightly = parse_amount(self._price(offer))
+        return Rate(
+            code=self._code(offer),
+            name=self._name(offer),
+            room=self._room(offer),
+            nightly=nightly,
+            taxes=parse_amount(self._taxes(offer)) or 0.0,
+            fees=parse_amount(self._fees(offer)) or 0.0,
+            currency=self._currency(offer) or "USD",
+            available=nightly is not None and self._available(offer),
+        )
+
+    def rates(self, page: Union[bytes, str], incremental: Optional[bool] = None) -> List[Rate]:
+        """
+        Every rate offer on a page, in page order.
+
+        Large pages (``iterparse_min_bytes``) are parsed incrementally unless
+        ``incremental`` says otherwise.
+        """
+        if isinstance(page, str):
+            page = page.encode("utf-8")
+        if incremental is None:
+            incremental = len(page) >= self.iterparse_min_bytes
+        if not page.strip():
+            return []
+        if not incremental:
+            return [self._rate(offer) for offer in self._offers(html.document_fromstring(page))]
+
+        rates = []
+        for _, element in etree.iterparse(BytesIO(page), events=("end",), tag=self.spec.offer_tag, html=True):
+            if not self._is_offer(element):
+                continue
+            rates.append(self._rate(element))
+            # Offers are complete once closed: drop them and any siblings already read
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return rates
+
+    def extract(self, page: Union[bytes, str], rate_code: Optional[str] = None, nights: int = 1,
+                incremental: Optional[bool] = None) -> Optional[dict]:
+        """
+        Price dict (as taken by DatabaseClient.create_result) for a rate code.
+
+        Picks the cheapest bookable offer with the code across room types,
+        and the cheapest bookable public rate as ``original``. Taxes and
+        fees are as listed for the stay; ``total`` is the nightly rate times
+        ``nights`` plus both. Returns None when the code is not offered or
+        sold out.
+        """
+        rate_code = rate_code or self.spec.public_rate_code
+        best = public = None
+        for rate in self.rates(page, incremental):
+            if not rate.available:
+                continue
+            if rate.code == rate_code and (best is None or rate.nightly < best.nightly):
+                best = rate
+            if rate.code == self.spec.public_rate_code and (public is None or rate.nightly < public.nightly):
+                public = rate
+        if best is None:
+            return None
+
+        original = public.nightly if public is not None else best.nightly
+        return {
+            "original": original,
+            "discounted": best.nightly,
+            "taxes": best.taxes,
+            "fees": best.fees,
+            "total": round(best.nightly * nights + best.taxes + best.fees, 2),
+            "currency": best.currency,
+            "raw_data": {
+                "rate_code": best.code,
+                "rate_name": best.name,
+                "room": best.room,
+                "nights": nights,
+            },
+        }
+
+
+SPECS: Dict[str, RatePageSpec] = {
+    # Rate cards grouped under each room type, code in a data attribute
+    "Marriott": RatePageSpec(
+        chain="Marriott",
+        offer_tag="div",
+        offer_match=has_class("room-rate-card"),
+        code="@data-rate-code",
+        name=f".//*[{has_class('rate-name')}]",
+        room=f"ancestor::section[{has_class('room-type')}][1]//h3",
+        price=f".//span[{has_class('rate-price')}]",
+        taxes=f".//span[{has_class('taxes')}]",
+        fees=f".//span[{has_class('fees')}]",
+        currency=f".//span[{has_class('rate-price')}]/@data-currency",
+        available=f"not({has_class('sold-out')})",
+        public_rate_code="BAR",
+    ),
+    # List items with the code in the id and charges in a definition list
+    "Hilton": RatePageSpec(
+        chain="Hilton",
+        offer_tag="li",
+        offer_match=has_class("rate"),
+        code="substring-after(@id, 'rate-')",
+        name=".//h4",
+        room="ancestor::div[@data-room-name][1]/@data-room-name",
+        price=f".//p[{has_class('price')}]/span[{has_class('amount')}]",
+        taxes=f".//dd[{has_class('tax')}]",
+        fees=f".//dd[{has_class('fee')}]",
+        currency=f".//p[{has_class('price')}]/span[{has_class('currency')}]",
+        available=f"not({has_class('rate--unavailable')})",
+        public_rate_code="FLEX",
+    ),
+    # Rate cards with machine-readable amounts in data attributes
+    "IHG": RatePageSpec(
+        chain="IHG",
+        offer_tag="div",
+        offer_match=has_class("rateCard"),
+        code="@data-ratecode",
+        name=f".//*[{has_class('rateCard__name')}]",
+        room=f"ancestor::article[{has_class('roomCard')}][1]/@data-room",
+        price=f".//span[{has_class('rateCard__price')}]/@data-price",
+        taxes=f".//span[{has_class('rateCard__taxes')}]/@data-amount",
+        fees=f".//span[{has_class('rateCard__fees')}]/@data-amount",
+        currency=f".//span[{has_class('rateCard__price')}]/@data-currency",
+        available=f".//span[{has_class('rateCard__availability')}]/@data-available = 'true'",
+        public_rate_code="IGCOR",
+    ),
+}
+
+_extractors: Dict[str, RateExtractor] = {}
+
+
+def get_extractor(chain: str) -> RateExtractor:
+    """The compiled extractor for a chain (KeyError for chains without a spec)"""
+    extractor = _extractors.get(chain)
+    if extractor is None:
+        extractor = _extractors[chain] = RateExtractor(SPECS[chain])
+    return extractor
+
+
+def fixture_pages(chain: Optional[str] = None) -> List[str]:
+    """Paths of the saved rate page fixtures, for one chain or all of them"""
+    chains: Iterable[str] = [chain] if chain else SPECS
+    paths = []
+    for name in chains:
+        directory = os.path.join(FIXTURES_DIR, name.lower())
+        if os.path.isdir(directory):
+            paths += sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".html"))
+    return paths
+
+
+class PageFetcher(Fetcher):
+    """
+    Fetcher that retrieves a chain's rate page and extracts the job's rate.
+
+    Subclasses implement ``fetch_page``; extraction (on the parse pool, off
+    the event loop), the nights of the stay and the None-when-unavailable
+    contract are handled here.
+    """
+
+    def __init__(self, chain: str, extractor: Optional[RateExtractor] = None):
+        self.chain = chain
+        self.extractor = extractor or get_extractor(chain)
+
+    @abstractmethod
+    async def fetch_page(self, job: ScrapeJob) -> bytes:
+        """Retrieve the rate page for a job"""
+        pass
+
+    async def fetch(self, job: ScrapeJob) -> Optional[dict]:
+        from .parse_pool import get_parse_pool
+
+        page = await self.fetch_page(job)
+        nights = stay_nights(job.check_in, job.check_out)
+        return await get_parse_pool().extract(self.extractor.spec, page, job.discount_code, nights)
+
+
+class FixturePageFetcher(PageFetcher):
+    """Serves a saved page from the fixtures corpus for every job, for offline runs"""
+
+    def __init__(self, chain: str, page: str = "standard.html"):
+        super().__init__(chain)
+        with open(os.path.join(FIXTURES_DIR, chain.lower(), page), "rb") as f:
+            self.page = f.read()
+
+    async def fetch_page(self, job: ScrapeJob) -> bytes:
+        return self.page
@@ -0,0 +1,159 @@
+"""Offline stand-in sites served over local HTTP, and a fetcher that scrapes them"""
+import asyncio
+import json
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from .base import Fetcher, FetchError, RateLimitError, ScrapeJob
+from .fake_site import FakeSiteFetcher
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+           503: "Service Unavailable"}
+JOB_PARAMS = ("hotel_id", "hotel_name", "city", "discount_type", "discount_code", "check_in", "check_out")
+
+
+class FakeSiteServer:
+    """
+    HTTP/1.1 server on localhost answering ``GET /rates`` like a FakeSiteFetcher.
+
+    The query string carries the job's fields. A price dict (or ``null``
+    when sold out) comes back as JSON with 200; throttling is a 429 with
+    Retry-After and simulated errors are 503s. Connections are kept alive,
+    as an HTTP client pool expects.
+
+    Example:
+        async with FakeSiteServer(FakeSiteFetcher(capacity_rps=10), "Hilton") as server:
+            fetcher = HttpSiteFetcher(server.url)
+    """
+
+    def __init__(self, site: FakeSiteFetcher, chain: str, host: str = "127.0.0.1", port: int = 0):
+        self.site = site
+        self.chain = chain
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeSiteServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                # GET requests only; a body would be skipped here
+                if int(headers.get("content-length") or 0):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, body, extra = await self._respond(request_line.decode("latin-1"))
+                payload = json.dumps(body).encode()
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", "Content-Type: application/json",
+                        f"Content-Length: {len(payload)}", *extra]
+                writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Shutting down mid-request; the client has gone (Python 3.11
+            # streams log a cancelled handler as an error)
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request_line: str):
+        """Status, JSON body and extra headers for one request"""
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            return 400, {"error": "Malformed request line"}, []
+        url = urlsplit(target)
+        if method != "GET" or url.path != "/rates":
+            return 404, {"error": f"No route for {method} {url.path}"}, []
+
+        params = dict(parse_qsl(url.query))
+        try:
+            job = ScrapeJob(search_id="", chain=self.chain, guests=int(params.get("guests", 1)),
+                            **{name: params.get(name) for name in JOB_PARAMS})
+        except ValueError:
+            return 400, {"error": "Invalid guests"}, []
+        try:
+            return 200, await self.site.fetch(job), []
+        except RateLimitError as e:
+            retry_after = [f"Retry-After: {e.retry_after_s:g}"] if e.retry_after_s else []
+            return 429, {"error": str(e)}, retry_after
+        except FetchError as e:
+            return 503, {"error": str(e)}, []
+
+
+class HttpSiteFetcher(Fetcher):
+    """
+    Fetches rates from a FakeSiteServer over HTTP.
+
+    A 429 raises RateLimitError with the Retry-After seconds, other error
+    statuses raise FetchError, and a request taking longer than
+    ``timeout_s`` raises asyncio.TimeoutError, so rate control sees the same
+    signals it would from a real site.
+    """
+
+    def __init__(self, base_url: str, timeout_s: float = 10.0, max_connections: int = 100):
+        self.base_url = base_url
+        self.timeout_s = timeout_s
+        self._client = httpx.AsyncClient(
+            base_url=base_url, timeout=timeout_s,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def fetch(self, job: ScrapeJob) -> Optional[dict]:
+        params = {name: getattr(job, name) for name in JOB_PARAMS if getattr(job, name) is not None}
+        params["guests"] = job.guests
+        try:
+            response = await self._client.get("/rates", params=params)
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(f"{job.chain} did not answer within {self.timeout_s:g}s") from e
+        except httpx.HTTPError as e:
+            raise FetchError(f"Fetching {job.chain} rate for {job.hotel_name} failed: {e}") from e
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            try:
+                retry_after_s = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after_s = None
+            raise RateLimitError(f"429 from {job.chain}", retry_after_s)
+        if response.status_code != 200:
+            raise FetchError(f"HTTP {response.status_code} from {job.chain} for {job.hotel_name}")
+        return response.json()
+
+    async def close(self):
+        await self._client.aclose()
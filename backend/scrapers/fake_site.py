@@ -0,0 +1,103 @@
+"""Offline stand-in for hotel booking sites"""
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+from typing import Optional
+
+from .base import Fetcher, FetchError, RateLimitError, ScrapeJob
+
+
+# Typical discount off the public rate for each program
+DISCOUNT_RATES = {
+    "none": 0.0,
+    "aarp": 0.10,
+    "aaa": 0.08,
+    "senior": 0.12,
+    "military": 0.15,
+    "government": 0.10,
+    "corporate": 0.05,
+}
+
+TAX_RATE = 0.15
+NIGHTLY_FEE = 25.0
+
+
+def _stable_fraction(*parts: str) -> float:
+    """Map the given strings to a stable float in [0, 1)"""
+    digest = hashlib.sha1("|".join(parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+class FakeSiteFetcher(Fetcher):
+    """
+    Simulated rate page for a hotel chain.
+
+    Latency is drawn from a log-normal distribution around ``latency_ms`` so
+    there is a realistic long tail; ``error_rate`` of requests raise
+    FetchError and ``unavailable_rate`` of hotel/date combinations are sold
+    out. Prices depend only on the job, so repeated runs agree.
+
+    With ``capacity_rps``, requests over that rate in the last second are
+    answered with RateLimitError (a 429 with Retry-After ``retry_after_s``),
+    and latency grows as load approaches capacity, as a queue would.
+    """
+
+    def __init__(self, latency_ms: float = 50.0, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, unavailable_rate: float = 0.0,
+                 capacity_rps: Optional[float] = None, retry_after_s: Optional[float] = 1.0,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.unavailable_rate = unavailable_rate
+        self.capacity_rps = capacity_rps
+        self.retry_after_s = retry_after_s
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._recent = deque()  # Arrival times of the requests in the last second
+
+    def quote(self, job: ScrapeJob) -> Optional[dict]:
+        """Compute the price dict for a job without any simulated delay"""
+        if _stable_fraction(job.hotel_id, job.check_in, job.check_out, "availability") < self.unavailable_rate:
+            return None
+
+        base_price = 120.0 + round(_stable_fraction(job.hotel_id, job.check_in) * 280.0, 2)
+        discount = DISCOUNT_RATES.get(job.discount_type, 0.05)
+        discounted_price = round(base_price * (1 - discount), 2)
+        taxes = round(discounted_price * TAX_RATE, 2)
+        return {
+            "original": base_price,
+            "discounted": discounted_price,
+            "taxes": taxes,
+            "fees": NIGHTLY_FEE,
+            "total": round(discounted_price + taxes + NIGHTLY_FEE, 2),
+            "currency": "USD",
+        }
+
+    def _load(self) -> float:
+        """Requests in the last second as a fraction of capacity, counting this one"""
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent[0] < now - 1.0:
+            self._recent.popleft()
+        return len(self._recent) / self.capacity_rps
+
+    async def fetch(self, job: ScrapeJob) -> Optional[dict]:
+        self.requests += 1
+        slowdown = 1.0
+        if self.capacity_rps:
+            load = self._load()
+            if load > 1.0:
+                self.throttled += 1
+                await asyncio.sleep(self.latency_ms / 4000)
+                raise RateLimitError(f"Simulated 429 from {job.chain}", self.retry_after_s)
+            slowdown = 1 / (1 - min(load, 0.9))
+        if self.latency_ms > 0:
+            delay = self._random.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+            await asyncio.sleep(delay * slowdown)
+        if self._random.random() < self.error_rate:
+            raise FetchError(f"Simulated error fetching {job.chain} rate for {job.hotel_name}")
+        return self.quote(job)
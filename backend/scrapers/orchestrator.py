@@ -0,0 +1,239 @@
+"""Asyncio orchestration of the scraping fan-out for a search"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.config import settings
+from shared.database import SessionLocal, DatabaseClient
+
+from .base import Fetcher, ScrapeJob
+from .fake_site import FakeSiteFetcher
+from .rate_control import RateControl, get_rate_control
+
+
+logger = logging.getLogger(__name__)
+
+# Chains served by the offline stand-in sites when SCRAPER_FAKE_SITES is on
+FAKE_SITE_CHAINS = ["Marriott", "Hilton", "IHG"]
+
+_registered_fetchers: Dict[str, Fetcher] = {}
+
+
+def register_fetcher(chain: str, fetcher: Fetcher):
+    """Register the fetcher used for a hotel chain"""
+    _registered_fetchers[chain] = fetcher
+
+
+def get_fetchers() -> Dict[str, Fetcher]:
+    """Fetchers to use for new searches, keyed by chain"""
+    if _registered_fetchers:
+        return dict(_registered_fetchers)
+    if settings.scraper_fake_sites:
+        return {chain: FakeSiteFetcher() for chain in FAKE_SITE_CHAINS}
+    return {}
+
+
+def search_city(location: str) -> str:
+    """Extract the city from a free-text location such as 'New York, NY'"""
+    return location.split(",")[0].strip()
+
+
+def search_hotels(db_client: DatabaseClient, search, chain: str, located: list = None) -> list:
+    """
+    A chain's hotels for a search: those within the search's radius (nearest
+    first, up to SEARCH_MAX_HOTELS_PER_CHAIN) when it has coordinates, else
+    those its location resolved to (``located``, see
+    DatabaseClient.resolve_location), else those in the city it names.
+    """
+    near = (search.filters or {}).get("near")
+    if near:
+        return [hotel for _, hotel in db_client.get_hotels_near(
+            near["latitude"], near["longitude"], near["radius_km"],
+            chain=chain, limit=settings.search_max_hotels_per_chain
+        )]
+    if located:
+        return [hotel for hotel in located if hotel.chain == chain]
+    return db_client.get_hotels_by_chain_city(chain, search_city(search.location))
+
+
+def plan_jobs(db_client: DatabaseClient, search, chains: Iterable[str]) -> List[ScrapeJob]:
+    """Expand a search into (hotel, discount code) jobs for the given chains"""
+    requested = (search.filters or {}).get("discount_types") or []
+    discount_types = ["none"] + [t for t in dict.fromkeys(requested) if t != "none"]
+    # Resolved once for all chains (radius searches don't use it)
+    located = None
+    if not (search.filters or {}).get("near"):
+        located = db_client.resolve_location(search.location)
+
+    jobs = []
+    for chain in chains:
+        hotels = search_hotels(db_client, search, chain, located)
+        if not hotels:
+            continue
+
+        # One code lookup per (chain, type); types without a code are skipped
+        codes = {"none": None}
+        for discount_type in discount_types[1:]:
+            chain_codes = db_client.get_discount_codes(chain, discount_type)
+            if chain_codes:
+                codes[discount_type] = chain_codes[0].code
+
+        for hotel in hotels:
+            for discount_type, code in codes.items():
+                jobs.append(ScrapeJob(
+                    search_id=search.id,
+                    hotel_id=hotel.id,
+                    hotel_name=hotel.name,
+                    chain=chain,
+                    city=hotel.city,
+                    discount_type=discount_type,
+                    discount_code=code,
+                    check_in=search.check_in_date,
+                    check_out=search.check_out_date,
+                    guests=search.guests
+                ))
+    return jobs
+
+
+@dataclass
+class ScrapeReport:
+    """Outcome and timing of one orchestrated search"""
+    search_id: str
+    status: str = "pending"
+    jobs: int = 0
+    succeeded: int = 0
+    unavailable: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    results_written: int = 0
+    duration_s: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Fetch latency at the given percentile (0-100), in milliseconds"""
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def jobs_per_second(self) -> float:
+        return self.jobs / self.duration_s if self.duration_s else 0.0
+
+
+class ScrapeOrchestrator:
+    """
+    Runs the scrape jobs for a search with bounded concurrency.
+
+    An orchestrator runs one search at a time; create one per search.
+    """
+
+    def __init__(self, fetchers: Dict[str, Fetcher],
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 max_concurrency: int = None, rate_control: RateControl = None,
+                 timeout_s: float = None, batch_size: int = None):
+        self.fetchers = fetchers
+        self.session_factory = session_factory
+        self.max_concurrency = max_concurrency or settings.max_concurrent_scrapers
+        self.rate_control = rate_control or get_rate_control()
+        self.timeout_s = timeout_s if timeout_s is not None else settings.scraper_timeout / 1000
+        self.batch_size = batch_size or settings.result_write_chunk_size
+
+    def plan_jobs(self, db_client: DatabaseClient, search) -> List[ScrapeJob]:
+        """Expand a search into (hotel, discount code) jobs"""
+        return plan_jobs(db_client, search, self.fetchers)
+
+    async def run(self, search_id: str) -> ScrapeReport:
+        """Scrape every job for a search and move it to completed or failed"""
+        report = ScrapeReport(search_id=search_id)
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            db_client = DatabaseClient(db)
+            jobs = await asyncio.to_thread(self._start, db_client, search_id)
+            report.jobs = len(jobs)
+
+            self._buffer: List[dict] = []
+            self._flush_lock = asyncio.Lock()
+            self._global_limit = asyncio.Semaphore(self.max_concurrency)
+
+            await asyncio.gather(*(self._run_job(job, db_client, report) for job in jobs))
+            await self._flush(db_client, report)
+
+            fetched = report.succeeded + report.unavailable
+            report.status = "failed" if jobs and not fetched else "completed"
+            await asyncio.to_thread(db_client.update_search_status, search_id, report.status)
+
+        except Exception:
+            logger.exception("Scraping search %s failed", search_id)
+            report.status = "failed"
+            db.rollback()
+            await asyncio.to_thread(db_client.update_search_status, search_id, "failed")
+        finally:
+            db.close()
+            report.duration_s = time.perf_counter() - started
+
+        return report
+
+    def _start(self, db_client: DatabaseClient, search_id: str) -> List[ScrapeJob]:
+        """Mark the search as processing and plan its jobs"""
+        search = db_client.update_search_status(search_id, "processing")
+        if not search:
+            raise ValueError(f"Search {search_id} not found")
+        return self.plan_jobs(db_client, search)
+
+    async def _run_job(self, job: ScrapeJob, db_client: DatabaseClient, report: ScrapeReport):
+        """Fetch one job within the chain's rate control and the global concurrency limit"""
+        fetcher = self.fetchers[job.chain]
+        try:
+            async with self.rate_control.request(job.chain) as request:
+                async with self._global_limit:
+                    request.start()
+                    started = time.perf_counter()
+                    try:
+                        prices = await asyncio.wait_for(fetcher.fetch(job), self.timeout_s)
+                    finally:
+                        report.latencies_ms.append((time.perf_counter() - started) * 1000)
+        except asyncio.TimeoutError:
+            report.timed_out += 1
+            logger.warning("Timed out fetching %s (%s)", job.hotel_name, job.discount_type)
+            return
+        except Exception as e:
+            report.failed += 1
+            logger.warning("Failed fetching %s (%s): %s", job.hotel_name, job.discount_type, e)
+            return
+
+        if prices is None:
+            report.unavailable += 1
+        else:
+            report.succeeded += 1
+        self._buffer.append({
+            "hotel_id": job.hotel_id,
+            "discount_type": job.discount_type,
+            "prices": prices or {},
+            "available": prices is not None,
+        })
+        if len(self._buffer) >= self.batch_size:
+            await self._flush(db_client, report)
+
+    async def _flush(self, db_client: DatabaseClient, report: ScrapeReport):
+        """Write buffered results in a worker thread, one batch at a time"""
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if batch:
+                report.results_written += await asyncio.to_thread(
+                    db_client.create_results_bulk, report.search_id, batch
+                )
+
+
+async def run_search(search_id: str) -> Optional[ScrapeReport]:
+    """Scrape a search with the registered fetchers, if there are any"""
+    fetchers = get_fetchers()
+    if not fetchers:
+        return None
+    return await ScrapeOrchestrator(fetchers).run(search_id)
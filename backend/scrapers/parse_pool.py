@@ -0,0 +1,91 @@
+"""Process pool for rate page extraction"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from shared.config import settings
+
+from .extraction import RateExtractor, RatePageSpec
+
+
+# (spec, page, rate code, nights)
+ExtractTask = Tuple[RatePageSpec, bytes, Optional[str], int]
+
+_compiled: Dict[RatePageSpec, RateExtractor] = {}
+
+
+def extract_page(spec: RatePageSpec, page: bytes, rate_code: Optional[str], nights: int) -> Optional[dict]:
+    """Extract one page's price dict, compiling the spec's selectors on first use in this process"""
+    extractor = _compiled.get(spec)
+    if extractor is None:
+        extractor = _compiled[spec] = RateExtractor(spec)
+    return extractor.extract(page, rate_code, nights)
+
+
+def extract_pages(tasks: List[ExtractTask]) -> List[Optional[dict]]:
+    """Extract a batch of pages in one round trip to a pool process"""
+    return [extract_page(*task) for task in tasks]
+
+
+def default_parse_workers() -> int:
+    """One process per core beyond the one the event loop runs on"""
+    return max((os.cpu_count() or 1) - 1, 0)
+
+
+class ParsePool:
+    """Extraction on ``workers`` processes, or in a thread with zero workers"""
+
+    def __init__(self, workers: int = None):
+        self.workers = default_parse_workers() if workers is None else workers
+        self._executor = None
+        if self.workers > 0:
+            # Spawned rather than forked: callers run threads (asyncio.to_thread,
+            # connection pools) that a fork would copy mid-flight
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    async def extract(self, spec: RatePageSpec, page: Union[bytes, str], rate_code: Optional[str] = None,
+                      nights: int = 1) -> Optional[dict]:
+        """Price dict for a rate code on a page (see RateExtractor.extract)"""
+        if isinstance(page, str):
+            page = page.encode("utf-8")
+        if self._executor is None:
+            return await asyncio.to_thread(extract_page, spec, page, rate_code, nights)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, extract_page, spec, page, rate_code, nights)
+
+    def extract_many(self, tasks: Iterable[ExtractTask], batch_size: int = 8) -> List[Optional[dict]]:
+        """Extract many pages, ``batch_size`` per round trip, in task order"""
+        tasks = [(spec, page.encode("utf-8") if isinstance(page, str) else page, code, nights)
+                 for spec, page, code, nights in tasks]
+        if self._executor is None:
+            return extract_pages(tasks)
+        batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+        return [prices for batch in self._executor.map(extract_pages, batches) for prices in batch]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[ParsePool] = None
+
+
+def get_parse_pool() -> ParsePool:
+    """The process-wide parse pool, started on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ParsePool(settings.scraper_parse_workers)
+    return _pool
+
+
+def close_parse_pool():
+    """Stop the process-wide parse pool, if it was started"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -0,0 +1,359 @@
+"""Adaptive per-chain rate control for scraping: a token bucket and AIMD concurrency limit per chain"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from shared.config import settings
+
+from .base import RateLimitError
+
+
+logger = logging.getLogger(__name__)
+
+# Response signals fed back to the store
+FAST, CONGESTED = "fast", "congested"
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Tuning of the rate control; defaults come from settings"""
+    initial_rps: float
+    min_rps: float
+    max_rps: float
+    burst: float
+    increase_rps: float
+    backoff: float
+    cooldown_s: float
+    max_concurrency: int
+    slow_s: float
+
+    @classmethod
+    def from_settings(cls) -> "RateLimits":
+        return cls(
+            initial_rps=settings.scraper_rate_initial_rps,
+            min_rps=settings.scraper_rate_min_rps,
+            max_rps=settings.scraper_rate_max_rps,
+            burst=settings.scraper_rate_burst,
+            increase_rps=settings.scraper_rate_increase_rps,
+            backoff=settings.scraper_rate_backoff,
+            cooldown_s=settings.scraper_rate_cooldown_ms / 1000,
+            max_concurrency=settings.max_concurrent_per_chain,
+            slow_s=settings.scraper_slow_response_ms / 1000,
+        )
+
+
+@dataclass
+class ChainRate:
+    """Bucket and limits of one chain, as kept by a RateStore"""
+    rps: float
+    concurrency: float
+    tokens: float
+    updated: float  # Wall clock of the last refill, comparable across hosts
+    paused_until: float = 0.0
+    backed_off_at: float = 0.0
+
+
+class RateStore(ABC):
+    """Where the chains' buckets and limits live"""
+
+    @abstractmethod
+    async def take(self, chain: str, limits: RateLimits, now: float) -> Tuple[float, float]:
+        """
+        Reserve a token from a chain's bucket.
+
+        Returns the seconds to wait before using it (0 when one is free) and
+        the chain's current concurrency limit.
+        """
+        pass
+
+    @abstractmethod
+    async def feedback(self, chain: str, limits: RateLimits, now: float, signal: str,
+                       retry_after_s: Optional[float] = None) -> Tuple[float, float]:
+        """Adjust a chain for one FAST or CONGESTED response; returns (rps, concurrency)"""
+        pass
+
+
+def _initial(limits: RateLimits, now: float) -> ChainRate:
+    return ChainRate(rps=limits.initial_rps, concurrency=1.0, tokens=limits.burst, updated=now)
+
+
+class InMemoryRateStore(RateStore):
+    """Limits of the chains scraped by this process"""
+
+    def __init__(self):
+        self._chains: Dict[str, ChainRate] = {}
+
+    def _state(self, chain: str, limits: RateLimits, now: float) -> ChainRate:
+        state = self._chains.get(chain)
+        if state is None:
+            state = self._chains[chain] = _initial(limits, now)
+        return state
+
+    async def take(self, chain: str, limits: RateLimits, now: float) -> Tuple[float, float]:
+        state = self._state(chain, limits, now)
+        state.tokens = min(limits.burst, state.tokens + max(0.0, now - state.updated) * state.rps) - 1
+        state.updated = now
+        wait_s = -state.tokens / state.rps if state.tokens < 0 else 0.0
+        return max(wait_s, state.paused_until - now), state.concurrency
+
+    async def feedback(self, chain: str, limits: RateLimits, now: float, signal: str,
+                       retry_after_s: Optional[float] = None) -> Tuple[float, float]:
+        state = self._state(chain, limits, now)
+        if signal == FAST:
+            state.rps = min(limits.max_rps, state.rps + limits.increase_rps / state.rps)
+            state.concurrency = min(limits.max_concurrency, state.concurrency + 1 / state.concurrency)
+        else:
+            if now - state.backed_off_at >= limits.cooldown_s:
+                state.rps = max(limits.min_rps, state.rps * limits.backoff)
+                state.concurrency = max(1.0, state.concurrency * limits.backoff)
+                state.backed_off_at = now
+            if retry_after_s:
+                state.paused_until = max(state.paused_until, now + retry_after_s)
+        return state.rps, state.concurrency
+
+
+# KEYS[1]: chain hash; ARGV: now, initial_rps, burst, ttl_s
+_TAKE_SCRIPT = """
+local s = redis.call('HMGET', KEYS[1], 'rps', 'concurrency', 'tokens', 'updated', 'paused_until')
+local now, burst = tonumber(ARGV[1]), tonumber(ARGV[3])
+local rps = tonumber(s[1]) or tonumber(ARGV[2])
+local concurrency = tonumber(s[2]) or 1
+local tokens = tonumber(s[3]) or burst
+local updated = tonumber(s[4]) or now
+local paused_until = tonumber(s[5]) or 0
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rps) - 1
+redis.call('HSET', KEYS[1], 'rps', rps, 'concurrency', concurrency, 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local wait = 0
+if tokens < 0 then wait = -tokens / rps end
+return {tostring(math.max(wait, paused_until - now)), tostring(concurrency)}
+"""
+
+# KEYS[1]: chain hash; ARGV: now, signal, retry_after_s, initial_rps, min_rps, max_rps,
+# increase_rps, backoff, cooldown_s, max_concurrency
+_FEEDBACK_SCRIPT = """
+local s = redis.call('HMGET', KEYS[1], 'rps', 'concurrency', 'paused_until', 'backed_off_at')
+local now = tonumber(ARGV[1])
+local rps = tonumber(s[1]) or tonumber(ARGV[4])
+local concurrency = tonumber(s[2]) or 1
+local paused_until = tonumber(s[3]) or 0
+local backed_off_at = tonumber(s[4]) or 0
+if ARGV[2] == 'fast' then
+    rps = math.min(tonumber(ARGV[6]), rps + tonumber(ARGV[7]) / rps)
+    concurrency = math.min(tonumber(ARGV[10]), concurrency + 1 / concurrency)
+else
+    if now - backed_off_at >= tonumber(ARGV[9]) then
+        rps = math.max(tonumber(ARGV[5]), rps * tonumber(ARGV[8]))
+        concurrency = math.max(1, concurrency * tonumber(ARGV[8]))
+        backed_off_at = now
+    end
+    local retry_after = tonumber(ARGV[3])
+    if retry_after > 0 then paused_until = math.max(paused_until, now + retry_after) end
+end
+redis.call('HSET', KEYS[1], 'rps', rps, 'concurrency', concurrency,
+           'paused_until', paused_until, 'backed_off_at', backed_off_at)
+return {tostring(rps), tostring(concurrency)}
+"""
+
+
+class RedisRateStore(RateStore):
+    """Limits shared by every worker through one Redis hash per chain"""
+
+    def __init__(self, client=None, prefix: str = "rate:", ttl_s: int = 86400):
+        if client is None:
+            import redis.asyncio as aioredis
+            client = aioredis.Redis.from_url(settings.redis_url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_s = ttl_s
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._feedback = client.register_script(_FEEDBACK_SCRIPT)
+
+    async def take(self, chain: str, limits: RateLimits, now: float) -> Tuple[float, float]:
+        wait_s, concurrency = await self._take(
+            keys=[self.prefix + chain], args=[now, limits.initial_rps, limits.burst, self.ttl_s]
+        )
+        return float(wait_s), float(concurrency)
+
+    async def feedback(self, chain: str, limits: RateLimits, now: float, signal: str,
+                       retry_after_s: Optional[float] = None) -> Tuple[float, float]:
+        rps, concurrency = await self._feedback(keys=[self.prefix + chain], args=[
+            now, signal, retry_after_s or 0, limits.initial_rps, limits.min_rps, limits.max_rps,
+            limits.increase_rps, limits.backoff, limits.cooldown_s, limits.max_concurrency,
+        ])
+        return float(rps), float(concurrency)
+
+
+@dataclass
+class ChainStats:
+    """What this process sent to one chain, and the limits it last saw"""
+    requests: int = 0
+    fast: int = 0
+    slow: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    rps_limit: float = 0.0
+    concurrency_limit: float = 1.0
+    finished: Deque[float] = field(default_factory=deque, repr=False)  # Monotonic times, last window
+
+
+class RateRequest:
+    """One request to a chain; see RateControl.request"""
+
+    def __init__(self, control: "RateControl", chain: str):
+        self.control = control
+        self.chain = chain
+        self.started = None
+
+    def start(self):
+        """Start timing the response here rather than when the request was let through"""
+        self.started = self.control.monotonic()
+
+    async def __aenter__(self) -> "RateRequest":
+        await self.control._acquire(self.chain)
+        self.started = self.control.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        latency_s = self.control.monotonic() - self.started
+        await self.control._release(self.chain, latency_s, exc)
+        return False
+
+
+class RateControl:
+    """
+    Paces requests per chain and adapts the pace to the responses.
+
+    With ``enabled`` off (SCRAPER_RATE_CONTROL=false) there is no bucket and
+    each chain runs at the fixed MAX_CONCURRENT_PER_CHAIN; requests are still
+    counted. ``clock`` is the wall clock handed to the store (comparable
+    across hosts) and ``monotonic`` times responses; tests pass fake ones.
+    """
+
+    def __init__(self, store: RateStore = None, limits: RateLimits = None, enabled: bool = None,
+                 window_s: float = 10.0, clock: Callable[[], float] = time.time,
+                 monotonic: Callable[[], float] = time.monotonic):
+        self.store = store or InMemoryRateStore()
+        self.limits = limits or RateLimits.from_settings()
+        self.enabled = settings.scraper_rate_control if enabled is None else enabled
+        self.window_s = window_s
+        self.clock = clock
+        self.monotonic = monotonic
+        self._chains: Dict[str, ChainStats] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+
+    def request(self, chain: str) -> RateRequest:
+        """
+        Async context manager around one request to a chain.
+
+        Entering waits for a concurrency slot and a token. Leaving with
+        RateLimitError or asyncio.TimeoutError, or after a slow response,
+        backs the chain off; leaving normally after a fast one ramps it up.
+        """
+        return RateRequest(self, chain)
+
+    def _stats(self, chain: str) -> ChainStats:
+        stats = self._chains.get(chain)
+        if stats is None:
+            concurrency = 1.0 if self.enabled else float(self.limits.max_concurrency)
+            stats = self._chains[chain] = ChainStats(rps_limit=self.limits.initial_rps,
+                                                     concurrency_limit=concurrency)
+            self._conditions[chain] = asyncio.Condition()
+        return stats
+
+    async def _acquire(self, chain: str):
+        stats = self._stats(chain)
+        condition = self._conditions[chain]
+        async with condition:
+            await condition.wait_for(lambda: stats.in_flight < max(1, int(stats.concurrency_limit)))
+            stats.in_flight += 1
+        if not self.enabled:
+            return
+        try:
+            wait_s, stats.concurrency_limit = await self.store.take(chain, self.limits, self.clock())
+            if wait_s > 0:
+                await asyncio.sleep(wait_s)
+        except BaseException:
+            await self._free(chain)
+            raise
+
+    async def _release(self, chain: str, latency_s: float, exc: Optional[BaseException]):
+        stats = self._stats(chain)
+        signal = None
+        if exc is None:
+            if latency_s > self.limits.slow_s:
+                stats.slow += 1
+                signal = CONGESTED
+            else:
+                stats.fast += 1
+                signal = FAST
+        elif isinstance(exc, RateLimitError):
+            stats.throttled += 1
+            signal = CONGESTED
+        elif isinstance(exc, asyncio.TimeoutError):
+            stats.timeouts += 1
+            signal = CONGESTED
+        elif isinstance(exc, Exception):
+            stats.errors += 1
+        if exc is None or isinstance(exc, Exception):
+            # Cancelled requests are not counted
+            stats.requests += 1
+            now = self.monotonic()
+            stats.finished.append(now)
+            while stats.finished and stats.finished[0] < now - self.window_s:
+                stats.finished.popleft()
+
+        try:
+            if self.enabled and signal is not None:
+                retry_after_s = getattr(exc, "retry_after_s", None)
+                stats.rps_limit, stats.concurrency_limit = await self.store.feedback(
+                    chain, self.limits, self.clock(), signal, retry_after_s
+                )
+        except Exception:
+            logger.exception("Updating the rate limits of %s failed", chain)
+        finally:
+            await self._free(chain)
+
+    async def _free(self, chain: str):
+        condition = self._conditions[chain]
+        async with condition:
+            self._chains[chain].in_flight -= 1
+            condition.notify_all()
+
+    def stats(self) -> dict:
+        """Per chain: achieved requests/s over the last window, counts and current limits"""
+        now = self.monotonic()
+        report = {}
+        for chain, stats in self._chains.items():
+            recent = sum(1 for finished in stats.finished if finished >= now - self.window_s)
+            report[chain] = {
+                "achieved_rps": round(recent / self.window_s, 2),
+                "requests": stats.requests,
+                "fast": stats.fast,
+                "slow": stats.slow,
+                "throttled": stats.throttled,
+                "timeouts": stats.timeouts,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "rps_limit": round(stats.rps_limit, 2) if self.enabled else None,
+                "concurrency_limit": max(1, int(stats.concurrency_limit)),
+            }
+        return report
+
+
+_rate_control: Optional[RateControl] = None
+
+
+def get_rate_control() -> RateControl:
+    """Process-wide rate control configured from settings"""
+    global _rate_control
+    if _rate_control is None:
+        store = RedisRateStore() if settings.scraper_rate_backend == "redis" else InMemoryRateStore()
+        _rate_control = RateControl(store)
+    return _rate_control
@@ -0,0 +1,275 @@
+"""Scrape worker: claims queued jobs from the database under a lease and runs them"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from shared.config import settings
+from shared.database import SessionLocal, DatabaseClient, init_db
+
+from .base import Fetcher, ScrapeJob
+from .orchestrator import get_fetchers, plan_jobs
+from .parse_pool import close_parse_pool
+from .rate_control import RateControl, get_rate_control
+
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = ("search_id", "hotel_id", "hotel_name", "chain", "city", "discount_type",
+              "discount_code", "check_in", "check_out", "guests")
+
+
+@dataclass
+class WorkerReport:
+    """Counters of one worker's run"""
+    worker_id: str
+    searches_planned: int = 0
+    claimed: int = 0
+    succeeded: int = 0
+    unavailable: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost: int = 0  # Finished after the lease expired; the outcome was dropped
+    swept: int = 0  # Expired leases of other workers put back in the queue
+    duration_s: float = 0.0
+
+
+class Worker:
+    """
+    Claims and runs queued scrape jobs until stopped.
+
+    Concurrency and timeout apply per worker, and requests go through the
+    chain's rate control, as in ScrapeOrchestrator.
+    """
+
+    def __init__(self, fetchers: Dict[str, Fetcher], worker_id: str = None,
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 concurrency: int = None, rate_control: RateControl = None,
+                 timeout_s: float = None, lease_s: float = None,
+                 poll_interval_ms: int = None, exit_when_idle: bool = False):
+        self.fetchers = fetchers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.max_concurrent_scrapers
+        self.rate_control = rate_control or get_rate_control()
+        self.timeout_s = timeout_s if timeout_s is not None else settings.scraper_timeout / 1000
+        self.lease_s = lease_s or settings.queue_lease_s
+        self.poll_interval_s = (poll_interval_ms or settings.queue_poll_interval_ms) / 1000
+        self.exit_when_idle = exit_when_idle
+        self.prefetch = 2 * self.concurrency
+        self.batch_size = max(1, self.concurrency // 2)
+        self.report = WorkerReport(worker_id=self.worker_id)
+
+    def _call(self, fn: Callable[[DatabaseClient], object]):
+        db = self.session_factory()
+        try:
+            return fn(DatabaseClient(db))
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _db(self, fn: Callable[[DatabaseClient], object]):
+        """Run a database operation on a fresh session in a worker thread"""
+        return await asyncio.to_thread(self._call, fn)
+
+    def stop(self):
+        """Stop claiming work; jobs in flight finish and are recorded"""
+        self._stopping.set()
+
+    async def run(self) -> WorkerReport:
+        started = time.perf_counter()
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._outcomes: List[dict] = []
+        self._global_limit = asyncio.Semaphore(self.concurrency)
+        heartbeat = asyncio.create_task(self._heartbeat())
+
+        next_sweep = next_plan = 0.0
+        try:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                now = time.monotonic()
+                planned, claimed = False, []
+                try:
+                    if now >= next_sweep:
+                        await self._db(self._sweep)
+                        next_sweep = now + self.lease_s / 2
+                    if now >= next_plan:
+                        planned = await self._db(self._plan_search)
+                        next_plan = now if planned else now + self.poll_interval_s
+                    claimed = await self._exchange(self.prefetch - len(self._tasks))
+                except Exception:
+                    # Typically a lock or connection error; outcomes are kept and retried
+                    logger.exception("Worker %s database round failed", self.worker_id)
+                    await asyncio.sleep(self.poll_interval_s)
+                    continue
+
+                for row in claimed:
+                    job = ScrapeJob(**{name: getattr(row, name) for name in JOB_FIELDS})
+                    task = asyncio.create_task(self._run_job(row.job_id, row.attempts, job))
+                    self._tasks[row.job_id] = task
+                    task.add_done_callback(lambda _, job_id=row.job_id: self._tasks.pop(job_id, None))
+
+                if planned:
+                    continue
+                if self.exit_when_idle and not claimed and not self._tasks and not self._outcomes:
+                    if await self._db(self._drained):
+                        break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            await self._exchange(0)
+            heartbeat.cancel()
+            self.report.duration_s = time.perf_counter() - started
+        return self.report
+
+    def _sweep(self, db_client: DatabaseClient):
+        """Requeue jobs of dead workers and finish searches their failures completed"""
+        swept = db_client.requeue_expired_jobs()
+        self.report.swept += len(swept)
+        for search_id in {row.search_id for row in swept if row.status == "failed"}:
+            db_client.finish_search(search_id)
+
+    def _plan_search(self, db_client: DatabaseClient) -> bool:
+        """Queue the jobs of the oldest pending search; False if there is none"""
+        search = db_client.claim_pending_search()
+        if search is None:
+            return False
+        try:
+            jobs = plan_jobs(db_client, search, self.fetchers)
+            db_client.enqueue_jobs({
+                "search_id": job.search_id,
+                "hotel_id": job.hotel_id,
+                "chain": job.chain,
+                "discount_type": job.discount_type,
+                "discount_code": job.discount_code,
+            } for job in jobs)
+        except Exception:
+            logger.exception("Planning search %s failed", search.id)
+            db_client.db.rollback()
+            db_client.update_search_status(search.id, "failed")
+            return True
+        self.report.searches_planned += 1
+        if not jobs:
+            db_client.finish_search(search.id)
+        return True
+
+    def _drained(self, db_client: DatabaseClient) -> bool:
+        stats = db_client.job_queue_stats()
+        return not (stats["queued"] or stats["running"] or stats["pending_searches"])
+
+    async def _exchange(self, free: int) -> list:
+        """Record finished jobs, complete their searches, then claim up to ``free`` jobs"""
+        outcomes, self._outcomes = self._outcomes, []
+
+        def exchange(db_client: DatabaseClient):
+            if outcomes:
+                counts = db_client.finish_jobs(self.worker_id, outcomes)
+                for key in ("retried", "failed", "lost"):
+                    setattr(self.report, key, getattr(self.report, key) + counts[key])
+                for search_id in counts["search_ids"]:
+                    db_client.finish_search(search_id)
+            if free <= 0:
+                return []
+            return db_client.claim_jobs(self.worker_id, free, self.fetchers, self.lease_s)
+
+        try:
+            claimed = await self._db(exchange)
+        except Exception:
+            self._outcomes = outcomes + self._outcomes
+            raise
+        self.report.claimed += len(claimed)
+        return claimed
+
+    async def _heartbeat(self):
+        """Renew the leases of jobs in flight or waiting to be recorded"""
+        while True:
+            await asyncio.sleep(self.lease_s / 3)
+            job_ids = list(self._tasks) + [outcome["job_id"] for outcome in self._outcomes]
+            if job_ids:
+                try:
+                    await self._db(lambda db_client: db_client.extend_job_leases(self.worker_id, job_ids, self.lease_s))
+                except Exception:
+                    logger.exception("Renewing job leases failed")
+
+    async def _run_job(self, job_id: str, attempts: int, job: ScrapeJob):
+        """Fetch one job within the chain's rate control and the global concurrency limit"""
+        outcome = {
+            "job_id": job_id, "attempts": attempts, "search_id": job.search_id,
+            "hotel_id": job.hotel_id, "discount_type": job.discount_type,
+        }
+        try:
+            async with self.rate_control.request(job.chain) as request:
+                async with self._global_limit:
+                    request.start()
+                    outcome["prices"] = await asyncio.wait_for(self.fetchers[job.chain].fetch(job), self.timeout_s)
+        except asyncio.TimeoutError:
+            outcome["error"] = f"Timed out after {self.timeout_s:g}s"
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+
+        if "error" in outcome:
+            logger.warning("Failed fetching %s (%s), attempt %d: %s",
+                           job.hotel_name, job.discount_type, attempts, outcome["error"])
+        elif outcome["prices"] is None:
+            self.report.unavailable += 1
+        else:
+            self.report.succeeded += 1
+        self._outcomes.append(outcome)
+        if len(self._outcomes) >= self.batch_size or len(self._tasks) <= self.concurrency:
+            self._wake.set()
+
+
+async def serve(worker: Worker) -> WorkerReport:
+    """Run a worker until it is idle (with exit_when_idle) or gets SIGINT/SIGTERM"""
+    loop = asyncio.get_running_loop()
+    run = asyncio.create_task(worker.run())
+    await asyncio.sleep(0)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    return await run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claim and run queued scrape jobs")
+    parser.add_argument("--concurrency", type=int, help="Jobs in flight (default: MAX_CONCURRENT_SCRAPERS)")
+    parser.add_argument("--worker-id", help="Lease owner name (default: host:pid:random)")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="Exit once no pending searches or queued/running jobs are left")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    fetchers = get_fetchers()
+    if not fetchers:
+        parser.error("no fetchers registered (set SCRAPER_FAKE_SITES=true for the offline stand-in sites)")
+    init_db()
+
+    worker = Worker(fetchers, worker_id=args.worker_id, concurrency=args.concurrency,
+                    exit_when_idle=args.exit_when_idle)
+    logger.info("Worker %s started for %s", worker.worker_id, ", ".join(fetchers))
+    try:
+        report = asyncio.run(serve(worker))
+    finally:
+        close_parse_pool()
+    logger.info("Worker %s stopped: %s", worker.worker_id, report)
+    for chain, stats in worker.rate_control.stats().items():
+        logger.info("Worker %s %s: %s", worker.worker_id, chain, stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Discount effectiveness analytics over all scraped results"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+
+GROUPINGS = ("chain", "chain_city")
+PERCENTILES = (25, 50, 75, 90)
+
+
+class _Encoder:
+    """Maps strings to dense integer codes across chunks"""
+
+    def __init__(self):
+        self.codes: Dict[Optional[str], int] = {}
+        self.values: List[Optional[str]] = []
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, column: list) -> np.ndarray:
+        # np.unique does the per-row work; only distinct values touch the dict
+        uniques, inverse = np.unique(np.array(column, dtype=object), return_inverse=True)
+        mapped = np.fromiter((self.code(value) for value in uniques), dtype=np.int64, count=len(uniques))
+        return mapped[inverse]
+
+
+class ResultArrays:
+    """Column arrays of every result, with string columns as integer codes"""
+
+    def __init__(self, searches: np.ndarray, hotels: np.ndarray, types: np.ndarray,
+                 prices: np.ndarray, available: np.ndarray, hotel_ids: list, type_names: list):
+        self.searches = searches
+        self.hotels = hotels
+        self.types = types
+        self.prices = prices
+        self.available = available
+        self.hotel_ids = hotel_ids
+        self.type_names = type_names
+
+    def __len__(self):
+        return len(self.prices)
+
+
+def load_result_arrays(db: Session, chain: str = None, chunk_size: int = None) -> ResultArrays:
+    """Stream (search, hotel, discount type, price, available) for all results into arrays"""
+    from .models import Result, Hotel
+
+    chunk_size = chunk_size or settings.analytics_chunk_size
+    stmt = select(Result.search_id, Result.hotel_id, Result.discount_type,
+                  Result.total_price, Result.available)
+    if chain:
+        stmt = stmt.join(Hotel, Hotel.id == Result.hotel_id).where(Hotel.chain == chain)
+
+    search_codes, hotel_codes, type_codes = _Encoder(), _Encoder(), _Encoder()
+    chunks: List[Tuple[np.ndarray, ...]] = []
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        search_ids, hotel_ids, types, prices, available = zip(*rows)
+        chunks.append((
+            search_codes.encode(search_ids),
+            hotel_codes.encode(hotel_ids),
+            type_codes.encode(types),
+            np.array(prices, dtype=np.float64),  # None becomes nan
+            np.array(available, dtype=bool),
+        ))
+
+    if chunks:
+        columns = [np.concatenate(column) for column in zip(*chunks)]
+    else:
+        columns = [np.empty(0, dtype=np.int64)] * 3 + [np.empty(0, dtype=np.float64), np.empty(0, dtype=bool)]
+    return ResultArrays(*columns, hotel_ids=hotel_codes.values, type_names=type_codes.values)
+
+
+def _group_rows(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique keys and the group index of every row"""
+    return np.unique(keys, return_inverse=True)
+
+
+def best_rates(arrays: ResultArrays) -> Tuple[np.ndarray, ...]:
+    """
+    Reduce results to one rate per (search, hotel, discount type).
+
+    Returns (searches, hotels, types, best available price or nan, any
+    available) arrays with one entry per combination.
+    """
+    n_hotels = max(len(arrays.hotel_ids), 1)
+    n_types = max(len(arrays.type_names), 1)
+    keys = (arrays.searches * n_hotels + arrays.hotels) * n_types + arrays.types
+    uniques, inverse = _group_rows(keys)
+
+    best = np.full(len(uniques), np.nan)
+    np.fmin.at(best, inverse, np.where(arrays.available, arrays.prices, np.nan))
+    available = np.zeros(len(uniques), dtype=bool)
+    np.logical_or.at(available, inverse, arrays.available)
+
+    types = uniques % n_types
+    pairs = uniques // n_types
+    return pairs // n_hotels, pairs % n_hotels, types, best, available
+
+
+def discount_report(db: Session, by: str = "chain", chain: str = None) -> dict:
+    """
+    Savings, hit rate and availability per (chain, [city,] discount type).
+
+    ``savings`` is the "none" rate minus the discounted rate for the same
+    search and hotel; ``hit_rate`` is the share of compared pairs where the
+    discount is strictly cheaper and ``availability`` the share of
+    (search, hotel) lookups for the discount that returned a rate.
+    """
+    from .models import Hotel
+
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{by}'")
+
+    started = time.perf_counter()
+    arrays = load_result_arrays(db, chain=chain)
+    searches, hotels, types, prices, available = best_rates(arrays)
+
+    none_code = arrays.type_names.index("none") if "none" in arrays.type_names else -1
+    n_hotels = max(len(arrays.hotel_ids), 1)
+    pair_keys = searches * n_hotels + hotels
+
+    # Baseline "none" price per (search, hotel); keys are unique after best_rates
+    is_base = types == none_code
+    base_keys = pair_keys[is_base]
+    order = np.argsort(base_keys)
+    base_keys, base_prices = base_keys[order], prices[is_base][order]
+
+    discounted = ~is_base
+    d_keys = pair_keys[discounted]
+    d_hotels, d_types = hotels[discounted], types[discounted]
+    d_prices, d_available = prices[discounted], available[discounted]
+    pos = np.minimum(np.searchsorted(base_keys, d_keys), max(len(base_keys) - 1, 0))
+    matched = base_keys[pos] == d_keys if len(base_keys) else np.zeros(len(d_keys), dtype=bool)
+    base = np.where(matched, base_prices[pos] if len(base_keys) else np.nan, np.nan)
+    compared = matched & ~np.isnan(base) & ~np.isnan(d_prices) & (base > 0)
+
+    # Hotel chain/city codes, aligned with arrays.hotel_ids
+    hotel_rows = {row.id: row for row in db.execute(select(Hotel.id, Hotel.chain, Hotel.city))}
+    chain_enc, city_enc = _Encoder(), _Encoder()
+    hotel_info = [hotel_rows.get(hotel_id) for hotel_id in arrays.hotel_ids]
+    hotel_chain = np.array([chain_enc.code(row.chain if row else None) for row in hotel_info],
+                           dtype=np.int64)
+    hotel_city = np.array([city_enc.code(row.city if row and by == "chain_city" else None)
+                           for row in hotel_info], dtype=np.int64)
+
+    n_types = max(len(arrays.type_names), 1)
+    n_cities = max(len(city_enc.values), 1)
+    group_keys = (hotel_chain[d_hotels] * n_cities + hotel_city[d_hotels]) * n_types + d_types
+    groups, group_of = _group_rows(group_keys)
+    n_groups = len(groups)
+
+    lookups = np.bincount(group_of, minlength=n_groups)
+    returned = np.bincount(group_of, weights=d_available, minlength=n_groups)
+    compared_count = np.bincount(group_of[compared], minlength=n_groups)
+
+    savings = base[compared] - d_prices[compared]
+    savings_pct = savings * 100.0 / base[compared]
+    compared_groups = group_of[compared]
+    cheaper = np.bincount(compared_groups, weights=savings > 0, minlength=n_groups)
+    savings_sum = np.bincount(compared_groups, weights=savings, minlength=n_groups)
+
+    # Sort savings by group so each group's values are one contiguous slice
+    order = np.lexsort((savings_pct, compared_groups))
+    sorted_pct = savings_pct[order]
+    bounds = np.searchsorted(compared_groups[order], np.arange(n_groups + 1))
+
+    rows = []
+    for g, key in enumerate(groups):
+        type_code = key % n_types
+        chain_code = (key // n_types) // n_cities
+        city_code = (key // n_types) % n_cities
+        group_pct = sorted_pct[bounds[g]:bounds[g + 1]]
+        n = int(compared_count[g])
+        row = {
+            "chain": chain_enc.values[chain_code] or "Unknown",
+            "discount_type": arrays.type_names[type_code],
+            "lookups": int(lookups[g]),
+            "availability": round(float(returned[g] / lookups[g]), 4),
+            "compared": n,
+            "hit_rate": round(float(cheaper[g] / n), 4) if n else None,
+            "avg_savings": round(float(savings_sum[g] / n), 2) if n else None,
+            "savings_pct": {
+                f"p{p}": round(float(value), 2)
+                for p, value in zip(PERCENTILES, np.percentile(group_pct, PERCENTILES))
+            } if n else None,
+        }
+        if by == "chain_city":
+            row["city"] = city_enc.values[city_code]
+        rows.append(row)
+
+    rows.sort(key=lambda row: (row["chain"], row.get("city") or "", row["discount_type"]))
+    return {
+        "by": by,
+        "chain": chain,
+        "results_scanned": len(arrays),
+        "rates_compared": int(compared.sum()),
+        "groups": rows,
+        "computed_at": datetime.utcnow().isoformat(),
+        "compute_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+# Cached reports keyed by (database, grouping, chain filter)
+_reports: Dict[tuple, Tuple[float, dict]] = {}
+_reports_lock = threading.Lock()
+
+
+def get_discount_report(db: Session, by: str = "chain", chain: str = None) -> dict:
+    """Cached discount_report; at most one report is computed at a time"""
+    key = (str(db.get_bind().url), by, chain)
+    entry = _reports.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    with _reports_lock:
+        entry = _reports.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        report = discount_report(db, by, chain)
+        _reports[key] = (time.monotonic() + settings.analytics_cache_ttl_s, report)
+        return report
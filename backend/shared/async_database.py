@@ -0,0 +1,148 @@
+"""Async database engine and session management"""
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .config import settings
+from .database import SessionLocal, DatabaseClient
+from .storage import create_async_storage_engine
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+
+# Create async database engine with the same storage profile as the sync one
+async_engine = create_async_storage_engine(async_database_url(settings.database_url))
+
+# Create async session factory; objects stay usable after commit
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    Use this with FastAPI's Depends() for automatic session management.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class AsyncDatabaseClient:
+    """
+    Async database client with the same operations as DatabaseClient.
+
+    Each call runs the sync implementation on the async session through
+    ``run_sync``, so the query logic lives in one place. That code runs on
+    the event loop between awaits, so operations that may build in-memory
+    indexes (catalog, location index, price history) use
+    ``run_in_thread`` instead.
+
+    Example:
+        async with AsyncSessionLocal() as db:
+            search = await AsyncDatabaseClient(db).get_search(search_id)
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run_sync(self, fn: Callable[[DatabaseClient], Any]) -> Any:
+        """Run a function that takes a sync DatabaseClient on this session"""
+        return await self.db.run_sync(lambda session: fn(DatabaseClient(session)))
+
+    async def run_in_thread(self, fn: Callable[[DatabaseClient], Any]) -> Any:
+        """Run a function that takes a sync DatabaseClient in a worker thread, on its own sync session"""
+        def call():
+            with SessionLocal() as db:
+                return fn(DatabaseClient(db))
+        return await asyncio.to_thread(call)
+
+    # Search operations
+    async def create_search(self, user_id: str, location: str, check_in: str,
+                            check_out: str, guests: int, filters: dict = None,
+                            search_id: str = None):
+        return await self.run_sync(lambda c: c.create_search(
+            user_id, location, check_in, check_out, guests, filters, search_id
+        ))
+
+    async def get_search(self, search_id: str):
+        return await self.run_sync(lambda c: c.get_search(search_id))
+
+    async def list_searches(self, limit: int = 10, before: tuple = None):
+        return await self.run_sync(lambda c: c.list_searches(limit, before))
+
+    async def update_search_status(self, search_id: str, status: str):
+        return await self.run_sync(lambda c: c.update_search_status(search_id, status))
+
+    async def get_search_state(self, search_id: str):
+        return await self.run_sync(lambda c: c.get_search_state(search_id))
+
+    # Summary operations
+    async def compute_search_summary(self, search_id: str) -> dict:
+        return await self.run_sync(lambda c: c.compute_search_summary(search_id))
+
+    async def get_search_summary(self, search_id: str):
+        return await self.run_sync(lambda c: c.get_search_summary(search_id))
+
+    # Result operations
+    async def create_result(self, search_id: str, hotel_id: str, discount_type: str,
+                            prices: dict, available: bool = True):
+        return await self.run_sync(lambda c: c.create_result(
+            search_id, hotel_id, discount_type, prices, available
+        ))
+
+    async def create_results_bulk(self, search_id: str, results: Iterable[dict],
+                                  chunk_size: int = None) -> int:
+        return await self.run_sync(lambda c: c.create_results_bulk(search_id, results, chunk_size))
+
+    async def get_result_rows_by_search(self, search_id: str):
+        return await self.run_sync(lambda c: c.get_result_rows_by_search(search_id))
+
+    async def get_result_rows_after(self, search_id: str, after: tuple = None, limit: int = None,
+                                    until: int = None):
+        return await self.run_sync(lambda c: c.get_result_rows_after(search_id, after, limit, until))
+
+    async def get_result_raw_data(self, search_id: str, result_id: str):
+        return await self.run_sync(lambda c: c.get_result_raw_data(search_id, result_id))
+
+    async def get_result_rows(self, search_id: str, **kwargs):
+        return await self.run_sync(lambda c: c.get_result_rows(search_id, **kwargs))
+
+    # Hotel operations
+    async def create_hotel(self, name: str, chain: str, **kwargs):
+        return await self.run_sync(lambda c: c.create_hotel(name, chain, **kwargs))
+
+    async def get_hotels(self):
+        return await self.run_sync(lambda c: c.get_hotels())
+
+    async def get_hotel(self, hotel_id: str):
+        return await self.run_sync(lambda c: c.get_hotel(hotel_id))
+
+    async def get_price_history(self, hotel_id: str, **kwargs) -> dict:
+        return await self.run_in_thread(lambda c: c.get_price_history(hotel_id, **kwargs))
+
+    async def get_hotels_by_chain_city(self, chain: str, city: str):
+        return await self.run_in_thread(lambda c: c.get_hotels_by_chain_city(chain, city))
+
+    async def get_hotels_near(self, latitude: float, longitude: float, radius_km: float, **kwargs):
+        return await self.run_in_thread(lambda c: c.get_hotels_near(latitude, longitude, radius_km, **kwargs))
+
+    async def get_nearest_hotels(self, latitude: float, longitude: float, k: int, **kwargs):
+        return await self.run_in_thread(lambda c: c.get_nearest_hotels(latitude, longitude, k, **kwargs))
+
+    async def suggest_locations(self, query: str, limit: int = 10, kind: str = None):
+        return await self.run_in_thread(lambda c: c.suggest_locations(query, limit, kind))
+
+    async def resolve_location(self, location: str):
+        return await self.run_in_thread(lambda c: c.resolve_location(location))
+
+    # Discount code operations
+    async def get_discount_codes(self, hotel_chain: str, discount_type: str = None):
+        return await self.run_in_thread(lambda c: c.get_discount_codes(hotel_chain, discount_type))
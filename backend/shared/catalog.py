@@ -0,0 +1,358 @@
+"""Process-local in-memory catalog of hotels and discount codes"""
+import itertools
+import math
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .geo_index import GeoIndex
+from .location_index import LocationIndex, LocationMatch
+
+
+class HotelRecord:
+    """Read-only copy of a Hotel row"""
+    __slots__ = ("id", "name", "chain", "address", "city", "state", "country",
+                 "latitude", "longitude", "star_rating")
+
+    def __init__(self, id, name, chain, address, city, state, country,
+                 latitude, longitude, star_rating):
+        self.id = id
+        self.name = name
+        self.chain = chain
+        self.address = address
+        self.city = city
+        self.state = state
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.star_rating = star_rating
+
+    @classmethod
+    def of(cls, hotel) -> "HotelRecord":
+        """Copy of a Hotel (or any object with its attributes)"""
+        return cls(*(getattr(hotel, name) for name in cls.__slots__))
+
+    def __repr__(self):
+        return f"<HotelRecord(name='{self.name}', chain='{self.chain}', city='{self.city}')>"
+
+
+class DiscountCodeRecord:
+    """Read-only copy of an active DiscountCode row"""
+    __slots__ = ("id", "code", "type", "hotel_chain", "requirements", "active")
+
+    def __init__(self, id, code, type, hotel_chain, requirements, active=True):
+        self.id = id
+        self.code = code
+        self.type = type
+        self.hotel_chain = hotel_chain
+        self.requirements = requirements
+        self.active = active
+
+    def __repr__(self):
+        return f"<DiscountCodeRecord(chain='{self.hotel_chain}', type='{self.type}', code='{self.code}')>"
+
+
+# Bumped by every hotel or discount code write in this process; all catalogs
+# compare against it, so a write through any engine invalidates them all
+_version = itertools.count(1)
+_current_version = 0
+_bumped_at = None
+_version_lock = threading.Lock()
+
+
+def bump_catalog_version() -> int:
+    """Mark every catalog in this process as stale"""
+    global _current_version, _bumped_at
+    with _version_lock:
+        _current_version = next(_version)
+        _bumped_at = time.monotonic()
+        return _current_version
+
+
+def catalog_version() -> int:
+    return _current_version
+
+
+class Catalog:
+    """Indexed in-memory copy of the hotels and active discount codes"""
+
+    def __init__(self, max_age_s: float = None):
+        self.max_age_s = settings.catalog_max_age_s if max_age_s is None else max_age_s
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = None
+        self._by_id: Dict[str, HotelRecord] = {}
+        self._by_name_city: Dict[Tuple[str, str], HotelRecord] = {}
+        self._by_chain: Dict[str, List[HotelRecord]] = {}
+        self._by_chain_city: Dict[Tuple[str, str], List[HotelRecord]] = {}
+        self._codes_by_chain: Dict[str, List[DiscountCodeRecord]] = {}
+        self._codes_by_chain_type: Dict[Tuple[str, str], List[DiscountCodeRecord]] = {}
+        self._geo = GeoIndex()
+        self._locations: Optional[LocationIndex] = None
+        self.hotel_count = 0
+        self.code_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.hotels_added = 0
+        self.last_load_ms = 0.0
+        self.location_index_ms = 0.0
+
+    def _is_stale(self) -> bool:
+        if self._version is None:
+            return True
+        if self._version != _current_version:
+            return True
+        return self.max_age_s > 0 and time.monotonic() - self._loaded_at > self.max_age_s
+
+    def _ensure_loaded(self, db: Session):
+        """Reload the indexes if the catalog is empty, invalidated or expired"""
+        if not self._is_stale():
+            self.hits += 1
+            return
+
+        with self._lock:
+            if not self._is_stale():
+                self.hits += 1
+                return
+            self.misses += 1
+            self._load(db)
+
+    def _load(self, db: Session):
+        from .models import Hotel, DiscountCode
+
+        started = time.perf_counter()
+        version = _current_version
+
+        by_id, by_name_city, by_chain, by_chain_city = {}, {}, {}, {}
+        geo = GeoIndex()
+        hotel_rows = db.execute(select(
+            Hotel.id, Hotel.name, Hotel.chain, Hotel.address, Hotel.city, Hotel.state,
+            Hotel.country, Hotel.latitude, Hotel.longitude, Hotel.star_rating
+        ).order_by(Hotel.created_at, Hotel.id))
+        for row in hotel_rows:
+            self._index_hotel(HotelRecord(*row), by_id, by_name_city, by_chain, by_chain_city, geo)
+
+        codes_by_chain, codes_by_chain_type = {}, {}
+        code_rows = db.execute(select(
+            DiscountCode.id, DiscountCode.code, DiscountCode.type,
+            DiscountCode.hotel_chain, DiscountCode.requirements
+        ).where(DiscountCode.active == True).order_by(DiscountCode.created_at, DiscountCode.id))
+        code_count = 0
+        for row in code_rows:
+            code = DiscountCodeRecord(*row)
+            codes_by_chain.setdefault(code.hotel_chain, []).append(code)
+            codes_by_chain_type.setdefault((code.hotel_chain, code.type), []).append(code)
+            code_count += 1
+        locations = self._carried_over_locations(by_id)
+
+        # Swap the indexes in together so readers never see a partial load
+        (self._by_id, self._by_name_city, self._by_chain, self._by_chain_city, self._geo, self._locations,
+         self._codes_by_chain, self._codes_by_chain_type) = (
+            by_id, by_name_city, by_chain, by_chain_city, geo, locations, codes_by_chain, codes_by_chain_type
+        )
+        self.hotel_count = len(by_id)
+        self.code_count = code_count
+        self._version = version
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+        self.last_load_ms = (time.perf_counter() - started) * 1000
+
+    def _carried_over_locations(self, by_id: Dict[str, HotelRecord]) -> Optional[LocationIndex]:
+        """
+        The built location index, with any new hotels added, if the reload
+        only added hotels; None (rebuild on next use) if any changed or went.
+        """
+        locations = self._locations
+        if locations is None:
+            return None
+        for hotel_id, hotel in self._by_id.items():
+            loaded = by_id.get(hotel_id)
+            if loaded is None or any(getattr(loaded, name) != getattr(hotel, name) for name in HotelRecord.__slots__):
+                return None
+        for hotel_id, hotel in by_id.items():
+            if hotel_id not in self._by_id:
+                locations.add_hotel(hotel)
+        return locations
+
+    @staticmethod
+    def _index_hotel(hotel: HotelRecord, by_id, by_name_city, by_chain, by_chain_city, geo):
+        by_id[hotel.id] = hotel
+        # First match wins, like the .first() query it replaces
+        by_name_city.setdefault((hotel.name, hotel.city), hotel)
+        by_chain.setdefault(hotel.chain, []).append(hotel)
+        by_chain_city.setdefault((hotel.chain, hotel.city), []).append(hotel)
+        geo.add(hotel, hotel.latitude, hotel.longitude)
+
+    def _add_hotel(self, hotel: HotelRecord, after_version: int, version: int):
+        """Add a committed hotel in place if the catalog was current before its version bump"""
+        with self._lock:
+            if self._version != after_version:
+                return
+            # A load running while the hotel was committed may already have it
+            if hotel.id not in self._by_id:
+                self._index_hotel(hotel, self._by_id, self._by_name_city, self._by_chain,
+                                  self._by_chain_city, self._geo)
+                if self._locations is not None:
+                    self._locations.add_hotel(hotel)
+                self.hotel_count += 1
+                self.hotels_added += 1
+            self._version = version
+
+    def invalidate(self):
+        """Force a reload on the next lookup"""
+        with self._lock:
+            self._version = None
+
+    # Lookups return new lists so callers can't mutate the indexes
+    def hotel_by_name_city(self, db: Session, name: str, city: str) -> Optional[HotelRecord]:
+        self._ensure_loaded(db)
+        return self._by_name_city.get((name, city))
+
+    def hotels_by_chain(self, db: Session, chain: str) -> List[HotelRecord]:
+        self._ensure_loaded(db)
+        return list(self._by_chain.get(chain, ()))
+
+    def hotels_by_chain_city(self, db: Session, chain: str, city: str) -> List[HotelRecord]:
+        self._ensure_loaded(db)
+        return list(self._by_chain_city.get((chain, city), ()))
+
+    def hotels_near(self, db: Session, latitude: float, longitude: float, radius_km: float,
+                    chain: str = None, limit: int = None) -> List[Tuple[float, HotelRecord]]:
+        """(distance_km, hotel) within radius_km of a point, nearest first"""
+        self._ensure_loaded(db)
+        return self._geo.within(latitude, longitude, radius_km, _chain_filter(chain), limit)
+
+    def nearest_hotels(self, db: Session, latitude: float, longitude: float, k: int,
+                       chain: str = None, max_km: float = None) -> List[Tuple[float, HotelRecord]]:
+        """(distance_km, hotel) for the k hotels nearest to a point, nearest first"""
+        self._ensure_loaded(db)
+        return self._geo.nearest(latitude, longitude, k, _chain_filter(chain),
+                                 math.inf if max_km is None else max_km)
+
+    def _location_index(self, db: Session) -> LocationIndex:
+        self._ensure_loaded(db)
+        locations = self._locations
+        if locations is None:
+            with self._lock:
+                locations = self._locations
+                if locations is None:
+                    started = time.perf_counter()
+                    locations = LocationIndex()
+                    for hotel in self._by_id.values():
+                        locations.add_hotel(hotel)
+                    self._locations = locations
+                    self.location_index_ms = (time.perf_counter() - started) * 1000
+        return locations
+
+    def suggest_locations(self, db: Session, query: str, limit: int = 10,
+                          kind: str = None) -> List[LocationMatch]:
+        """Cities and hotels matching what has been typed so far, best first"""
+        return self._location_index(db).search(query, limit, kind)
+
+    def resolve_location(self, db: Session, location: str) -> List[HotelRecord]:
+        """The hotels a search's free-text location means (empty if nothing matches well)"""
+        return self._location_index(db).resolve(location)
+
+    def discount_codes(self, db: Session, hotel_chain: str,
+                       discount_type: str = None) -> List[DiscountCodeRecord]:
+        self._ensure_loaded(db)
+        if discount_type:
+            return list(self._codes_by_chain_type.get((hotel_chain, discount_type), ()))
+        return list(self._codes_by_chain.get(hotel_chain, ()))
+
+    def _stale_for(self, now: float) -> Optional[float]:
+        """Seconds the loaded data has been out of date, or None if it is current"""
+        if self._version is None:
+            return None
+        if self._version != _current_version:
+            return now - _bumped_at
+        if self.max_age_s > 0 and now - self._loaded_at > self.max_age_s:
+            return now - self._loaded_at - self.max_age_s
+        return None
+
+    def stats(self) -> dict:
+        """Hit rate and staleness of the catalog"""
+        lookups = self.hits + self.misses
+        now = time.monotonic()
+        stale_for = self._stale_for(now)
+        return {
+            "hotels": self.hotel_count,
+            "geo_indexed_hotels": len(self._geo),
+            "location_entries": len(self._locations) if self._locations is not None else None,
+            "location_index_ms": round(self.location_index_ms, 2),
+            "discount_codes": self.code_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "hotels_added": self.hotels_added,
+            "last_load_ms": round(self.last_load_ms, 2),
+            "version": self._version,
+            "current_version": _current_version,
+            "stale": self._is_stale(),
+            "age_s": round(now - self._loaded_at, 2) if self._loaded_at is not None else None,
+            "stale_for_s": round(stale_for, 2) if stale_for is not None else None,
+            "max_age_s": self.max_age_s,
+        }
+
+
+def _chain_filter(chain: Optional[str]):
+    return None if chain is None else (lambda hotel: hotel.chain == chain)
+
+
+# One catalog per database, keyed by URL with the password masked (the sync and
+# async engines for one database get separate catalogs but share the version)
+_catalogs: Dict[str, Catalog] = {}
+_catalogs_by_engine: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(db: Session) -> Catalog:
+    """Get the catalog for the database a session is bound to"""
+    engine = db.get_bind()
+    catalog = _catalogs_by_engine.get(engine)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(str(engine.url), Catalog())
+            _catalogs_by_engine[engine] = catalog
+    return catalog
+
+
+def _database_of(url: str) -> tuple:
+    """What identifies a database across drivers (the sync and async engines' URLs differ)"""
+    url = make_url(url)
+    if url.database in (None, "", ":memory:"):
+        return (str(url),)  # Every in-memory engine is its own database
+    return url.get_backend_name(), url.host, url.port, url.database
+
+
+def hotel_added(db: Session, hotel) -> int:
+    """
+    Bump the catalog version after a hotel insert committed through ``db``.
+
+    Catalogs of the same database that were current get the hotel added in
+    place and stay current; any other catalog reloads on its next lookup.
+    """
+    global _current_version, _bumped_at
+    record = HotelRecord.of(hotel)
+    database = _database_of(str(db.get_bind().url))
+    with _version_lock:
+        after_version = _current_version
+        _current_version = next(_version)
+        _bumped_at = time.monotonic()
+        for key, catalog in list(_catalogs.items()):
+            if _database_of(key) == database:
+                catalog._add_hotel(record, after_version, _current_version)
+        return _current_version
+
+
+def catalog_stats() -> dict:
+    """Stats for every catalog in this process, keyed by database"""
+    return {key: catalog.stats() for key, catalog in _catalogs.items()}
@@ -0,0 +1,158 @@
+"""Search change notifications for long-polling result readers"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "search-versions"
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeNotifier:
+    """Wakes waiters in this process when a search's version is published"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, versions: Dict[str, int]):
+        """Announce committed search versions; safe to call from any thread"""
+        self._deliver(versions)
+
+    def _deliver(self, versions: Dict[str, int]):
+        woken = []
+        with self._lock:
+            for search_id, version in versions.items():
+                if version > self._versions.get(search_id, -1):
+                    self._versions[search_id] = version
+                    self._versions.move_to_end(search_id)
+                woken += self._waiters.pop(search_id, [])
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+        for loop, future in woken:
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def wait(self, search_id: str, since: int, timeout: float) -> bool:
+        """
+        Wait for a version of a search newer than ``since`` to be published.
+
+        Returns True when woken (or a newer version was already published)
+        and False on timeout. Being woken does not guarantee the version is
+        newer than ``since``; the caller re-reads it.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            if self._versions.get(search_id, -1) > since:
+                return True
+            self._waiters.setdefault(search_id, []).append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(search_id)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[search_id]
+
+
+class RedisChangeNotifier(ChangeNotifier):
+    """Shares published versions between processes through Redis pub/sub"""
+
+    def __init__(self, client=None, max_entries: int = 4096):
+        super().__init__(max_entries)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.redis_url)
+        self.client = client
+        self._listener: Optional[asyncio.Task] = None
+        self._outbox: "queue.SimpleQueue[Dict[str, int]]" = queue.SimpleQueue()
+        self._publisher: Optional[threading.Thread] = None
+        self._publisher_lock = threading.Lock()
+
+    def publish(self, versions: Dict[str, int]):
+        """Wake local waiters now and hand the Redis round trip to a background thread"""
+        # Called from after_commit, which runs on the event loop for async sessions
+        self._deliver(versions)
+        self._outbox.put(dict(versions))
+        if self._publisher is None:
+            with self._publisher_lock:
+                if self._publisher is None:
+                    self._publisher = threading.Thread(target=self._publish_outbox, name="search-versions",
+                                                       daemon=True)
+                    self._publisher.start()
+
+    def _publish_outbox(self):
+        """Publish queued versions, merging whatever queued up during the last round trip"""
+        while True:
+            versions = self._outbox.get()
+            while True:
+                try:
+                    more = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                for search_id, version in more.items():
+                    versions[search_id] = max(versions.get(search_id, -1), version)
+            try:
+                self.client.publish(CHANNEL, json.dumps(versions))
+            except Exception:
+                # Waiters elsewhere fall back to re-reading the version
+                logger.exception("Publishing search versions to Redis failed")
+
+    async def wait(self, search_id: str, since: int, timeout: float) -> bool:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return await super().wait(search_id, since, timeout)
+
+    async def _listen(self):
+        """Deliver versions published by every process, resubscribing after errors"""
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(settings.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._deliver({k: int(v) for k, v in json.loads(message["data"]).items()})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis subscription to %s failed; resubscribing", CHANNEL)
+                await asyncio.sleep(1)
+            finally:
+                await client.close()
+
+
+_change_notifier: Optional[ChangeNotifier] = None
+
+
+def get_change_notifier() -> ChangeNotifier:
+    """Process-wide change notifier configured from settings"""
+    global _change_notifier
+    if _change_notifier is None:
+        if settings.results_notify_backend == "redis":
+            _change_notifier = RedisChangeNotifier()
+        else:
+            _change_notifier = ChangeNotifier()
+    return _change_notifier
@@ -13,14 +13,83 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = Field(default="sqlite:///./data/travel_discounts.db", env="DATABASE_URL")
+    database_echo: Optional[bool] = Field(default=None, env="DATABASE_ECHO")  # Default: on in development
+
+    # Schema migrations at startup; default: on in development only
+    schema_auto_migrate: Optional[bool] = Field(default=None, env="SCHEMA_AUTO_MIGRATE")
+
+    # Storage profile: "tuned" applies the settings below, "default" uses driver defaults
+    storage_profile: str = Field(default="tuned", env="STORAGE_PROFILE")
+
+    # SQLite tuning (tuned profile)
+    sqlite_journal_mode: str = Field(default="WAL", env="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", env="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size_kb: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KB")
+    sqlite_mmap_size: int = Field(default=268435456, env="SQLITE_MMAP_SIZE")  # 256 MB
+
+    # Connection pool and PostgreSQL tuning (tuned profile)
+    db_pool_size: int = Field(default=10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_s: int = Field(default=30, env="DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=1800, env="DB_POOL_RECYCLE_S")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=15000, env="DB_STATEMENT_TIMEOUT_MS")
+
+    # Radius searches (latitude/longitude on POST /api/search)
+    search_radius_km: float = Field(default=10.0, env="SEARCH_RADIUS_KM")  # When only coordinates are given
+    search_max_radius_km: float = Field(default=100.0, env="SEARCH_MAX_RADIUS_KM")
+    search_max_hotels_per_chain: int = Field(default=50, env="SEARCH_MAX_HOTELS_PER_CHAIN")  # Nearest first
+
+    # Result ingestion
+    result_write_chunk_size: int = Field(default=500, env="RESULT_WRITE_CHUNK_SIZE")
+
+    # Hotel and discount code catalog (in-memory, per process)
+    catalog_enabled: bool = Field(default=True, env="CATALOG_ENABLED")
+    catalog_max_age_s: int = Field(default=300, env="CATALOG_MAX_AGE_S")  # 0: reload only on local writes
+
+    # Price history (in-memory, per process)
+    price_history_enabled: bool = Field(default=True, env="PRICE_HISTORY_ENABLED")
+    price_history_segment_points: int = Field(default=4096, env="PRICE_HISTORY_SEGMENT_POINTS")
+    price_history_max_hotels: int = Field(default=10000, env="PRICE_HISTORY_MAX_HOTELS")
+    price_history_topup_overlap_s: float = Field(default=60.0, env="PRICE_HISTORY_TOPUP_OVERLAP_S")
+
+    # Discount analytics
+    analytics_chunk_size: int = Field(default=100000, env="ANALYTICS_CHUNK_SIZE")
+    analytics_cache_ttl_s: int = Field(default=600, env="ANALYTICS_CACHE_TTL_S")
+
+    # Results streaming (SSE)
+    results_stream_poll_ms: int = Field(default=500, env="RESULTS_STREAM_POLL_MS")
+    results_stream_timeout_s: int = Field(default=300, env="RESULTS_STREAM_TIMEOUT_S")
+
+    # Results long polling (GET /api/results/{id}?since=&wait=)
+    results_notify_backend: str = Field(default="memory", env="RESULTS_NOTIFY_BACKEND")  # memory, redis
+    results_longpoll_max_wait_s: int = Field(default=60, env="RESULTS_LONGPOLL_MAX_WAIT_S")
+    results_longpoll_recheck_s: float = Field(default=5.0, env="RESULTS_LONGPOLL_RECHECK_S")  # Catches changes not notified here
+
+    # Retention (python -m shared.retention)
+    retention_days: int = Field(default=90, env="RETENTION_DAYS")
+    retention_batch_size: int = Field(default=200, env="RETENTION_BATCH_SIZE")  # Searches per delete transaction
+    retention_pause_ms: int = Field(default=100, env="RETENTION_PAUSE_MS")  # Between batches, so other writers get the lock
+    retention_archive_dir: Optional[str] = Field(default=None, env="RETENTION_ARCHIVE_DIR")  # Archive before deleting
+    retention_archive_format: str = Field(default="ndjson", env="RETENTION_ARCHIVE_FORMAT")  # ndjson (gzipped), parquet
+    retention_vacuum_pages: int = Field(default=2000, env="RETENTION_VACUUM_PAGES")  # SQLite incremental_vacuum per batch
+    retention_payload_grace_s: int = Field(default=3600, env="RETENTION_PAYLOAD_GRACE_S")  # Unreferenced raw payloads written more recently are kept
 
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
 
+    # Search cache
+    search_cache_backend: str = Field(default="memory", env="SEARCH_CACHE_BACKEND")  # memory, redis, none
+    search_cache_ttl_s: int = Field(default=600, env="SEARCH_CACHE_TTL_S")
+    search_cache_pending_ttl_s: int = Field(default=30, env="SEARCH_CACHE_PENDING_TTL_S")  # Claims whose search isn't created yet
+    search_cache_max_entries: int = Field(default=1024, env="SEARCH_CACHE_MAX_ENTRIES")
+
     # API Configuration
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=8000, env="API_PORT")
     api_reload: bool = Field(default=True, env="API_RELOAD")
+    mock_routes: Optional[bool] = Field(default=None, env="MOCK_ROUTES")  # Default: off in production
 
     # CORS
     cors_origins: List[str] = Field(
@@ -28,6 +97,10 @@ class Settings(BaseSettings):
         env="CORS_ORIGINS"
     )
 
+    # Request metrics (/metrics and Server-Timing)
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    metrics_query_budget: int = Field(default=25, env="METRICS_QUERY_BUDGET")  # 0: no budget
+
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
 
@@ -38,7 +111,29 @@ class Settings(BaseSettings):
         env="SCRAPER_USER_AGENT"
     )
     max_concurrent_scrapers: int = Field(default=5, env="MAX_CONCURRENT_SCRAPERS")
-    scraper_delay_ms: int = Field(default=2000, env="SCRAPER_DELAY_MS")
+    max_concurrent_per_chain: int = Field(default=2, env="MAX_CONCURRENT_PER_CHAIN")  # Ceiling of the adaptive limit
+    scraper_fake_sites: bool = Field(default=False, env="SCRAPER_FAKE_SITES")  # Offline stand-in sites
+    scraper_iterparse_min_bytes: int = Field(default=262144, env="SCRAPER_ITERPARSE_MIN_BYTES")  # Parse larger rate pages incrementally
+    scraper_parse_workers: Optional[int] = Field(default=None, env="SCRAPER_PARSE_WORKERS")  # Default: cores - 1; 0: parse in a thread
+
+    # Adaptive per-chain rate control (scrapers/rate_control.py)
+    scraper_rate_control: bool = Field(default=True, env="SCRAPER_RATE_CONTROL")  # false: fixed per-chain concurrency only
+    scraper_rate_backend: str = Field(default="memory", env="SCRAPER_RATE_BACKEND")  # memory, redis (shared by workers)
+    scraper_rate_initial_rps: float = Field(default=1.0, env="SCRAPER_RATE_INITIAL_RPS")
+    scraper_rate_min_rps: float = Field(default=0.1, env="SCRAPER_RATE_MIN_RPS")
+    scraper_rate_max_rps: float = Field(default=20.0, env="SCRAPER_RATE_MAX_RPS")
+    scraper_rate_burst: float = Field(default=2.0, env="SCRAPER_RATE_BURST")
+    scraper_rate_increase_rps: float = Field(default=0.5, env="SCRAPER_RATE_INCREASE_RPS")  # Per second of fast responses
+    scraper_rate_backoff: float = Field(default=0.5, env="SCRAPER_RATE_BACKOFF")
+    scraper_rate_cooldown_ms: int = Field(default=2000, env="SCRAPER_RATE_COOLDOWN_MS")  # Between backoffs
+    scraper_slow_response_ms: int = Field(default=5000, env="SCRAPER_SLOW_RESPONSE_MS")
+
+    # Job queue (python -m scrapers.worker)
+    scraper_queue_enabled: bool = Field(default=False, env="SCRAPER_QUEUE_ENABLED")  # Leave searches to workers
+    queue_lease_s: int = Field(default=60, env="QUEUE_LEASE_S")
+    queue_max_attempts: int = Field(default=3, env="QUEUE_MAX_ATTEMPTS")
+    queue_retry_backoff_s: float = Field(default=5.0, env="QUEUE_RETRY_BACKOFF_S")  # Doubles per attempt
+    queue_poll_interval_ms: int = Field(default=500, env="QUEUE_POLL_INTERVAL_MS")
 
     # AWS Configuration (for future deployment)
     aws_region: str = Field(default="us-east-1", env="AWS_REGION")
@@ -0,0 +1,245 @@
+"""In-memory grid index over hotel coordinates"""
+import heapq
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+CELL_DEG = 0.05
+
+# Nearest-neighbour search: rings of cells searched one by one, then cells
+# grouped COARSE x COARSE per ring, so sparse areas don't cost a lookup per
+# empty cell
+FINE_RINGS = 8
+COARSE = 16
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def min_distance_km(dlat: float, dlon: float, max_abs_lat: float) -> float:
+    """
+    Lower bound on the distance between points at least dlat degrees apart
+    in latitude or dlon degrees apart in longitude, neither further than
+    max_abs_lat from the equator.
+    """
+    by_lon = 2 * math.asin(math.cos(math.radians(min(90.0, max_abs_lat))) * math.sin(math.radians(min(180.0, dlon)) / 2))
+    return EARTH_RADIUS_KM * max(math.radians(dlat), by_lon)
+
+
+def valid_point(lat: Optional[float], lon: Optional[float]) -> bool:
+    return lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+Match = Tuple[float, Any]
+
+
+class GeoIndex:
+    """Fixed-grid spatial index of items at (latitude, longitude)"""
+
+    def __init__(self, cell_deg: float = CELL_DEG):
+        self.cell_deg = cell_deg
+        self.rows = math.ceil(180 / cell_deg)
+        self.cols = math.ceil(360 / cell_deg)
+        # (row, col) -> (latitudes, longitudes, items)
+        self._cells: Dict[Tuple[int, int], Tuple[List[float], List[float], List[Any]]] = {}
+        # (row // COARSE, col // COARSE) -> keys of its non-empty cells
+        self._coarse: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _row(self, lat: float) -> int:
+        return min(self.rows - 1, max(0, int((lat + 90) // self.cell_deg)))
+
+    def _col(self, lon: float) -> int:
+        return int((lon + 180) // self.cell_deg) % self.cols
+
+    def add(self, item: Any, lat: Optional[float], lon: Optional[float]) -> bool:
+        """Index an item; items without valid coordinates are skipped (returns False)"""
+        if not valid_point(lat, lon):
+            return False
+        key = (self._row(lat), self._col(lon))
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = ([], [], [])
+            self._coarse.setdefault((key[0] // COARSE, key[1] // COARSE), []).append(key)
+        cell[0].append(lat)
+        cell[1].append(lon)
+        cell[2].append(item)
+        self.size += 1
+        return True
+
+    def _scan(self, cell, lat: float, lon: float, max_km: float,
+              predicate: Optional[Callable[[Any], bool]]) -> Iterable[Match]:
+        """(distance, item) for a cell's points within max_km"""
+        max_dlat = max_km / KM_PER_DEG
+        for plat, plon, item in zip(*cell):
+            if abs(plat - lat) > max_dlat:
+                continue
+            if predicate is not None and not predicate(item):
+                continue
+            distance = haversine_km(lat, lon, plat, plon)
+            if distance <= max_km:
+                yield distance, item
+
+    def _columns(self, lon: float, dlon: float) -> Iterable[int]:
+        if dlon >= 180:
+            return range(self.cols)
+        first = int((lon - dlon + 180) // self.cell_deg)
+        last = int((lon + dlon + 180) // self.cell_deg)
+        if last - first + 1 >= self.cols:
+            return range(self.cols)
+        return (col % self.cols for col in range(first, last + 1))
+
+    def within(self, lat: float, lon: float, radius_km: float,
+               predicate: Optional[Callable[[Any], bool]] = None, limit: Optional[int] = None) -> List[Match]:
+        """(distance_km, item) for items within radius_km of a point, nearest first"""
+        if radius_km < 0 or not valid_point(lat, lon):
+            return []
+        dlat = radius_km / KM_PER_DEG
+        top = abs(lat) + dlat
+        dlon = 180.0 if top >= 90 else dlat / math.cos(math.radians(top))
+        rows = range(self._row(lat - dlat), self._row(lat + dlat) + 1)
+        columns = list(self._columns(lon, dlon))
+
+        if len(rows) * len(columns) > len(self._cells):
+            column_set = set(columns)
+            cells = [cell for (row, col), cell in self._cells.items() if row in rows and col in column_set]
+        else:
+            cells = [self._cells[key] for key in ((row, col) for row in rows for col in columns) if key in self._cells]
+
+        matches = [match for cell in cells for match in self._scan(cell, lat, lon, radius_km, predicate)]
+        if limit is not None and limit < len(matches):
+            return heapq.nsmallest(limit, matches, key=lambda match: match[0])
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def nearest(self, lat: float, lon: float, k: int,
+                predicate: Optional[Callable[[Any], bool]] = None, max_km: float = math.inf) -> List[Match]:
+        """(distance_km, item) for the k items nearest to a point (within max_km), nearest first"""
+        if k <= 0 or not self._cells or not valid_point(lat, lon):
+            return []
+        row0, col0 = self._row(lat), self._col(lon)
+        # Max-heap of the best k so far, as (-distance, tiebreak, item)
+        best: List[Tuple[float, int, Any]] = []
+        counter = 0
+
+        def kth() -> float:
+            return -best[0][0] if len(best) >= k else max_km
+
+        def visit(cell):
+            nonlocal counter
+            for distance, item in self._scan(cell, lat, lon, kth(), predicate):
+                counter += 1
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, counter, item))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, counter, item))
+
+        def done(gap_deg: float) -> bool:
+            # Unvisited points are at least gap_deg away in latitude or
+            # longitude, and a point closer than the k-th can't be further
+            # from the equator than that distance allows
+            bound = min(min_distance_km(gap_deg, 0, 0),
+                        min_distance_km(0, gap_deg, abs(lat) + kth() / KM_PER_DEG))
+            return bound >= kth()
+
+        # Rings of cells around the query's cell: enough where hotels are dense
+        for ring in range(FINE_RINGS + 1):
+            for key in self._ring(row0, col0, ring, self.rows, self.cols):
+                cell = self._cells.get(key)
+                if cell is not None:
+                    visit(cell)
+            if done(ring * self.cell_deg):
+                return self._sorted(best)
+
+        # Then rings of coarse cells, visiting their cells outside the rings
+        # above in order of distance, until nothing unvisited can be closer
+        def outside_fine_rings(key) -> bool:
+            return self._chebyshev(key, (row0, col0), self.cols) > FINE_RINGS
+
+        crow0, ccol0 = row0 // COARSE, col0 // COARSE
+        coarse_rows, coarse_cols = math.ceil(self.rows / COARSE), math.ceil(self.cols / COARSE)
+        # A partial last coarse column makes coarse rings narrower across the antimeridian
+        partial = 1 if self.cols % COARSE else 0
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 > len(self._coarse):
+                self._visit_by_distance(lat, lon, visit, kth, lambda key: outside_fine_rings(key) and self._chebyshev(
+                    (key[0] // COARSE, key[1] // COARSE), (crow0, ccol0), coarse_cols) >= ring)
+                break
+            pending = []
+            for coarse_key in self._ring(crow0, ccol0, ring, coarse_rows, coarse_cols):
+                for key in self._coarse.get(coarse_key, ()):
+                    if outside_fine_rings(key):
+                        bound = self._cell_bound(lat, lon, *key)
+                        if bound <= kth():
+                            pending.append((bound, key))
+            pending.sort()
+            for bound, key in pending:
+                if bound > kth():
+                    break
+                visit(self._cells[key])
+            if done(max(FINE_RINGS * self.cell_deg, max(0, ring - partial) * COARSE * self.cell_deg)):
+                break
+            if crow0 - ring <= 0 and crow0 + ring >= coarse_rows - 1 and 2 * ring + 1 >= coarse_cols:
+                break
+            ring += 1
+        return self._sorted(best)
+
+    @staticmethod
+    def _sorted(best) -> List[Match]:
+        return [(-negative, item) for negative, _, item in sorted(best, reverse=True)]
+
+    @staticmethod
+    def _chebyshev(key, origin, cols: int) -> int:
+        col_gap = abs(key[1] - origin[1])
+        return max(abs(key[0] - origin[0]), min(col_gap, cols - col_gap))
+
+    @staticmethod
+    def _ring(row0: int, col0: int, ring: int, rows: int, cols: int) -> Iterable[Tuple[int, int]]:
+        """Keys of the cells of a rows x cols grid at Chebyshev distance ``ring`` from (row0, col0)"""
+        if ring == 0:
+            yield row0, col0
+            return
+        wraps = 2 * ring + 1 > cols
+        columns = range(col0 - ring, col0 + ring + 1)
+        seen = set()
+        for row in range(row0 - ring, row0 + ring + 1):
+            if not 0 <= row < rows:
+                continue
+            edge = row in (row0 - ring, row0 + ring)
+            for col in (columns if edge else (columns[0], columns[-1])):
+                key = (row, col % cols)
+                if wraps:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield key
+
+    def _visit_by_distance(self, lat: float, lon: float, visit, kth, unvisited: Callable[[tuple], bool]):
+        """Visit every unvisited cell in order of distance, while any can hold a closer point"""
+        pending = sorted((self._cell_bound(lat, lon, *key), key) for key in self._cells if unvisited(key))
+        for bound, key in pending:
+            if bound > kth():
+                break
+            visit(self._cells[key])
+
+    def _cell_bound(self, lat: float, lon: float, row: int, col: int) -> float:
+        """Lower bound on the distance from a point to anything in a cell"""
+        south = row * self.cell_deg - 90
+        north = south + self.cell_deg
+        west = col * self.cell_deg - 180
+        dlat = max(0.0, south - lat, lat - north)
+        offset = (lon - west) % 360
+        dlon = 0.0 if offset <= self.cell_deg else min(offset - self.cell_deg, 360 - offset)
+        return max(min_distance_km(dlat, 0, 0), min_distance_km(0, dlon, max(abs(lat), abs(south), abs(north))))
@@ -0,0 +1,387 @@
+"""In-memory trigram index matching free-text locations to cities and hotels"""
+import math
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from heapq import nlargest
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+CITY, HOTEL = "city", "hotel"
+
+# Words a query word expands to, and the trigram similarity a typo needs
+MAX_EXPANSIONS = 6
+WORD_SIMILARITY = 0.45
+# Shorter words only match exactly or as a prefix ("st", "ny")
+MIN_FUZZY_LENGTH = 4
+# Vocabulary words scanned for the completions of the word being typed
+PREFIX_SCAN = 2000
+# Entries taken from each rare query word's postings as candidates (more
+# for resolving, which isn't interactive)
+CANDIDATE_LIMIT = 500
+RESOLVE_CANDIDATE_LIMIT = 5000
+# Matches need at least this share of the query
+MIN_COVERAGE = 0.5
+# A search location resolves to the city it names exactly, else to its best
+# matches among RESOLVE_MATCHES: every query word must match a whole word
+# (at least RESOLVE_WORD_SIMILARITY alike) of an entry's name or address,
+# and the matched words must be most of it; one word may miss in queries of
+# RESOLVE_LOOSE_WORDS or more. Hotel entries within RESOLVE_MARGIN of the
+# best all resolve.
+RESOLVE_WORD_SIMILARITY = 0.4
+RESOLVE_LOOSE_WORDS = 3
+RESOLVE_MARGIN = 0.05
+RESOLVE_MATCHES = 20
+# Abbreviations a resolved location may use, matched as the word too
+ABBREVIATIONS = {"sq": "square", "ave": "avenue", "blvd": "boulevard", "ctr": "center", "intl": "international"}
+# Posting lists append to a tail of at least MIN_TAIL ids, or TAIL_SHARE of
+# the rest, before it is merged into the rest
+MIN_TAIL = 256
+TAIL_SHARE = 0.125
+
+_NO_IDS = np.zeros(0, dtype=np.uint32)
+_NO_WORD = 2 ** 32 - 1
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase ASCII words separated by single spaces"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+
+def trigrams(normalized: str, prefix: bool = False) -> List[str]:
+    """Distinct trigrams of normalized text; with prefix, the last word's end is left out"""
+    words = normalized.split()
+    grams = {}
+    for i, word in enumerate(words):
+        padded = f"  {word} "
+        end = len(padded) - 2
+        if prefix and i == len(words) - 1:
+            end -= 1
+        for j in range(end):
+            grams[padded[j:j + 3]] = None
+    return list(grams)
+
+
+class LocationMatch(NamedTuple):
+    kind: str  # "city" or "hotel"
+    label: str  # "New York, NY" or "Marriott Times Square"
+    city: Optional[str]
+    state: Optional[str]
+    hotels: List[Any]  # The entry's hotels (HotelRecords in the catalog)
+    score: float
+
+
+class _Entry:
+    __slots__ = ("kind", "label", "city", "state", "hotels")
+
+    def __init__(self, kind, label, city, state):
+        self.kind = kind
+        self.label = label
+        self.city = city
+        self.state = state
+        self.hotels = []
+
+
+class _Postings:
+    """
+    Ascending ids: a NumPy array that is never modified (searches read it
+    without copying) and a short array being appended to, merged into a new
+    NumPy array once it outgrows TAIL_SHARE of it.
+    """
+    __slots__ = ("parts",)
+
+    def __init__(self):
+        self.parts = (_NO_IDS, array("I"))
+
+    def __len__(self) -> int:
+        frozen, tail = self.parts
+        return len(frozen) + len(tail)
+
+    def append(self, id_: int):
+        frozen, tail = self.parts
+        tail.append(id_)
+        if len(tail) >= max(MIN_TAIL, len(frozen) * TAIL_SHARE):
+            # One assignment, so a concurrent search sees the old or the new parts
+            self.parts = (np.concatenate((frozen, np.frombuffer(tail, dtype=np.uint32))), array("I"))
+
+    def arrays(self) -> List[np.ndarray]:
+        """The ids as non-empty arrays, each ascending (the tail copied)"""
+        frozen, tail = self.parts
+        parts = [frozen] if len(frozen) else []
+        if tail:
+            parts.append(np.array(tail, dtype=np.uint32))
+        return parts
+
+    def contains(self, ids: np.ndarray) -> np.ndarray:
+        """Which of the (uint32) ids are in the list"""
+        found = np.zeros(len(ids), dtype=bool)
+        for part in self.arrays():
+            positions = np.minimum(np.searchsorted(part, ids), len(part) - 1)
+            found |= part[positions] == ids
+        return found
+
+
+def _add_posting(postings: Dict[Any, _Postings], key, id_: int):
+    ids = postings.get(key)
+    if ids is None:
+        ids = postings[key] = _Postings()
+    ids.append(id_)
+
+
+class _Shard:
+    """The entries of one kind, with ids local to it"""
+    __slots__ = ("entries", "word_counts", "first_words", "postings")
+
+    def __init__(self):
+        self.entries: List[_Entry] = []
+        self.word_counts = array("B")  # Distinct words of each entry's name
+        self.first_words = array("I")  # Word id each entry's name starts with
+        self.postings: Dict[int, _Postings] = {}  # Word id -> entry ids
+
+
+class LocationIndex:
+    """Trigram index of city and hotel entries, updated as hotels are added"""
+
+    def __init__(self):
+        # Vocabulary: words by id, sorted (for completions), and by trigram
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._sorted_words: List[str] = []
+        self._word_grams = array("B")  # Trigrams per word
+        self._word_entries = array("I")  # Entries containing each word
+        self._gram_postings: Dict[str, _Postings] = {}
+        # Cities apart from hotels, so a million hotels can't crowd them out
+        self._shards = {CITY: _Shard(), HOTEL: _Shard()}
+        self._entries: Dict[Tuple[str, str, str], _Entry] = {}
+        # City entries by normalized "city" and "city state"
+        self._cities: Dict[str, List[_Entry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._words)
+
+    def add_hotel(self, hotel):
+        """Index a hotel (anything with name, city, state and address) under its city and hotel entries"""
+        if hotel.city:
+            label = f"{hotel.city}, {hotel.state}" if hotel.state else hotel.city
+            self._entry(CITY, label, hotel.city, hotel.state, ()).hotels.append(hotel)
+        if hotel.name:
+            # Found by address too, but ranked on the name
+            self._entry(HOTEL, hotel.name, hotel.city, hotel.state, (hotel.address,)).hotels.append(hotel)
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            grams = trigrams(word)
+            self._words.append(word)
+            self._word_grams.append(min(len(grams), 255))
+            self._word_entries.append(0)
+            insort(self._sorted_words, word)
+            for gram in grams:
+                _add_posting(self._gram_postings, gram, word_id)
+            self._word_ids[word] = word_id
+        return word_id
+
+    def _entry(self, kind: str, label: str, city, state, extra: Iterable[str]) -> _Entry:
+        normalized = normalize(label)
+        key = (kind, normalized, normalize(city) if kind == HOTEL else "")
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        own = list(dict.fromkeys(self._word_id(word) for word in normalized.split()))
+        words = dict.fromkeys(own)
+        for text in extra:
+            words.update(dict.fromkeys(self._word_id(word) for word in normalize(text).split()))
+
+        # The entry goes in before its postings, which searches find it through
+        shard = self._shards[kind]
+        entry_id = len(shard.entries)
+        entry = _Entry(kind, label, city, state)
+        shard.entries.append(entry)
+        shard.word_counts.append(min(len(own), 255))
+        shard.first_words.append(own[0] if own else _NO_WORD)
+        for word_id in words:
+            self._word_entries[word_id] += 1
+            _add_posting(shard.postings, word_id, entry_id)
+        self._entries[key] = entry
+        if kind == CITY:
+            for name in dict.fromkeys((normalized, normalize(city))):
+                self._cities.setdefault(name, []).append(entry)
+        return entry
+
+    def search(self, query: str, limit: int = 10, kind: str = None, prefix: bool = True,
+               min_coverage: float = MIN_COVERAGE, candidate_limit: int = CANDIDATE_LIMIT) -> List[LocationMatch]:
+        """Best matching entries for free text, best first; with prefix, the last word may be incomplete"""
+        words = normalize(query).split()
+        expansions = [self._expand(word, prefix and i == len(words) - 1) for i, word in enumerate(words)]
+        return [LocationMatch(entry.kind, entry.label, entry.city, entry.state, list(entry.hotels), round(score, 4))
+                for score, entry in self._search(expansions, limit, kind, min_coverage, candidate_limit)]
+
+    def _search(self, expansions: List[Dict[int, float]], limit: int, kind: Optional[str], min_coverage: float,
+                candidate_limit: int) -> List[Tuple[float, _Entry]]:
+        """(score, entry) of the best matches for expanded query words, best first"""
+        if not expansions or limit <= 0:
+            return []
+        scored = []
+        for entry_kind in (CITY, HOTEL) if kind is None else (kind,):
+            scored.extend(self._search_shard(self._shards[entry_kind], expansions, limit, min_coverage,
+                                             candidate_limit))
+        scored.sort(key=lambda item: -item[0])
+        return scored[:limit]
+
+    def resolve(self, location: str, min_similarity: float = RESOLVE_WORD_SIMILARITY) -> List[Any]:
+        """The hotels a search location means: a city's, or the best matching hotels' (empty if unclear)"""
+        normalized = normalize(location)
+        cities = self._cities.get(normalized)
+        if cities:
+            # A city name shared by several states is unclear without the state
+            return list(cities[0].hotels) if len(cities) == 1 else []
+
+        # Whole words only: the last word is not completed as a prefix
+        expansions = []
+        for word in normalized.split():
+            words = self._expand(word, False, min_similarity)
+            if word in ABBREVIATIONS:
+                for word_id, similarity in self._expand(ABBREVIATIONS[word], False, min_similarity).items():
+                    words[word_id] = max(words.get(word_id, 0.0), similarity)
+            expansions.append(words)
+        # Each word's own similarity is checked by _resolves
+        scored = self._search(expansions, RESOLVE_MATCHES, None, min_similarity, RESOLVE_CANDIDATE_LIMIT)
+        matches = [(score, entry) for score, entry in scored if self._resolves(entry, expansions)]
+        if not matches:
+            return []
+        best_score, best = matches[0]
+        if best.kind == CITY:
+            return list(best.hotels)
+        return [hotel for score, entry in matches
+                if entry.kind == HOTEL and score >= best_score - RESOLVE_MARGIN
+                for hotel in entry.hotels]
+
+    def _resolves(self, entry: _Entry, expansions: List[Dict[int, float]]) -> bool:
+        """
+        Whether a match is specific enough to resolve a search to: every
+        query word matches a word of one of the entry's names (its label or
+        city; a hotel's address, city and state count too) and the matched
+        words are more than half of that name, so "Square" alone doesn't
+        resolve to "Marriott Times Square". Queries of RESOLVE_LOOSE_WORDS or
+        more words may have one word too mistyped to match ("Holiday Ion").
+        """
+        loose = 1 if len(expansions) >= RESOLVE_LOOSE_WORDS else 0
+        if entry.kind == CITY:
+            names, context = [entry.label, entry.city], []
+        else:
+            names = [entry.label] + [hotel.address for hotel in entry.hotels[:1] if hotel.address]
+            context = [entry.city, entry.state]
+        context_ids = {self._word_ids.get(word) for text in context for word in normalize(text).split()}
+        for name in names:
+            ids = {self._word_ids.get(word) for word in normalize(name).split()}
+            ids.discard(None)
+            matched = {word_id for word_id in ids if any(word_id in words for words in expansions)}
+            known = ids | context_ids
+            unmatched = sum(not any(word_id in words for word_id in known) for words in expansions)
+            if 2 * len(matched) > len(ids) and unmatched <= loose:
+                return True
+        return False
+
+    def _expand(self, word: str, prefix: bool, min_similarity: float = WORD_SIMILARITY) -> Dict[int, float]:
+        """Word id -> similarity for the indexed words a query word may mean"""
+        expansions = {}
+        word_id = self._word_ids.get(word)
+        if word_id is not None:
+            expansions[word_id] = 1.0
+
+        if prefix:
+            start = bisect_left(self._sorted_words, word)
+            completions = []
+            for other in self._sorted_words[start:start + PREFIX_SCAN]:
+                if not other.startswith(word):
+                    break
+                completions.append(self._word_ids[other])
+            for other_id in nlargest(MAX_EXPANSIONS, completions, key=self._word_entries.__getitem__):
+                expansions[other_id] = 1.0
+
+        if len(word) >= MIN_FUZZY_LENGTH:
+            grams = trigrams(word, prefix=prefix)
+            lists = [part for gram in grams if gram in self._gram_postings
+                     for part in self._gram_postings[gram].arrays()]
+            if lists:
+                shared = np.bincount(np.concatenate(lists))
+                other_ids = np.flatnonzero(shared >= len(grams) * min_similarity)
+                shared = shared[other_ids]
+                if prefix:
+                    # How much of what was typed the word contains
+                    similarity = shared / len(grams)
+                else:
+                    # Copied after the postings, so it covers every word in them
+                    word_grams = np.array(self._word_grams, dtype=np.int64)[other_ids]
+                    similarity = shared / (len(grams) + word_grams - shared)
+                best = np.argsort(-similarity, kind="stable")
+                best = best[similarity[best] >= min_similarity][:MAX_EXPANSIONS]
+                for other_id, other_similarity in zip(other_ids[best].tolist(), similarity[best].tolist()):
+                    expansions[other_id] = max(expansions.get(other_id, 0.0), other_similarity)
+        return expansions
+
+    @staticmethod
+    def _search_shard(shard: _Shard, expansions: List[Dict[int, float]], limit: int, min_coverage: float,
+                      candidate_limit: int) -> List[Tuple[float, _Entry]]:
+        """(score, entry) for a shard's best matches"""
+        # Per query word, (postings, similarity) of its expansions in this shard, best first
+        matches = [sorted(((shard.postings[word_id], similarity) for word_id, similarity in words.items()
+                           if word_id in shard.postings), key=lambda match: -match[1])
+                   for words in expansions]
+        present = sorted((i for i, word_matches in enumerate(matches) if word_matches),
+                         key=lambda i: sum(len(postings) for postings, _ in matches[i]))
+        # An entry covering min_coverage contains at least `required` query
+        # words, so one of any len(present) - required + 1 of them
+        required = max(1, math.ceil(len(expansions) * min_coverage - 1e-9))
+        if len(present) < required:
+            return []
+
+        gathered = []
+        for i in present[:len(present) - required + 1]:
+            budget = candidate_limit
+            for postings, _ in matches[i]:
+                for part in postings.arrays():
+                    gathered.append(part[:budget])
+                    budget -= len(gathered[-1])
+                    if budget <= 0:
+                        break
+                if budget <= 0:
+                    break
+        candidates = np.unique(np.concatenate(gathered))
+
+        # Best similarity of each query word among each candidate's words
+        total = np.zeros(len(candidates))
+        for i in present:
+            best = np.zeros(len(candidates))
+            for postings, similarity in matches[i]:
+                np.maximum(best, postings.contains(candidates) * similarity, out=best)
+            total += best
+        coverage = total / len(expansions)
+        keep = np.flatnonzero(coverage >= min_coverage - 1e-9)
+        if not len(keep):
+            return []
+        candidates, total, coverage = candidates[keep], total[keep], coverage[keep]
+
+        entry_ids = candidates.tolist()
+        word_counts = np.array([shard.word_counts[entry_id] for entry_id in entry_ids], dtype=np.float64)
+        own_share = np.minimum(1.0, total / np.maximum(word_counts, 1))
+        first_words = np.array([shard.first_words[entry_id] for entry_id in entry_ids], dtype=np.uint32)
+        starts = np.isin(first_words, [word_id for word_id, similarity in expansions[0].items() if similarity == 1.0])
+        scores = 0.75 * coverage + 0.25 * own_share + 0.1 * starts
+        if shard.entries and shard.entries[0].kind == CITY:
+            scores += 0.05
+
+        # Best first, then oldest
+        top = np.lexsort((candidates, -scores))[:limit]
+        return [(float(scores[i]), shard.entries[int(candidates[i])]) for i in top]
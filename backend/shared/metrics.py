@@ -0,0 +1,170 @@
+"""Request and SQL metrics in Prometheus text format"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    """Queries and DB time of one request"""
+    __slots__ = ("queries", "db_s", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_s = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being served in this context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def track_request():
+    """Attribute queries run in this context to a new RequestStats"""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_s += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Count queries and DB time on an engine (pass async_engine.sync_engine for async engines)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}  # labels -> [bucket counts..., count, sum]
+
+    def observe(self, labels: Tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self, label_names: Tuple[str, ...]) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _labels(label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base},le="{_number(bound)}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-2]}')
+            lines.append(f"{self.name}_count{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_sum{{{base}}} {_number(series[-1])}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple, value: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self, label_names: Tuple[str, ...]) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_labels(label_names, labels)}}} {_number(value)}")
+        return lines
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_lock = threading.Lock()
+REQUEST_LABELS = ("method", "route", "status")
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", LATENCY_BUCKETS_S
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", QUERY_COUNT_BUCKETS
+)
+db_time = Counter("http_request_db_seconds_total", "Time spent executing SQL statements")
+budget_exceeded = Counter(
+    "http_request_query_budget_exceeded_total", "Requests that ran more SQL statements than the query budget"
+)
+
+
+def observe_request(method: str, route: str, status: int, stats: RequestStats,
+                    over_budget: bool = False):
+    """Record a completed request"""
+    with _lock:
+        request_duration.observe((method, route, status), stats.elapsed_s)
+        request_queries.observe((method, route), stats.queries)
+        db_time.inc((method, route), stats.db_s)
+        if over_budget:
+            budget_exceeded.inc((method, route))
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    with _lock:
+        lines = request_duration.render(REQUEST_LABELS)
+        lines += request_queries.render(ROUTE_LABELS)
+        lines += db_time.render(ROUTE_LABELS)
+        lines += budget_exceeded.render(ROUTE_LABELS)
+    return "\n".join(lines) + "\n"
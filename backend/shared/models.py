@@ -1,8 +1,8 @@
 """Database models using SQLAlchemy ORM"""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, JSON, ForeignKey, Index
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, JSON, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import declarative_base, deferred, relationship
 import uuid
 
 
@@ -58,19 +58,35 @@ class Search(Base):
     status = Column(String, default="pending")  # pending, processing, completed, failed
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     completed_at = Column(DateTime)
+    # Bumped by every result insert and status change, for long-polling readers
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     results = relationship("Result", back_populates="search", cascade="all, delete-orphan")
+    summary = relationship("SearchSummary", uselist=False, cascade="all, delete-orphan")
 
-    # Index for user queries
+    # Indexes for user queries and keyset pagination over (created_at, id)
     __table_args__ = (
         Index('idx_user_created', 'user_id', 'created_at'),
+        Index('idx_created_id', 'created_at', 'id'),
     )
 
     def __repr__(self):
         return f"<Search(id='{self.id}', location='{self.location}', status='{self.status}')>"
 
 
+class SearchSummary(Base):
+    """Materialized results summary, stored once a search completes"""
+    __tablename__ = "search_summaries"
+
+    search_id = Column(String, ForeignKey("searches.id"), primary_key=True)
+    summary = Column(JSON, nullable=False)  # Same shape as GET /api/results/{id}/summary
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SearchSummary(search_id='{self.search_id}')>"
+
+
 class Result(Base):
     """Scraping result for a hotel + discount combination"""
     __tablename__ = "results"
@@ -86,24 +102,44 @@ class Result(Base):
     total_price = Column(Float)
     currency = Column(String, default="USD")
     available = Column(Boolean, default=True)
-    raw_data = Column(JSON)  # Store additional scraped data
+    # Additional scraped data, compressed in raw_payloads; deferred, as only GET .../raw/{id} reads it
+    raw_hash = deferred(Column(String, ForeignKey("raw_payloads.hash")))
     scraped_at = Column(DateTime, default=datetime.utcnow, index=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Search version that added it
 
     # Relationships
     search = relationship("Search", back_populates="results")
     hotel = relationship("Hotel", back_populates="results")
 
-    # Composite indexes for common queries
+    # Composite indexes for common queries; per-search keyset pagination
+    # uses (scraped_at, id) and (total_price, id), long polling (version)
     __table_args__ = (
-        Index('idx_search_scraped', 'search_id', 'scraped_at'),
+        Index('idx_search_scraped_id', 'search_id', 'scraped_at', 'id'),
+        Index('idx_search_version', 'search_id', 'version'),
+        Index('idx_search_price_id', 'search_id', 'total_price', 'id'),
+        Index('idx_search_discount', 'search_id', 'discount_type'),
         Index('idx_hotel_scraped', 'hotel_id', 'scraped_at'),
         Index('idx_discount_type', 'discount_type'),
+        Index('idx_result_raw_hash', 'raw_hash'),
     )
 
     def __repr__(self):
         return f"<Result(hotel_id='{self.hotel_id}', discount='{self.discount_type}', price=${self.total_price})>"
 
 
+class RawPayload(Base):
+    """A result's raw scraped data, zlib-compressed and stored once per distinct payload"""
+    __tablename__ = "raw_payloads"
+
+    hash = Column(String, primary_key=True)  # SHA-256 of the canonical JSON
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    created_at = Column(DateTime, default=datetime.utcnow)  # Refreshed whenever a result reuses the payload
+
+    def __repr__(self):
+        return f"<RawPayload(hash='{self.hash[:12]}', size={self.size})>"
+
+
 class DiscountCode(Base):
     """Discount codes for hotel chains"""
     __tablename__ = "discount_codes"
@@ -125,6 +161,39 @@ class DiscountCode(Base):
         return f"<DiscountCode(chain='{self.hotel_chain}', type='{self.type}', code='{self.code}')>"
 
 
+class Job(Base):
+    """Queued (search, hotel, discount) scrape job, claimed by workers under a lease"""
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    search_id = Column(String, ForeignKey("searches.id"), nullable=False, index=True)
+    hotel_id = Column(String, ForeignKey("hotels.id"), nullable=False)
+    chain = Column(String, nullable=False)
+    discount_type = Column(String, nullable=False)
+    discount_code = Column(String)
+    priority = Column(Integer, nullable=False, default=0)  # Higher is claimed first
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Retry backoff
+    lease_owner = Column(String)  # Worker holding the job while running
+    lease_expires_at = Column(DateTime)
+    last_error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    # Claims scan queued jobs by priority and due time; the lease sweep scans
+    # running jobs by expiry. One job per (search, hotel, discount type).
+    __table_args__ = (
+        Index('idx_job_claim', 'status', 'priority', 'run_after'),
+        Index('idx_job_lease', 'status', 'lease_expires_at'),
+        Index('idx_job_search_hotel_discount', 'search_id', 'hotel_id', 'discount_type', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<Job(search_id='{self.search_id}', hotel_id='{self.hotel_id}', discount='{self.discount_type}', status='{self.status}')>"
+
+
 class User(Base):
     """User account (for future use with authentication)"""
     __tablename__ = "users"
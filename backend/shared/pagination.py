@@ -0,0 +1,59 @@
+"""Opaque keyset cursors for paginated listings"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+# Types of each sort kind's key values, in order; a cursor must match them
+CURSOR_KEYS = {
+    "created": (datetime, str),
+    "scraped_at": (datetime, str),
+    "version": (int, str),
+    "price": ((int, float, type(None)), str),
+}
+
+
+def encode_cursor(kind: str, *values: Any) -> str:
+    """Encode a sort kind and the last row's key values into an opaque cursor"""
+    payload = [kind] + [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str) -> Sequence[Any]:
+    """
+    Decode a cursor produced by encode_cursor for the given sort kind.
+
+    Raises ValueError if the cursor is malformed, was issued for a
+    different sort order, or its key values don't fit the kind's
+    CURSOR_KEYS.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(payload, list) or not payload or payload[0] != kind:
+        raise ValueError(f"Cursor is not valid for '{kind}' ordering")
+
+    keys = CURSOR_KEYS[kind]
+    if len(payload) != len(keys) + 1:
+        raise ValueError(f"Cursor for '{kind}' ordering needs {len(keys)} values")
+    return [_decode_value(value, expected) for value, expected in zip(payload[1:], keys)]
+
+
+def _decode_value(value: Any, expected) -> Any:
+    """A cursor value as the expected type(s), or ValueError"""
+    if expected is datetime:
+        try:
+            return datetime.fromisoformat(value["dt"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor timestamp") from e
+    # JSON true/false would pass as ints
+    if isinstance(value, bool) or not isinstance(value, expected):
+        raise ValueError("Invalid cursor value")
+    return value
@@ -0,0 +1,338 @@
+"""Process-local columnar price history per (hotel, discount type), backed by the results table"""
+import threading
+import weakref
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+
+# Downsampling bucket widths in seconds
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+
+def to_epoch(value: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime (as stored in scraped_at)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    """Naive UTC datetime for seconds since the epoch"""
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def stay_ordinal(check_in: Optional[str]) -> Optional[int]:
+    """Proleptic ordinal of a YYYY-MM-DD check-in date, or None if it can't be parsed"""
+    try:
+        return date.fromisoformat(check_in).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class Segment:
+    """Column arrays for up to ``capacity`` points, sorted by scraped_at"""
+    __slots__ = ("stay_dates", "scraped_at", "prices", "capacity")
+
+    def __init__(self, capacity: int):
+        self.stay_dates = array("i")
+        self.scraped_at = array("d")
+        self.prices = array("d")
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self.scraped_at)
+
+    def accepts(self, scraped_at: float) -> bool:
+        """Whether a point can be appended without breaking the sort order"""
+        return len(self.scraped_at) < self.capacity and (
+            not self.scraped_at or scraped_at >= self.scraped_at[-1]
+        )
+
+    def append(self, stay_date: int, scraped_at: float, price: float):
+        self.stay_dates.append(stay_date)
+        self.scraped_at.append(scraped_at)
+        self.prices.append(price)
+
+    def span(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """Index range of the points scraped in [start, end)"""
+        lo = 0 if start is None else bisect_left(self.scraped_at, start)
+        hi = len(self.scraped_at) if end is None else bisect_left(self.scraped_at, end)
+        return lo, hi
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column)
+                   for column in (self.stay_dates, self.scraped_at, self.prices))
+
+
+class Series:
+    """Append-only list of segments for one (hotel, discount type)"""
+    __slots__ = ("segments", "segment_points")
+
+    def __init__(self, segment_points: int):
+        self.segments: List[Segment] = []
+        self.segment_points = segment_points
+
+    def append(self, stay_date: int, scraped_at: float, price: float):
+        # A point older than the last one starts a new segment, so every
+        # segment stays sorted; segments may then overlap in time
+        if not self.segments or not self.segments[-1].accepts(scraped_at):
+            self.segments.append(Segment(self.segment_points))
+        self.segments[-1].append(stay_date, scraped_at, price)
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def points(self, start: Optional[float], end: Optional[float],
+               stay_date: Optional[int] = None):
+        """Yield (stay_date, scraped_at, price) for points scraped in [start, end)"""
+        for segment in self.segments:
+            if not segment:
+                continue
+            if start is not None and segment.scraped_at[-1] < start:
+                continue
+            if end is not None and segment.scraped_at[0] >= end:
+                continue
+            lo, hi = segment.span(start, end)
+            stays, times, prices = segment.stay_dates, segment.scraped_at, segment.prices
+            for i in range(lo, hi):
+                if stay_date is None or stays[i] == stay_date:
+                    yield stays[i], times[i], prices[i]
+
+
+class PriceHistoryStore:
+    """
+    Price series for the most recently queried hotels, read from results.
+
+    A hotel is backfilled on its first query. Every later query tops it up
+    with the rows scraped after its watermark, less ``overlap_s`` so rows
+    committed late (or by a host with a skewed clock) are still read; rows
+    already held are matched and skipped. At most ``max_hotels`` hotels are
+    held, evicting the least recently queried.
+    """
+
+    def __init__(self, segment_points: int = None, max_hotels: int = None, overlap_s: float = None):
+        self.segment_points = segment_points or settings.price_history_segment_points
+        self.max_hotels = max_hotels or settings.price_history_max_hotels
+        self.overlap_s = settings.price_history_topup_overlap_s if overlap_s is None else overlap_s
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], Series] = {}
+        self._series_by_hotel: Dict[str, List[str]] = {}
+        # Newest scraped_at read from the results table per hotel, in least
+        # recently queried order
+        self._watermarks: "OrderedDict[str, float]" = OrderedDict()
+        self.backfills = 0
+        self.topups = 0
+        self.evictions = 0
+        self.appended = 0
+
+    def tracks(self, hotel_id: str) -> bool:
+        """Whether a hotel's history is held in memory"""
+        return hotel_id in self._watermarks
+
+    def _append(self, hotel_id: str, discount_type: str, stay_date: int,
+                scraped_at: float, price: float):
+        key = (hotel_id, discount_type)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = Series(self.segment_points)
+            self._series_by_hotel.setdefault(hotel_id, []).append(discount_type)
+        series.append(stay_date, scraped_at, price)
+
+    def _evict(self):
+        """Drop the least recently queried hotels beyond max_hotels (lock held)"""
+        while len(self._watermarks) > self.max_hotels:
+            hotel_id, _ = self._watermarks.popitem(last=False)
+            for discount_type in self._series_by_hotel.pop(hotel_id, ()):
+                self._series.pop((hotel_id, discount_type), None)
+            self.evictions += 1
+
+    def _refresh(self, db: Session, hotel_id: str):
+        """Backfill a hotel's series on first use, or read the rows scraped since"""
+        from .models import Result, Search
+
+        with self._lock:
+            watermark = self._watermarks.get(hotel_id)
+            if watermark is not None:
+                self._watermarks.move_to_end(hotel_id)
+        since = None if watermark in (None, float("-inf")) else watermark - self.overlap_s
+
+        # Query without holding the lock: on an async session (run_sync) the
+        # query yields to the event loop, which may need the lock meanwhile
+        query = (
+            select(Result.discount_type, Search.check_in_date, Result.scraped_at, Result.total_price)
+            .join(Search, Search.id == Result.search_id)
+            .where(
+                Result.hotel_id == hotel_id,
+                Result.available == True,
+                Result.total_price.isnot(None)
+            )
+            .order_by(Result.scraped_at)
+        )
+        if since is not None:
+            query = query.where(Result.scraped_at > from_epoch(since))
+        rows = db.execute(query).all()
+
+        with self._lock:
+            # Points already held from the overlap (read before, recorded
+            # locally, or by a concurrent refresh) are not appended again
+            held = Counter()
+            for name in self._series_by_hotel.get(hotel_id, ()):
+                for stay, ts, price in self._series[(hotel_id, name)].points(since, None):
+                    held[(name, stay, ts, price)] += 1
+            latest = self._watermarks.get(hotel_id, float("-inf"))
+            for discount_type, check_in, scraped_at, total_price in rows:
+                stay_date = stay_ordinal(check_in)
+                if stay_date is None or scraped_at is None:
+                    continue
+                ts = to_epoch(scraped_at)
+                latest = max(latest, ts)
+                point = (discount_type, stay_date, ts, total_price)
+                if held[point]:
+                    held[point] -= 1
+                    continue
+                self._append(hotel_id, discount_type, stay_date, ts, total_price)
+            if watermark is None and hotel_id not in self._watermarks:
+                self.backfills += 1
+            else:
+                self.topups += 1
+            self._watermarks[hotel_id] = latest
+            self._watermarks.move_to_end(hotel_id)
+            self._evict()
+
+    def record(self, check_in: str, rows: Iterable[dict]) -> int:
+        """
+        Append committed result rows of one search to the tracked series.
+
+        Rows use the Result column names (hotel_id, discount_type,
+        total_price, available, scraped_at). Rows for hotels that aren't
+        held are skipped; a backfill will read them. Returns the number of
+        points appended.
+        """
+        stay_date = stay_ordinal(check_in)
+        if stay_date is None:
+            return 0
+
+        appended = 0
+        with self._lock:
+            for row in rows:
+                if row["hotel_id"] not in self._watermarks:
+                    continue
+                price, scraped_at = row.get("total_price"), row.get("scraped_at")
+                if price is None or scraped_at is None or not row.get("available", True):
+                    continue
+                self._append(row["hotel_id"], row["discount_type"], stay_date, to_epoch(scraped_at), price)
+                appended += 1
+            self.appended += appended
+        return appended
+
+    def query(self, db: Session, hotel_id: str, discount_type: str = None,
+              start: datetime = None, end: datetime = None, check_in: str = None,
+              bucket: str = None) -> Dict[str, List[dict]]:
+        """
+        Price history of a hotel, keyed by discount type.
+
+        ``start``/``end`` bound scraped_at as [start, end); ``check_in``
+        keeps only prices for that stay date. Without ``bucket`` every point
+        is returned in scrape order; with "hour" or "day" points are
+        downsampled to min/avg/max per bucket.
+        """
+        if bucket is not None and bucket not in BUCKET_SECONDS:
+            raise ValueError(f"Unknown bucket '{bucket}'")
+        stay_date = None
+        if check_in is not None:
+            stay_date = stay_ordinal(check_in)
+            if stay_date is None:
+                raise ValueError(f"Invalid check-in date '{check_in}'")
+
+        self._refresh(db, hotel_id)
+        start_ts = to_epoch(start) if start is not None else None
+        end_ts = to_epoch(end) if end is not None else None
+        types = [discount_type] if discount_type else sorted(self._series_by_hotel.get(hotel_id, ()))
+
+        history = {}
+        for name in types:
+            series = self._series.get((hotel_id, name))
+            if series is None:
+                continue
+            # Reads don't take the lock: appends only extend the last segment
+            # or add a new one, which leaves index ranges already taken valid
+            points = series.points(start_ts, end_ts, stay_date)
+            if bucket is None:
+                history[name] = [
+                    {"scraped_at": from_epoch(ts), "check_in": date.fromordinal(stay).isoformat(),
+                     "total_price": price}
+                    for stay, ts, price in points
+                ]
+            else:
+                history[name] = downsample(points, BUCKET_SECONDS[bucket])
+        return history
+
+    def stats(self) -> dict:
+        """Size of the store"""
+        series = list(self._series.values())
+        return {
+            "hotels": len(self._watermarks),
+            "series": len(series),
+            "points": sum(len(s) for s in series),
+            "segments": sum(len(s.segments) for s in series),
+            "bytes": sum(segment.nbytes() for s in series for segment in s.segments),
+            "max_hotels": self.max_hotels,
+            "backfills": self.backfills,
+            "topups": self.topups,
+            "evictions": self.evictions,
+            "appended": self.appended,
+        }
+
+
+def downsample(points: Iterable[Tuple[int, float, float]], width: int) -> List[dict]:
+    """Min/avg/max of (stay_date, scraped_at, price) points per bucket of ``width`` seconds"""
+    buckets: Dict[int, list] = {}
+    for _, ts, price in points:
+        key = int(ts // width)
+        acc = buckets.get(key)
+        if acc is None:
+            buckets[key] = [price, price, price, 1]
+        else:
+            if price < acc[0]:
+                acc[0] = price
+            if price > acc[1]:
+                acc[1] = price
+            acc[2] += price
+            acc[3] += 1
+    return [
+        {"bucket_start": from_epoch(key * width), "min": low, "avg": round(total / count, 2),
+         "max": high, "count": count}
+        for key, (low, high, total, count) in sorted(buckets.items())
+    ]
+
+
+# One store per database, keyed by URL without the driver so the sync engine
+# (result ingestion) and the async engine (API reads) share a store
+_stores: Dict[str, PriceHistoryStore] = {}
+_stores_by_engine: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_stores_lock = threading.Lock()
+
+
+def get_price_history(db: Session) -> PriceHistoryStore:
+    """Get the price history store for the database a session is bound to"""
+    engine = db.get_bind()
+    store = _stores_by_engine.get(engine)
+    if store is None:
+        with _stores_lock:
+            url = engine.url.set(drivername=engine.url.get_backend_name())
+            store = _stores.setdefault(str(url), PriceHistoryStore())
+            _stores_by_engine[engine] = store
+    return store
+
+
+def price_history_stats() -> dict:
+    """Stats for every price history store in this process, keyed by database"""
+    return {key: store.stats() for key, store in _stores.items()}
@@ -0,0 +1,26 @@
+"""Compressed, content-addressed storage of results' raw scraped data (stored once per distinct payload)"""
+import hashlib
+import zlib
+from typing import Any, NamedTuple
+
+import orjson
+
+
+COMPRESSION_LEVEL = 6
+
+
+class EncodedPayload(NamedTuple):
+    hash: str
+    data: bytes
+    size: int
+
+
+def encode_payload(value: Any) -> EncodedPayload:
+    """Canonical JSON of a payload, compressed, with its content hash"""
+    raw = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return EncodedPayload(hashlib.sha256(raw).hexdigest(), zlib.compress(raw, COMPRESSION_LEVEL), len(raw))
+
+
+def decode_payload(data: bytes) -> Any:
+    """Payload from its stored, compressed form"""
+    return orjson.loads(zlib.decompress(data))
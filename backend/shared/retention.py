@@ -0,0 +1,341 @@
+"""Retention: delete (and optionally archive) searches older than N days, in small batches"""
+import argparse
+import gzip
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import orjson
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, delete, exists, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Job, RawPayload, Result, Search, SearchSummary
+from .raw_payloads import decode_payload
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("ndjson", "parquet")
+
+# Rows per archive read and per IN (...) list of raw payload hashes
+CHUNK_SIZE = 1000
+
+# Tables a retention run deletes from, re-analyzed at the end
+TABLES = ("searches", "search_summaries", "results", "jobs", "raw_payloads")
+
+
+@dataclass
+class RetentionReport:
+    """Counters of one retention run"""
+    cutoff: datetime
+    batches: int = 0
+    searches: int = 0
+    summaries: int = 0
+    results: int = 0
+    jobs: int = 0
+    payloads: int = 0
+    archived: List[str] = field(default_factory=list)
+    duration_s: float = 0.0
+
+
+def _archived_columns(table) -> list:
+    """(name, type) of an archive table's columns"""
+    if table == "results":
+        # raw_hash is replaced by the decoded payload, so archives stand alone
+        return [(c.name, c.type) for c in Result.__table__.c if c.name != "raw_hash"] + [("raw_data", JSON())]
+    model = {"searches": Search, "search_summaries": SearchSummary}[table]
+    return [(c.name, c.type) for c in model.__table__.c]
+
+
+class Archive:
+    """Writes archived rows to one gzipped NDJSON or Parquet file per table"""
+
+    def __init__(self, directory: str, format: str = "ndjson"):
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format {format!r}; expected one of {', '.join(ARCHIVE_FORMATS)}")
+        if format == "parquet":
+            import pyarrow  # noqa: F401  (fail before deleting anything)
+        self.directory = os.path.join(directory, f"retention-{datetime.utcnow():%Y%m%dT%H%M%S}")
+        self.format = format
+        self._writers = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def paths(self) -> List[str]:
+        return [path for path, _ in self._writers.values()]
+
+    def write(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        if table not in self._writers:
+            self._writers[table] = self._open(table)
+        path, writer = self._writers[table]
+        if self.format == "ndjson":
+            writer.write(b"".join(orjson.dumps(row) + b"\n" for row in rows))
+            return
+        import pyarrow as pa
+
+        columns = _archived_columns(table)
+        json_columns = {name for name, type_ in columns if isinstance(type_, JSON)}
+        arrays = {
+            name: [orjson.dumps(row[name]).decode() if name in json_columns and row[name] is not None else row[name]
+                   for row in rows]
+            for name, _ in columns
+        }
+        writer.write_table(pa.table(arrays, schema=writer.schema))
+
+    def _open(self, table: str):
+        if self.format == "ndjson":
+            path = os.path.join(self.directory, f"{table}.ndjson.gz")
+            return path, gzip.open(path, "wb", compresslevel=6)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = os.path.join(self.directory, f"{table}.parquet")
+        schema = pa.schema([(name, _arrow_type(type_)) for name, type_ in _archived_columns(table)])
+        return path, pq.ParquetWriter(path, schema, compression="zstd")
+
+    def close(self):
+        for _, writer in self._writers.values():
+            writer.close()
+
+
+def _arrow_type(type_):
+    import pyarrow as pa
+
+    # JSON is stored as its text; anything else unlisted is a string column
+    for sql_type, arrow_type in ((Boolean, pa.bool_()), (Integer, pa.int64()), (Float, pa.float64()),
+                                 (DateTime, pa.timestamp("us"))):
+        if isinstance(type_, sql_type):
+            return arrow_type
+    return pa.string()
+
+
+def _chunks(values: list, size: int = CHUNK_SIZE) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def archive_batch(db: Session, archive: Archive, search_ids: List[str]):
+    """Stream a batch's searches, summaries and results (raw data decoded) into the archive"""
+    searches = Search.__table__
+    archive.write("searches", [dict(row) for row in db.execute(
+        select(searches).where(searches.c.id.in_(search_ids))).mappings()])
+
+    summaries = SearchSummary.__table__
+    archive.write("search_summaries", [dict(row) for row in db.execute(
+        select(summaries).where(summaries.c.search_id.in_(search_ids))).mappings()])
+
+    results = Result.__table__
+    payloads = RawPayload.__table__
+    stmt = (
+        select(*(c for c in results.c if c.name != "raw_hash"), payloads.c.data)
+        .select_from(results.outerjoin(payloads, payloads.c.hash == results.c.raw_hash))
+        .where(results.c.search_id.in_(search_ids))
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    for chunk in db.execute(stmt).mappings().partitions():
+        rows = []
+        for row in chunk:
+            row = dict(row)
+            data = row.pop("data")
+            row["raw_data"] = decode_payload(data) if data is not None else None
+            rows.append(row)
+        archive.write("results", rows)
+
+
+def delete_batch(db: Session, search_ids: List[str], report: RetentionReport, payload_cutoff: datetime):
+    """
+    Delete a batch of searches with everything that references them; the caller commits.
+
+    Raw payloads the deleted results used go too, unless another result
+    references them or they were written after ``payload_cutoff`` (a
+    concurrent ingest may be about to reference them).
+    """
+    results = Result.__table__
+    raw_hashes = db.scalars(
+        delete(results).where(results.c.search_id.in_(search_ids)).returning(results.c.raw_hash)
+    ).all()
+    report.results += len(raw_hashes)
+    hashes = list({raw_hash for raw_hash in raw_hashes if raw_hash is not None})
+
+    report.summaries += db.execute(delete(SearchSummary).where(SearchSummary.search_id.in_(search_ids))).rowcount
+    report.jobs += db.execute(delete(Job).where(Job.search_id.in_(search_ids))).rowcount
+    report.searches += db.execute(delete(Search).where(Search.id.in_(search_ids))).rowcount
+
+    # Payloads of the deleted results that no remaining result shares
+    for chunk in _chunks(hashes):
+        report.payloads += _delete_orphan_payloads(db, chunk, payload_cutoff)
+
+
+def _delete_orphan_payloads(db: Session, hashes: List[str], cutoff: datetime) -> int:
+    """Delete the given payloads that no result references and that were last written before the cutoff"""
+    return db.execute(
+        delete(RawPayload)
+        .where(RawPayload.hash.in_(hashes), RawPayload.created_at < cutoff)
+        .where(~exists().where(Result.raw_hash == RawPayload.hash))
+    ).rowcount
+
+
+def sweep_orphan_payloads(engine: Engine, cutoff: datetime, report: RetentionReport, pause_s: float = 0.0):
+    """
+    Delete orphaned payloads left by earlier runs, walking raw_payloads by hash.
+
+    Payloads still inside the grace window when their results were deleted
+    are skipped by delete_batch; this picks them up on a later run. Each
+    chunk of CHUNK_SIZE hashes is its own short transaction.
+    """
+    last = ""
+    while True:
+        with Session(engine, autoflush=False) as db:
+            hashes = db.scalars(
+                select(RawPayload.hash).where(RawPayload.hash > last).order_by(RawPayload.hash).limit(CHUNK_SIZE)
+            ).all()
+            if not hashes:
+                return
+            report.payloads += _delete_orphan_payloads(db, hashes, cutoff)
+            db.commit()
+        last = hashes[-1]
+        if pause_s > 0:
+            time.sleep(pause_s)
+
+
+def _is_sqlite(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+def _incremental_vacuum(engine: Engine, pages: int):
+    """Give back up to ``pages`` free pages, if the SQLite database uses auto_vacuum=INCREMENTAL"""
+    if not _is_sqlite(engine) or pages <= 0:
+        return
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            # Each step of the pragma frees one page and execute() only takes one step;
+            # executescript runs it to completion
+            conn.connection.dbapi_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+
+
+def enable_incremental_vacuum(engine: Engine):
+    """Switch a SQLite database to auto_vacuum=INCREMENTAL; a full VACUUM that locks the database"""
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+
+
+def analyze(engine: Engine):
+    """Refresh planner statistics for the tables retention deletes from"""
+    with engine.connect() as conn:
+        if _is_sqlite(engine):
+            # Sample at most ~1000 rows per index instead of scanning
+            conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+            for table in TABLES:
+                conn.exec_driver_sql(f"ANALYZE {table}")
+            conn.commit()
+        else:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in TABLES:
+                conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+
+
+def count_expired(engine: Engine, cutoff: datetime) -> tuple:
+    """(searches, results) created before the cutoff"""
+    with Session(engine) as db:
+        expired = select(Search.id).where(Search.created_at < cutoff)
+        return (db.scalar(select(func.count()).select_from(expired.subquery())),
+                db.scalar(select(func.count()).select_from(Result).where(Result.search_id.in_(expired))))
+
+
+def run_retention(engine: Engine, days: int = None, batch_size: int = None, pause_s: float = None,
+                  archive: Optional[Archive] = None, vacuum_pages: int = None,
+                  max_batches: Optional[int] = None, payload_grace_s: float = None) -> RetentionReport:
+    """
+    Delete searches created more than ``days`` ago, archiving them first when given an archive.
+
+    Raw payloads written in the last ``payload_grace_s`` seconds are kept
+    even when unreferenced; a later run collects them.
+    """
+    days = settings.retention_days if days is None else days
+    batch_size = batch_size or settings.retention_batch_size
+    pause_s = settings.retention_pause_ms / 1000 if pause_s is None else pause_s
+    vacuum_pages = settings.retention_vacuum_pages if vacuum_pages is None else vacuum_pages
+    payload_grace_s = settings.retention_payload_grace_s if payload_grace_s is None else payload_grace_s
+
+    report = RetentionReport(cutoff=datetime.utcnow() - timedelta(days=days))
+    started = time.monotonic()
+    try:
+        while max_batches is None or report.batches < max_batches:
+            with Session(engine, autoflush=False) as db:
+                search_ids = db.scalars(
+                    select(Search.id).where(Search.created_at < report.cutoff)
+                    .order_by(Search.created_at, Search.id).limit(batch_size)
+                ).all()
+                if not search_ids:
+                    break
+                if archive is not None:
+                    archive_batch(db, archive, search_ids)
+                # End the read snapshot so the deletes start a fresh write transaction
+                db.rollback()
+                delete_batch(db, search_ids, report, datetime.utcnow() - timedelta(seconds=payload_grace_s))
+                db.commit()
+            report.batches += 1
+            logger.info("Batch %d: deleted %d searches (%d so far)", report.batches, len(search_ids), report.searches)
+            _incremental_vacuum(engine, vacuum_pages)
+            if pause_s > 0:
+                time.sleep(pause_s)
+        if max_batches is None or report.batches < max_batches:
+            sweep_orphan_payloads(engine, datetime.utcnow() - timedelta(seconds=payload_grace_s), report, pause_s)
+    finally:
+        if archive is not None:
+            archive.close()
+            report.archived = archive.paths
+    if report.batches or report.payloads:
+        analyze(engine)
+    report.duration_s = time.monotonic() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete (and optionally archive) searches older than N days")
+    parser.add_argument("--days", type=int, default=settings.retention_days,
+                        help="Keep searches created in the last DAYS days (default: RETENTION_DAYS)")
+    parser.add_argument("--batch-size", type=int, default=settings.retention_batch_size,
+                        help="Searches per delete transaction (default: RETENTION_BATCH_SIZE)")
+    parser.add_argument("--pause-ms", type=int, default=settings.retention_pause_ms,
+                        help="Pause between batches (default: RETENTION_PAUSE_MS)")
+    parser.add_argument("--archive-dir", default=settings.retention_archive_dir,
+                        help="Archive rows here before deleting them (default: RETENTION_ARCHIVE_DIR; none)")
+    parser.add_argument("--format", choices=ARCHIVE_FORMATS, default=settings.retention_archive_format,
+                        help="Archive file format (default: RETENTION_ARCHIVE_FORMAT)")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="SQLite: switch to auto_vacuum=INCREMENTAL first (one full VACUUM that locks the database)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be deleted")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    from .database import engine, init_db
+
+    init_db()
+    if args.dry_run:
+        cutoff = datetime.utcnow() - timedelta(days=args.days)
+        searches, results = count_expired(engine, cutoff)
+        logger.info("Would delete %d searches and %d results created before %s", searches, results, cutoff)
+        return
+    if args.vacuum and _is_sqlite(engine):
+        logger.info("Switching to auto_vacuum=INCREMENTAL (full VACUUM)")
+        enable_incremental_vacuum(engine)
+
+    archive = Archive(args.archive_dir, args.format) if args.archive_dir else None
+    report = run_retention(engine, days=args.days, batch_size=args.batch_size, pause_s=args.pause_ms / 1000,
+                           archive=archive, max_batches=args.max_batches)
+    logger.info("Retention finished: %s", report)
+
+
+if __name__ == "__main__":
+    main()
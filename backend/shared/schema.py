@@ -0,0 +1,60 @@
+"""Schema version check at startup: no DDL when current, Alembic upgrade otherwise"""
+import os
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .config import settings
+
+# Head revision in migrations/versions; bump it with every new migration
+SCHEMA_VERSION = "0004"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def current_schema_version(connection: Connection) -> Optional[str]:
+    """Applied Alembic revision, or None for an unversioned database"""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def upgrade_schema(engine: Engine, revision: str = "head"):
+    """Run Alembic migrations up to a revision on an engine"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = None) -> str:
+    """
+    Make sure the database is at SCHEMA_VERSION.
+
+    Returns "current" when nothing had to be done and "migrated" after an
+    upgrade. Raises RuntimeError if the schema is behind and auto-migration
+    is off.
+    """
+    with engine.connect() as connection:
+        version = current_schema_version(connection)
+    if version == SCHEMA_VERSION:
+        return "current"
+
+    if auto_migrate is None:
+        auto_migrate = settings.schema_auto_migrate
+    if auto_migrate is None:
+        auto_migrate = settings.environment == "development"
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at {version or 'an unversioned state'}, expected {SCHEMA_VERSION}. "
+            "Run 'alembic upgrade head' from backend/."
+        )
+
+    upgrade_schema(engine)
+    return "migrated"
@@ -0,0 +1,236 @@
+"""Search cache with TTL and in-flight request coalescing"""
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from .config import settings
+
+
+def search_cache_key(location: str, check_in: str, check_out: str,
+                     guests: int, discount_types: Optional[Iterable[str]], near: Optional[dict] = None) -> str:
+    """Build the cache key for a search from its normalized parameters"""
+    normalized_location = " ".join(location.lower().replace(",", " ").split())
+    types = sorted({t.strip().lower() for t in discount_types or []} - {"none", ""})
+    parts = [normalized_location, check_in.strip(), check_out.strip(), str(guests), ",".join(types)]
+    if near:
+        parts.append(f"{near['latitude']:.5f},{near['longitude']:.5f},{near['radius_km']:g}")
+    raw = "|".join(parts)
+    return "search:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Key/value store with per-entry expiry used by SearchCache"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for a key, or None if missing or expired"""
+        pass
+
+    @abstractmethod
+    def add(self, key: str, value: str, ttl_s: int) -> bool:
+        """Store a value only if the key is absent; returns True if stored"""
+        pass
+
+    @abstractmethod
+    def delete_if(self, key: str, value: str) -> bool:
+        """Remove a key only if it still holds ``value``; returns True if removed"""
+        pass
+
+    @abstractmethod
+    def refresh(self, key: str, value: str, ttl_s: int) -> bool:
+        """Reset a key's expiry only if it still holds ``value``; returns True if reset"""
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def add(self, key: str, value: str, ttl_s: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def _live(self, key: str, value: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] == value and entry[1] > time.monotonic()
+
+    def delete_if(self, key: str, value: str) -> bool:
+        with self._lock:
+            if not self._live(key, value):
+                return False
+            del self._entries[key]
+            return True
+
+    def refresh(self, key: str, value: str, ttl_s: int) -> bool:
+        with self._lock:
+            if not self._live(key, value):
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl_s)
+            return True
+
+
+# KEYS[1]: cache key; ARGV: expected value
+_DELETE_IF_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+# KEYS[1]: cache key; ARGV: expected value, ttl_s
+_REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('EXPIRE', KEYS[1], ARGV[2]) end
+return 0
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers through Redis (SET NX with expiry, compare-and-delete scripts)"""
+
+    def __init__(self, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        self.client = client
+        self._delete_if = client.register_script(_DELETE_IF_SCRIPT)
+        self._refresh = client.register_script(_REFRESH_SCRIPT)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def add(self, key: str, value: str, ttl_s: int) -> bool:
+        return bool(self.client.set(key, value, nx=True, ex=ttl_s))
+
+    def delete_if(self, key: str, value: str) -> bool:
+        return bool(self._delete_if(keys=[key], args=[value]))
+
+    def refresh(self, key: str, value: str, ttl_s: int) -> bool:
+        return bool(self._refresh(keys=[key], args=[value, ttl_s]))
+
+
+class SearchCache:
+    """Resolves new searches to existing ones and counts hits, misses and coalesced requests"""
+
+    def __init__(self, backend: CacheBackend, ttl_s: int = None, pending_ttl_s: int = None):
+        self.backend = backend
+        self.ttl_s = ttl_s or settings.search_cache_ttl_s
+        self.pending_ttl_s = pending_ttl_s or settings.search_cache_pending_ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def claim(self, db_client, key: str, search_id: str):
+        """
+        Return the cached Search for a key, or claim the key for search_id.
+
+        Returns an existing Search when a fresh completed search (hit) or an
+        in-flight search (coalesced) matches. Returns None when the caller
+        now owns the key and should create a search with ``search_id``, then
+        call ``confirm``. Until then the claim only lasts pending_ttl_s, so
+        a claimant that dies before creating its search doesn't leave
+        identical requests attached to a search that never appears.
+        """
+        for _ in range(2):
+            existing_id = self.backend.get(key)
+            if existing_id is not None:
+                search = db_client.get_search(existing_id)
+                if search is None or search.status in ("pending", "processing"):
+                    # A missing row means the owner is still creating it
+                    self._count("coalesced")
+                    return search or _PendingSearch(existing_id)
+                if search.status == "completed" and self._is_fresh(search):
+                    self._count("hits")
+                    return search
+                # Failed or stale; let this request start a fresh search.
+                # Only the entry read above is removed, so of several
+                # requests seeing it at once just one gets to replace it.
+                self.backend.delete_if(key, existing_id)
+
+            if self.backend.add(key, search_id, self.pending_ttl_s):
+                self._count("misses")
+                return None
+
+        self._count("misses")
+        return None
+
+    def confirm(self, key: str, search_id: str) -> bool:
+        """Keep a claim for the full TTL once its search is created; False if it was lost meanwhile"""
+        return self.backend.refresh(key, search_id, self.ttl_s)
+
+    def release(self, key: str, search_id: str):
+        """Drop a claim, e.g. when creating the claimed search failed"""
+        self.backend.delete_if(key, search_id)
+
+    def stats(self) -> dict:
+        """Counters since process start"""
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_s": self.ttl_s,
+            "pending_ttl_s": self.pending_ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+        }
+
+    def _is_fresh(self, search) -> bool:
+        if search.completed_at is None:
+            return False
+        return search.completed_at >= datetime.utcnow() - timedelta(seconds=self.ttl_s)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class _PendingSearch:
+    """Stand-in for a claimed search whose row is not committed yet"""
+
+    def __init__(self, search_id: str):
+        self.id = search_id
+        self.status = "pending"
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Process-wide search cache configured from settings (None if disabled)"""
+    global _search_cache
+    if _search_cache is None and settings.search_cache_backend != "none":
+        if settings.search_cache_backend == "redis":
+            backend = RedisCacheBackend()
+        else:
+            backend = InMemoryCacheBackend(settings.search_cache_max_entries)
+        _search_cache = SearchCache(backend)
+    return _search_cache
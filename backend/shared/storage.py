@@ -0,0 +1,99 @@
+"""Storage profiles for database engines"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .config import settings
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str, profile: str = None, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine/create_async_engine under a profile"""
+    profile = profile or settings.storage_profile
+    echo = settings.database_echo
+    options = {
+        "echo": settings.environment == "development" if echo is None else echo
+    }
+    if _is_sqlite(url):
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if profile == "tuned" and not _is_memory_sqlite(url):
+            options["connect_args"] = {**options.get("connect_args", {}),
+                                       "timeout": settings.sqlite_busy_timeout_ms / 1000}
+            options.update(_pool_options())
+            if is_async:
+                # aiosqlite defaults to NullPool, which opens a connection
+                # (and its worker thread) per session
+                options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+
+    if profile == "tuned":
+        options.update(_pool_options())
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+        "pool_recycle": settings.db_pool_recycle_s,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def apply_storage_profile(engine: Engine, profile: str = None) -> Engine:
+    """Register per-connection setup (SQLite PRAGMAs) for a sync engine or an async engine's sync_engine"""
+    profile = profile or settings.storage_profile
+    url = str(engine.url)
+    if profile != "tuned" or not _is_sqlite(url):
+        return engine
+
+    pragmas = [
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if not _is_memory_sqlite(url):
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_storage_engine(url: str = None, profile: str = None) -> Engine:
+    """Create a sync engine configured for the storage profile"""
+    url = url or settings.database_url
+    engine = create_engine(url, **engine_options(url, profile))
+    return apply_storage_profile(engine, profile)
+
+
+def create_async_storage_engine(url: str, profile: str = None):
+    """Create an async engine configured for the storage profile"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, **engine_options(url, profile, is_async=True))
+    apply_storage_profile(engine.sync_engine, profile)
+    return engine
@@ -0,0 +1,87 @@
+"""Shared fixtures for the backend tests"""
+import asyncio
+import os
+import tempfile
+
+# Settings and engines are created at import, so point them at a scratch
+# database before anything from shared/ is imported
+_data_dir = tempfile.mkdtemp(prefix="travel-discounts-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_data_dir}/test.db"
+os.environ["DATABASE_ECHO"] = "false"
+os.environ["SCHEMA_AUTO_MIGRATE"] = "true"
+os.environ["SEARCH_CACHE_BACKEND"] = "memory"
+os.environ["RESULTS_NOTIFY_BACKEND"] = "memory"
+os.environ["SCRAPER_RATE_BACKEND"] = "memory"
+os.environ["SCRAPER_FAKE_SITES"] = "false"
+os.environ["SCRAPER_QUEUE_ENABLED"] = "false"
+os.environ["SCRAPER_PARSE_WORKERS"] = "0"
+
+import pytest
+
+from shared import analytics, price_history, search_cache
+from shared.async_database import async_engine
+from shared.catalog import bump_catalog_version
+from shared.database import SessionLocal, DatabaseClient, engine, init_db
+from shared.models import Base
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running stress tests (deselect with -m 'not slow')")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Migrate the scratch database once"""
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Empty every table and drop the per-process caches built from them"""
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    bump_catalog_version()
+    price_history._stores.clear()
+    price_history._stores_by_engine.clear()
+    search_cache._search_cache = None
+    analytics._reports.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    """A sync session on the scratch database"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def db_client(db):
+    return DatabaseClient(db)
+
+
+@pytest.fixture
+def client():
+    """API client; the app starts and shuts down (disposing the async engine) per test"""
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a new event loop, closing the async engine's connections before the loop goes"""
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
@@ -0,0 +1,19 @@
+"""Test data builders"""
+
+
+def make_hotel(db_client, name, chain="Marriott", city="New York", state="NY", **kwargs):
+    """Create a hotel with the fields the lookups key on"""
+    return db_client.create_hotel(name=name, chain=chain, city=city, state=state, **kwargs)
+
+
+def make_search(db_client, location="New York, NY", status=None, **kwargs):
+    """Create a search, optionally moved to a status"""
+    search = db_client.create_search("anonymous", location, "2026-03-01", "2026-03-03", 2, **kwargs)
+    if status:
+        search = db_client.update_search_status(search.id, status)
+    return search
+
+
+def prices(total, **kwargs):
+    """A scraped price dict with a given total"""
+    return {"original": total, "discounted": total, "taxes": 0.0, "fees": 0.0, "total": total, **kwargs}
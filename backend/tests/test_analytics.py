@@ -0,0 +1,78 @@
+"""Discount analytics: pairing with the public rate, hit rates, availability and savings percentiles"""
+import pytest
+
+from .factories import make_hotel, make_search, prices
+
+
+@pytest.fixture(autouse=True)
+def results(db_client):
+    hilton_ny = make_hotel(db_client, "Hilton Midtown", chain="Hilton", city="New York")
+    hilton_boston = make_hotel(db_client, "Hilton Back Bay", chain="Hilton", city="Boston", state="MA")
+    marriott_ny = make_hotel(db_client, "Marriott Times Square", chain="Marriott", city="New York")
+    first, second, third = (make_search(db_client) for _ in range(3))
+    rows = [
+        (first, hilton_ny, "none", 200.0, True),
+        (first, hilton_ny, "aarp", 190.0, True),
+        (first, hilton_ny, "aarp", 180.0, True),  # The best of a search's rates counts
+        (first, hilton_ny, "senior", 170.0, False),
+        (first, hilton_boston, "none", 100.0, True),
+        (first, hilton_boston, "aarp", 110.0, True),
+        (first, marriott_ny, "none", 300.0, True),
+        (first, marriott_ny, "aaa", 240.0, True),
+        (second, hilton_ny, "none", 200.0, True),
+        (second, hilton_ny, "aarp", 150.0, True),
+        (second, hilton_ny, "senior", 170.0, False),
+        # No public rate to compare with: sold out, then not looked up at all
+        (second, hilton_boston, "none", 95.0, False),
+        (second, hilton_boston, "aarp", 90.0, True),
+        (third, hilton_boston, "aarp", 80.0, True),
+    ]
+    for search, hotel, discount_type, total, available in rows:
+        db_client.create_result(search.id, hotel.id, discount_type, prices(total), available=available)
+
+
+def report(client, **params):
+    response = client.get("/api/analytics/discounts", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_report_by_chain(client):
+    body = report(client)
+    assert (body["results_scanned"], body["rates_compared"]) == (14, 4)
+    assert body["groups"] == [
+        {"chain": "Hilton", "discount_type": "aarp", "lookups": 5, "availability": 1.0, "compared": 3,
+         "hit_rate": 0.6667, "avg_savings": 20.0,
+         "savings_pct": {"p25": 0.0, "p50": 10.0, "p75": 17.5, "p90": 22.0}},
+        # Looked up but never available: nothing to compare
+        {"chain": "Hilton", "discount_type": "senior", "lookups": 2, "availability": 0.0, "compared": 0,
+         "hit_rate": None, "avg_savings": None, "savings_pct": None},
+        {"chain": "Marriott", "discount_type": "aaa", "lookups": 1, "availability": 1.0, "compared": 1,
+         "hit_rate": 1.0, "avg_savings": 60.0,
+         "savings_pct": {"p25": 20.0, "p50": 20.0, "p75": 20.0, "p90": 20.0}},
+    ]
+
+
+def test_report_by_chain_and_city(client):
+    groups = {(g["chain"], g["city"], g["discount_type"]): g for g in report(client, by="chain_city")["groups"]}
+    assert sorted(groups) == [("Hilton", "Boston", "aarp"), ("Hilton", "New York", "aarp"),
+                              ("Hilton", "New York", "senior"), ("Marriott", "New York", "aaa")]
+
+    boston = groups["Hilton", "Boston", "aarp"]
+    assert (boston["lookups"], boston["compared"], boston["hit_rate"], boston["avg_savings"]) == (3, 1, 0.0, -10.0)
+    assert boston["savings_pct"] == {"p25": -10.0, "p50": -10.0, "p75": -10.0, "p90": -10.0}
+
+    new_york = groups["Hilton", "New York", "aarp"]
+    assert (new_york["lookups"], new_york["compared"], new_york["hit_rate"], new_york["avg_savings"]) == \
+        (2, 2, 1.0, 35.0)
+    assert new_york["savings_pct"] == {"p25": 13.75, "p50": 17.5, "p75": 21.25, "p90": 23.5}
+
+
+def test_report_for_one_chain(client):
+    body = report(client, chain="Marriott")
+    assert body["results_scanned"] == 2
+    assert [(g["chain"], g["discount_type"]) for g in body["groups"]] == [("Marriott", "aaa")]
+
+
+def test_unknown_grouping_is_rejected(client):
+    assert client.get("/api/analytics/discounts", params={"by": "city"}).status_code == 422
@@ -0,0 +1,101 @@
+"""In-memory catalog: reloads on writes and with age, in-place hotel adds, and the same answers as the database"""
+import pytest
+from sqlalchemy import insert
+
+from shared.catalog import get_catalog
+from shared.config import settings
+from shared.models import Hotel
+
+from .factories import make_hotel
+
+HOTELS = [
+    ("Marriott Times Square", "Marriott", "New York", "NY", 40.758, -73.986),
+    ("Courtyard Midtown", "Marriott", "New York", "NY", 40.754, -73.984),
+    ("Hilton Midtown", "Hilton", "New York", "NY", 40.762, -73.979),
+    ("Hilton Boston Back Bay", "Hilton", "Boston", "MA", 42.347, -71.085),
+    ("Holiday Inn Express Boston", "IHG", "Boston", "MA", None, None),
+]
+
+
+@pytest.fixture
+def catalog(db, db_client):
+    for name, chain, city, state, latitude, longitude in HOTELS:
+        make_hotel(db_client, name, chain=chain, city=city, state=state, latitude=latitude, longitude=longitude,
+                   address=f"1 {name} Way")
+    for chain, code_type, code in (("Marriott", "aarp", "ZA9"), ("Hilton", "aarp", "HAARP"),
+                                   ("Hilton", "senior", "HSEN")):
+        db_client.create_discount_code(code, code_type, chain)
+    catalog = get_catalog(db)
+    catalog.hotels_by_chain(db, "Marriott")
+    return catalog
+
+
+def test_new_discount_code_reloads_the_catalog(db, db_client, catalog):
+    loads = catalog.loads
+    assert [c.code for c in db_client.get_discount_codes("IHG")] == []
+    assert catalog.loads == loads
+
+    db_client.create_discount_code("IHGAAA", "aaa", "IHG")
+    assert [c.code for c in db_client.get_discount_codes("IHG")] == ["IHGAAA"]
+    assert catalog.loads == loads + 1
+
+
+def test_new_hotel_is_added_in_place(db, db_client, catalog):
+    # Build the location index too, so the in-place add has to reach it
+    assert db_client.resolve_location("Hilton Midtwn")
+    loads, added = catalog.loads, catalog.hotels_added
+
+    hotel = make_hotel(db_client, "Hilton Garden Inn Chelsea", chain="Hilton", city="New York", state="NY",
+                       latitude=40.745, longitude=-73.993)
+    assert catalog.hotels_added == added + 1
+    assert hotel.id in {h.id for h in db_client.get_hotels_by_chain_city("Hilton", "New York")}
+    assert db_client.get_hotel_by_name_city("Hilton Garden Inn Chelsea", "New York").id == hotel.id
+    assert hotel.id in {h.id for _, h in db_client.get_hotels_near(40.745, -73.993, 1.0)}
+    assert [h.id for h in db_client.resolve_location("Hilton Garden Inn Chelsea")] == [hotel.id]
+    assert catalog.loads == loads
+
+
+def test_write_from_another_process_shows_once_the_catalog_expires(db, db_client, catalog):
+    # Inserted without a version bump, as another process's write looks here
+    db.execute(insert(Hotel).values(id="elsewhere", name="Hyatt Place", chain="Hyatt", city="Boston", state="MA"))
+    db.commit()
+    assert db_client.get_hotels_by_chain_city("Hyatt", "Boston") == []
+
+    catalog._loaded_at -= catalog.max_age_s + 1
+    assert [h.id for h in db_client.get_hotels_by_chain_city("Hyatt", "Boston")] == ["elsewhere"]
+    assert catalog.stats()["stale_for_s"] is None
+
+
+LOOKUPS = {
+    "hotel_by_name_city": lambda c: c.get_hotel_by_name_city("Hilton Midtown", "New York"),
+    "missing_hotel": lambda c: c.get_hotel_by_name_city("Hilton Midtown", "Boston"),
+    "chain_city": lambda c: c.get_hotels_by_chain_city("Marriott", "New York"),
+    "codes": lambda c: c.get_discount_codes("Hilton"),
+    "codes_by_type": lambda c: c.get_discount_codes("Hilton", "senior"),
+    "near": lambda c: c.get_hotels_near(40.758, -73.986, 1.0),
+    "near_chain": lambda c: c.get_hotels_near(40.758, -73.986, 500.0, chain="Hilton"),
+    "nearest": lambda c: c.get_nearest_hotels(42.0, -72.0, 2),
+    "nearest_within": lambda c: c.get_nearest_hotels(40.758, -73.986, 5, max_km=2.0),
+    "suggest": lambda c: c.suggest_locations("hilt", 5),
+    "resolve": lambda c: c.resolve_location("Boston"),
+}
+
+
+def ids(value):
+    """Comparable form of a lookup's answer"""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [ids(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(ids(item) for item in value)
+    if isinstance(value, float):
+        return round(value, 6)
+    return getattr(value, "id", value)
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS, ids=list(LOOKUPS))
+def test_catalog_matches_the_database(db_client, catalog, monkeypatch, lookup):
+    cached = ids(LOOKUPS[lookup](db_client))
+    monkeypatch.setattr(settings, "catalog_enabled", False)
+    assert cached == ids(LOOKUPS[lookup](db_client))
@@ -0,0 +1,39 @@
+"""Rate page extraction: every saved fixture page parses to its expected rates and quotes, whole or incrementally"""
+import json
+import os
+from dataclasses import asdict
+
+import pytest
+
+from scrapers.extraction import SPECS, fixture_pages, get_extractor
+
+CHAINS = {chain.lower(): chain for chain in SPECS}
+
+
+def load_fixture(path):
+    """(chain, page bytes, expected .json) of a fixture page"""
+    with open(path, "rb") as f:
+        page = f.read()
+    with open(path[:-len(".html")] + ".json") as f:
+        expected = json.load(f)
+    return CHAINS[os.path.basename(os.path.dirname(path))], page, expected
+
+
+FIXTURES = fixture_pages()
+FIXTURE_IDS = [os.path.relpath(path, os.path.dirname(os.path.dirname(path))) for path in FIXTURES]
+
+
+def test_every_chain_has_fixtures():
+    assert {CHAINS[os.path.basename(os.path.dirname(path))] for path in FIXTURES} == set(SPECS)
+
+
+@pytest.mark.parametrize("incremental", [False, True], ids=["tree", "iterparse"])
+@pytest.mark.parametrize("path", FIXTURES, ids=FIXTURE_IDS)
+def test_fixture_quotes(path, incremental):
+    chain, page, expected = load_fixture(path)
+    extractor = get_extractor(chain)
+
+    assert [asdict(rate) for rate in extractor.rates(page, incremental=incremental)] == expected["rates"]
+    for code, quote in expected["quotes"].items():
+        assert extractor.extract(page, code, expected["nights"], incremental) == quote, code
+    assert extractor.extract(page, "NOT-OFFERED", expected["nights"], incremental) is None
@@ -0,0 +1,103 @@
+"""Geo index: within and nearest agree with a brute-force haversine scan, across the antimeridian and near the poles"""
+import random
+
+import pytest
+
+from shared.geo_index import GeoIndex, haversine_km
+
+# Clusters straddling the antimeridian and around both poles, plus points scattered everywhere
+CLUSTERS = [(0.0, 179.97), (-16.5, -179.9), (89.95, 40.0), (-89.9, -120.0), (65.0, 180.0), (40.7, -74.0)]
+
+
+def wrap(lat, lon):
+    """A point moved past a pole or the antimeridian, back in range"""
+    if abs(lat) > 90:
+        lat, lon = (180 if lat > 0 else -180) - lat, lon + 180
+    return lat, (lon + 180) % 360 - 180
+
+
+def make_points(seed, count=1500):
+    rng = random.Random(seed)
+    points = [(-90.0, 0.0), (90.0, 10.0), (0.0, 180.0), (0.0, -180.0)]
+    while len(points) < count:
+        if rng.random() < 0.2:
+            points.append((rng.uniform(-90, 90), rng.uniform(-180, 180)))
+            continue
+        lat, lon = rng.choice(CLUSTERS)
+        points.append(wrap(lat + rng.gauss(0, 0.3), lon + rng.gauss(0, 0.5)))
+    return points
+
+
+def make_queries(seed, count=40):
+    rng = random.Random(seed + 1)
+    queries = [(0.0, 180.0), (0.0, -180.0), (90.0, 0.0), (-90.0, 123.0), (89.99, -179.99), (-89.99, 179.99)]
+    while len(queries) < count:
+        lat, lon = rng.choice(CLUSTERS)
+        queries.append(wrap(lat + rng.uniform(-1, 1), lon + rng.uniform(-2, 2)))
+    return queries
+
+
+def odd(item):
+    return item % 2 == 1
+
+
+@pytest.fixture(params=[(7, 0.05), (11, 0.05), (13, 1.0)], ids=["seed7-fine", "seed11-fine", "seed13-1deg"])
+def indexed(request):
+    seed, cell_deg = request.param
+    points = make_points(seed)
+    index = GeoIndex(cell_deg)
+    for item, (lat, lon) in enumerate(points):
+        assert index.add(item, lat, lon)
+    assert len(index) == len(points)
+    return index, points, make_queries(seed)
+
+
+def assert_same(found, expected):
+    assert [item for _, item in found] == [item for _, item in expected]
+    assert [distance for distance, _ in found] == pytest.approx([distance for distance, _ in expected])
+
+
+def nearest_first(points, lat, lon):
+    """Brute force: (distance_km, item) for every point, nearest first, and just the odd items"""
+    matches = sorted((haversine_km(lat, lon, plat, plon), item) for item, (plat, plon) in enumerate(points))
+    return matches, [match for match in matches if odd(match[1])]
+
+
+def up_to(matches, max_km):
+    return [match for match in matches if match[0] <= max_km]
+
+
+@pytest.mark.parametrize("radius_km", [0, 5, 60, 400, 3000])
+def test_within_matches_brute_force(indexed, radius_km):
+    index, points, queries = indexed
+    for lat, lon in queries:
+        every, odd_only = (up_to(matches, radius_km) for matches in nearest_first(points, lat, lon))
+        assert_same(index.within(lat, lon, radius_km), every)
+        assert_same(index.within(lat, lon, radius_km, predicate=odd), odd_only)
+        assert_same(index.within(lat, lon, radius_km, limit=5), every[:5])
+        assert_same(index.within(lat, lon, radius_km, predicate=odd, limit=3), odd_only[:3])
+
+
+@pytest.mark.parametrize("k", [1, 10, 200])
+def test_nearest_matches_brute_force(indexed, k):
+    index, points, queries = indexed
+    for lat, lon in queries:
+        every, odd_only = nearest_first(points, lat, lon)
+        assert_same(index.nearest(lat, lon, k), every[:k])
+        assert_same(index.nearest(lat, lon, k, predicate=odd), odd_only[:k])
+        for max_km in (10, 150, 2500):
+            assert_same(index.nearest(lat, lon, k, max_km=max_km), up_to(every, max_km)[:k])
+            assert_same(index.nearest(lat, lon, k, predicate=odd, max_km=max_km), up_to(odd_only, max_km)[:k])
+
+
+def test_invalid_points_and_arguments():
+    index = GeoIndex()
+    assert not index.add("none", None, 10.0)
+    assert not index.add("north of the pole", 90.5, 10.0)
+    assert not index.add("past the antimeridian", 10.0, 180.5)
+    assert index.add("hotel", 10.0, 10.0) and len(index) == 1
+    assert index.within(10.0, 10.0, -1) == []
+    assert index.within(91.0, 10.0, 100) == []
+    assert index.nearest(10.0, 10.0, 0) == []
+    assert index.nearest(10.0, 10.0, 1, predicate=lambda item: False) == []
+    assert GeoIndex().nearest(10.0, 10.0, 5) == []
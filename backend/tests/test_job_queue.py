@@ -0,0 +1,167 @@
+"""Job queue crash recovery: lease expiry, retries with backoff, competing claimers, exactly-once results"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from shared.config import settings
+from shared.database import SessionLocal, DatabaseClient
+from shared.models import Job, Result
+
+from .factories import make_hotel, make_search, prices
+
+
+@pytest.fixture(autouse=True)
+def queue_settings(monkeypatch):
+    monkeypatch.setattr(settings, "queue_max_attempts", 3)
+    monkeypatch.setattr(settings, "queue_retry_backoff_s", 10.0)
+
+
+def enqueue(db_client, hotels=1, discount_types=("aarp",)):
+    search = make_search(db_client, status="processing")
+    for i in range(hotels):
+        hotel = make_hotel(db_client, f"Hilton {i}", chain="Hilton")
+        db_client.enqueue_jobs([
+            {"search_id": search.id, "hotel_id": hotel.id, "chain": "Hilton",
+             "discount_type": discount_type, "discount_code": discount_type.upper()}
+            for discount_type in discount_types
+        ])
+    return search
+
+
+def expire_leases(db):
+    db.execute(update(Job).where(Job.status == "running")
+               .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+
+def make_due(db):
+    db.execute(update(Job).where(Job.status == "queued").values(run_after=datetime.utcnow()))
+    db.commit()
+
+
+def outcome(job, **kwargs):
+    return {"job_id": job.job_id, "attempts": job.attempts, "search_id": job.search_id,
+            "hotel_id": job.hotel_id, "discount_type": job.discount_type, **kwargs}
+
+
+def result_count(db, search_id):
+    return db.execute(select(func.count()).select_from(Result).where(Result.search_id == search_id)).scalar()
+
+
+def test_job_of_a_dead_worker_is_requeued_when_its_lease_expires(db, db_client):
+    search = enqueue(db_client)
+    [job] = db_client.claim_jobs("worker-a", 10, lease_s=0.05)
+    assert job.attempts == 1
+
+    # worker-a dies without renewing; nothing is swept before the lease runs out
+    assert db_client.requeue_expired_jobs() == []
+    assert db_client.claim_jobs("worker-b", 10) == []
+    time.sleep(0.1)
+
+    assert [tuple(row) for row in db_client.requeue_expired_jobs()] == [(search.id, "queued")]
+    [retry] = db_client.claim_jobs("worker-b", 10)
+    assert (retry.job_id, retry.attempts) == (job.job_id, 2)
+
+
+def test_renewed_lease_is_not_swept(db, db_client):
+    enqueue(db_client)
+    [job] = db_client.claim_jobs("worker-a", 10, lease_s=0.05)
+    time.sleep(0.1)
+    assert db_client.extend_job_leases("worker-a", [job.job_id], lease_s=60) == 1
+    assert db_client.requeue_expired_jobs() == []
+
+
+def test_errors_back_off_then_fail_at_max_attempts(db, db_client):
+    search = enqueue(db_client)
+
+    for attempt in (1, 2):
+        [job] = db_client.claim_jobs("worker-a", 10)
+        assert job.attempts == attempt
+        before = datetime.utcnow()
+        counts = db_client.finish_jobs("worker-a", [outcome(job, error="timeout")])
+        assert (counts["retried"], counts["failed"]) == (1, 0)
+
+        # Half to all of QUEUE_RETRY_BACKOFF_S * 2^(attempt - 1), with jitter
+        run_after = db.execute(select(Job.run_after).where(Job.id == job.job_id)).scalar()
+        backoff_s = 10.0 * 2 ** (attempt - 1)
+        assert before + timedelta(seconds=backoff_s * 0.5) <= run_after
+        assert run_after <= datetime.utcnow() + timedelta(seconds=backoff_s)
+        assert db_client.claim_jobs("worker-a", 10) == []
+        make_due(db)
+
+    [job] = db_client.claim_jobs("worker-a", 10)
+    assert job.attempts == 3
+    counts = db_client.finish_jobs("worker-a", [outcome(job, error="timeout")])
+    assert (counts["retried"], counts["failed"]) == (0, 1)
+    assert counts["search_ids"] == {search.id}
+    assert db_client.job_queue_stats()["failed"] == 1
+    assert db_client.finish_search(search.id) == "failed"
+
+
+def test_expired_lease_at_max_attempts_fails_the_job(db, db_client):
+    search = enqueue(db_client)
+    for attempt in range(1, 4):
+        [job] = db_client.claim_jobs(f"worker-{attempt}", 10)
+        assert job.attempts == attempt
+        expire_leases(db)
+        swept = [tuple(row) for row in db_client.requeue_expired_jobs()]
+        assert swept == [(search.id, "queued" if attempt < 3 else "failed")]
+
+    assert db_client.claim_jobs("worker-4", 10) == []
+    assert db_client.job_queue_stats()["failed"] == 1
+
+
+def test_competing_claimers_never_get_the_same_job(db_client):
+    enqueue(db_client, hotels=50, discount_types=("none", "aarp", "aaa", "senior"))
+    claimers = 4
+    barrier = threading.Barrier(claimers)
+    claimed, errors = {}, []
+
+    def claim(worker_id):
+        jobs = claimed[worker_id] = []
+        barrier.wait()
+        try:
+            with SessionLocal() as db:
+                db_client = DatabaseClient(db)
+                while True:
+                    batch = db_client.claim_jobs(worker_id, 7)
+                    if not batch:
+                        return
+                    jobs.extend(job.job_id for job in batch)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(claimers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert errors == []
+    job_ids = [job_id for jobs in claimed.values() for job_id in jobs]
+    assert len(job_ids) == len(set(job_ids)) == 200
+    assert db_client.job_queue_stats()["running"] == 200
+
+
+def test_late_outcome_of_a_crashed_worker_writes_no_second_result(db, db_client):
+    search = enqueue(db_client)
+    [stale] = db_client.claim_jobs("worker-a", 10)
+
+    # worker-a stalls past its lease; worker-b picks the job up
+    expire_leases(db)
+    db_client.requeue_expired_jobs()
+    [job] = db_client.claim_jobs("worker-b", 10)
+
+    # worker-a's outcome arrives while worker-b holds the lease, then after it finished
+    assert db_client.finish_jobs("worker-a", [outcome(stale, prices=prices(100.0))])["lost"] == 1
+    assert result_count(db, search.id) == 0
+    assert db_client.finish_jobs("worker-b", [outcome(job, prices=prices(110.0))])["done"] == 1
+    counts = db_client.finish_jobs("worker-a", [outcome(stale, prices=prices(100.0))])
+    assert (counts["done"], counts["lost"]) == (0, 1)
+    assert db_client.finish_jobs("worker-a", [outcome(stale, error="timeout")])["lost"] == 1
+
+    assert db.execute(select(Result.total_price).where(Result.search_id == search.id)).scalars().all() == [110.0]
+    assert db_client.finish_search(search.id) == "completed"
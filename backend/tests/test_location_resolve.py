@@ -0,0 +1,56 @@
+"""Resolving a search's location: exact cities first, typos tolerated, generic words resolve to nothing"""
+import pytest
+
+from .factories import make_hotel
+
+HOTELS = [
+    ("Marriott Times Square", "Marriott", "New York", "NY", "1535 Broadway"),
+    ("Hilton Midtown", "Hilton", "New York", "NY", "1335 6th Ave"),
+    ("Hampton Inn Times Square North", "Hilton", "New York", "NY", "851 8th Ave"),
+    ("New York Marriott Marquis", "Marriott", "New York", "NY", "1535 Broadway"),
+    ("Holiday Inn Express Boston", "IHG", "Boston", "MA", "69 Boston St"),
+    ("Courtyard Copley Square", "Marriott", "Boston", "MA", "88 Exeter St"),
+    ("Hilton Portland", "Hilton", "Portland", "OR", "921 SW 6th Ave"),
+    ("Hilton Portland Harbor", "Hilton", "Portland", "ME", "1 Commercial St"),
+]
+
+
+@pytest.fixture
+def resolve(db_client):
+    for name, chain, city, state, address in HOTELS:
+        make_hotel(db_client, name, chain=chain, city=city, state=state, address=address)
+    return lambda location: sorted(hotel.name for hotel in db_client.resolve_location(location))
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("Times Sqare", ["Marriott Times Square"]),
+    ("Hiltn Midtwn", ["Hilton Midtown"]),
+    ("Marriot Times Sq", ["Marriott Times Square"]),
+    ("Hampton Ion Times Square North", ["Hampton Inn Times Square North"]),
+    ("Bostn", ["Courtyard Copley Square", "Holiday Inn Express Boston"]),
+])
+def test_typos_resolve(resolve, location, expected):
+    assert resolve(location) == expected
+
+
+@pytest.mark.parametrize("location", ["Square", "Inn", "New", "Hilton", "Times", "Hilton Boston"])
+def test_generic_words_resolve_to_nothing(resolve, location):
+    assert resolve(location) == []
+
+
+@pytest.mark.parametrize("location", ["New York", "New York, NY", "new york ny"])
+def test_exact_city_beats_hotel_names(resolve, location):
+    # "New York Marriott Marquis" starts with the query but the city is meant
+    assert resolve(location) == ["Hampton Inn Times Square North", "Hilton Midtown", "Marriott Times Square",
+                                 "New York Marriott Marquis"]
+
+
+def test_city_shared_by_states_needs_the_state(resolve):
+    assert resolve("Portland") == []
+    assert resolve("Portland, OR") == ["Hilton Portland"]
+    assert resolve("Portland ME") == ["Hilton Portland Harbor"]
+
+
+def test_address_resolves_to_the_hotels_there(resolve):
+    assert resolve("1535 Broadway") == ["Marriott Times Square", "New York Marriott Marquis"]
+    assert resolve("1335 6th Avenue") == ["Hilton Midtown"]
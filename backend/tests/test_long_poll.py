@@ -0,0 +1,139 @@
+"""Long-polling results: only newer rows with since, woken by commits with wait, and Redis publishes off the caller"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from shared.change_notifier import CHANNEL, RedisChangeNotifier
+from shared.config import settings
+
+from .factories import make_hotel, make_search, prices
+
+
+@pytest.fixture(autouse=True)
+def slow_recheck(monkeypatch):
+    # Waiters re-read the version this often anyway; only a notification wakes them sooner
+    monkeypatch.setattr(settings, "results_longpoll_recheck_s", 30.0)
+
+
+@pytest.fixture
+def hotel(db_client):
+    return make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+
+
+def results(client, search_id, **params):
+    response = client.get(f"/api/results/{search_id}", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def in_background(fn):
+    """Run fn in a thread; the returned function joins it and gives (result, seconds taken)"""
+    outcome = {}
+
+    def run():
+        started = time.monotonic()
+        outcome["value"] = fn()
+        outcome["elapsed_s"] = time.monotonic() - started
+
+    thread = threading.Thread(target=run)
+    thread.start()
+
+    def join():
+        thread.join(timeout=20)
+        return outcome["value"], outcome["elapsed_s"]
+    return join
+
+
+def test_since_returns_only_rows_added_after_the_version(client, db_client, hotel):
+    search = make_search(db_client, status="processing")
+    first = db_client.create_result(search.id, hotel.id, "aarp", prices(100.0))
+    before = results(client, search.id)
+    assert [r["result_id"] for r in before["results"]] == [first.id]
+
+    second = db_client.create_result(search.id, hotel.id, "aaa", prices(90.0))
+    after = results(client, search.id, since=before["version"])
+    assert [r["result_id"] for r in after["results"]] == [second.id]
+    assert after["version"] > before["version"]
+    assert results(client, search.id, since=after["version"])["results"] == []
+
+
+def test_wait_wakes_on_a_committed_result(client, db_client, hotel):
+    search = make_search(db_client, status="processing")
+    version = results(client, search.id)["version"]
+
+    join = in_background(lambda: results(client, search.id, since=version, wait=10))
+    time.sleep(0.3)
+    added = db_client.create_result(search.id, hotel.id, "aarp", prices(100.0))
+    body, elapsed_s = join()
+
+    assert [r["result_id"] for r in body["results"]] == [added.id]
+    assert body["version"] > version
+    assert elapsed_s < 5
+
+
+def test_wait_wakes_on_a_status_change(client, db_client):
+    search = make_search(db_client, status="processing")
+    version = results(client, search.id)["version"]
+
+    join = in_background(lambda: results(client, search.id, since=version, wait=10))
+    time.sleep(0.3)
+    db_client.update_search_status(search.id, "completed")
+    body, elapsed_s = join()
+
+    assert (body["status"], body["results"]) == ("completed", [])
+    assert body["version"] > version
+    assert elapsed_s < 5
+
+
+def test_wait_times_out_with_no_change(client, db_client, hotel):
+    search = make_search(db_client, status="processing")
+    db_client.create_result(search.id, hotel.id, "aarp", prices(100.0))
+    version = results(client, search.id)["version"]
+
+    started = time.monotonic()
+    body = results(client, search.id, since=version, wait=0.5)
+    assert time.monotonic() - started >= 0.5
+    assert (body["results"], body["version"], body["status"]) == ([], version, "processing")
+
+
+class SlowRedis:
+    """Redis client whose publish blocks until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.released = threading.Event()
+        self.published = []
+
+    def publish(self, channel, message):
+        self.entered.set()
+        self.released.wait(10)
+        self.published.append((channel, json.loads(message)))
+
+
+def test_redis_publish_does_not_wait_for_redis():
+    client = SlowRedis()
+    notifier = RedisChangeNotifier(client)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(super(RedisChangeNotifier, notifier).wait("s1", 1, 10))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        # Called from a commit hook on the event loop: returns without the round trip
+        notifier.publish({"s1": 2})
+        assert client.entered.wait(5)
+        notifier.publish({"s1": 3, "s2": 1})
+        notifier.publish({"s2": 2})
+        assert time.monotonic() - started < 5
+        # Waiters in this process are woken straight away
+        assert await asyncio.wait_for(waiter, 1)
+    asyncio.run(scenario())
+
+    client.released.set()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and {"s1": 3, "s2": 2} not in [m for _, m in client.published]:
+        time.sleep(0.01)
+    # The first message went out alone; the rest queued behind it were merged
+    assert client.published == [(CHANNEL, {"s1": 2}), (CHANNEL, {"s1": 3, "s2": 2})]
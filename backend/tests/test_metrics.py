@@ -0,0 +1,91 @@
+"""Request metrics: SQL statements per request, Server-Timing, the query budget and /metrics per route template"""
+import logging
+import re
+
+import pytest
+
+from shared.async_database import async_engine
+from shared.config import settings
+
+from .factories import make_hotel, make_search, prices
+from .test_results_queries import count_statements
+
+RESULTS_ROUTE = "/api/results/{search_id}"
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def scrape(client) -> dict:
+    """(metric name, labels) -> value from /metrics"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = {}
+    for line in response.text.splitlines():
+        match = SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples[name, frozenset(re.findall(r'(\w+)="([^"]*)"', labels))] = float(value)
+    return samples
+
+
+def sample(samples: dict, name: str, **labels) -> float:
+    return samples.get((name, frozenset((key, str(value)) for key, value in labels.items())), 0.0)
+
+
+@pytest.fixture
+def searches(db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    created = [make_search(db_client) for _ in range(2)]
+    for search in created:
+        db_client.create_result(search.id, hotel.id, "aarp", prices(100.0))
+    return created
+
+
+def test_server_timing_reports_the_requests_statements(client, searches):
+    with count_statements(async_engine.sync_engine) as statements:
+        response = client.get(f"/api/results/{searches[0].id}")
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)', timing)
+    assert match, timing
+    db_ms, queries, app_ms = float(match[1]), int(match[2]), float(match[3])
+    assert queries == len(statements) > 0
+    assert 0 < db_ms <= app_ms
+
+
+def test_requests_are_recorded_per_route_template(client, searches):
+    before = scrape(client)
+    with count_statements(async_engine.sync_engine) as statements:
+        for search in searches:
+            assert client.get(f"/api/results/{search.id}").status_code == 200
+    assert client.get("/api/no-such-route").status_code == 404
+    after = scrape(client)
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    route = {"method": "GET", "route": RESULTS_ROUTE}
+    # Both searches land in one series, not one per concrete path
+    assert delta("http_request_duration_seconds_count", **route, status=200) == 2
+    assert delta("http_request_db_queries_count", **route) == 2
+    assert delta("http_request_db_queries_sum", **route) == len(statements)
+    assert delta("http_request_db_seconds_total", **route) > 0
+    assert not any(f"/api/results/{search.id}" in str(key) for search in searches for key in after)
+    assert delta("http_request_duration_seconds_count", method="GET", route="unmatched", status=404) == 1
+
+
+def test_requests_over_the_query_budget_warn(client, searches, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "metrics_query_budget", 1)
+    before = scrape(client)
+    with caplog.at_level(logging.WARNING, logger="api.main"):
+        assert client.get(f"/api/results/{searches[0].id}").status_code == 200
+    assert re.search(r"GET /api/results/\{search_id\} ran \d+ SQL statements \(budget 1\)", caplog.text)
+    assert sample(scrape(client), "http_request_query_budget_exceeded_total", method="GET", route=RESULTS_ROUTE) == \
+        sample(before, "http_request_query_budget_exceeded_total", method="GET", route=RESULTS_ROUTE) + 1
+
+    monkeypatch.setattr(settings, "metrics_query_budget", 0)
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="api.main"):
+        client.get(f"/api/results/{searches[0].id}")
+    assert "SQL statements" not in caplog.text
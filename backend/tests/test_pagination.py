@@ -0,0 +1,126 @@
+"""Keyset pagination of searches and results, filters, field projection and cursor validation"""
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from shared.models import Search
+
+from .factories import make_hotel, make_search, prices
+
+
+def pages(client, url, limit, **params):
+    """Every item of a listing, page by page, and the number of pages"""
+    items, cursor, count = [], None, 0
+    while True:
+        body = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}).json()
+        count += 1
+        items += body.get("searches", body.get("results"))
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items, count
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def priced_search(db_client):
+    marriott = make_hotel(db_client, "Marriott Times Square", chain="Marriott")
+    hilton = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    rows = [(marriott, "none", 200.0, True), (marriott, "aarp", 180.0, True), (marriott, "aaa", None, False),
+            (hilton, "none", 180.0, True), (hilton, "aarp", None, False), (hilton, "aaa", 150.0, True),
+            (hilton, "senior", 180.0, True)]
+    db_client.create_results_bulk(search.id, [
+        {"hotel_id": hotel.id, "discount_type": discount_type, "prices": prices(total), "available": available}
+        for hotel, discount_type, total, available in rows
+    ])
+    return search
+
+
+def test_searches_page_through_created_at_ties(client, db, db_client):
+    searches = [make_search(db_client, location=f"City {i}") for i in range(7)]
+    # Five searches created in the same instant: the id breaks the tie
+    same_time = datetime(2026, 1, 1, 12, 0, 0)
+    db.execute(update(Search).where(Search.id.in_([s.id for s in searches[:5]])).values(created_at=same_time))
+    db.commit()
+
+    listed, count = pages(client, "/api/searches", limit=2)
+    expected = sorted(db.query(Search).all(), key=lambda s: (s.created_at, s.id), reverse=True)
+    assert [item["search_id"] for item in listed] == [s.id for s in expected]
+    assert count == 4
+
+
+def test_results_by_price_put_unpriced_rows_last(client, priced_search):
+    listed, _ = pages(client, f"/api/results/{priced_search.id}", limit=2, sort="price")
+    totals = [item["total_price"] for item in listed]
+    assert totals == [150.0, 180.0, 180.0, 180.0, 200.0, None, None]
+    # Ties are ordered by id, on both sides of the priced/unpriced boundary
+    for total in (180.0, None):
+        ids = [item["result_id"] for item in listed if item["total_price"] == total]
+        assert ids == sorted(ids)
+
+
+def test_results_by_scrape_time_page_without_gaps(client, priced_search):
+    everything = client.get(f"/api/results/{priced_search.id}").json()["results"]
+    listed, count = pages(client, f"/api/results/{priced_search.id}", limit=3)
+    assert [item["result_id"] for item in listed] == [item["result_id"] for item in everything]
+    assert count == 3
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"discount_type": ["aarp", "aaa"]}, {("Marriott", "aarp"), ("Marriott", "aaa"), ("Hilton", "aarp"),
+                                          ("Hilton", "aaa")}),
+    ({"discount_type": "none,senior"}, {("Marriott", "none"), ("Hilton", "none"), ("Hilton", "senior")}),
+    ({"chain": "Hilton", "available": "true"}, {("Hilton", "none"), ("Hilton", "aaa"), ("Hilton", "senior")}),
+    ({"available": "false"}, {("Marriott", "aaa"), ("Hilton", "aarp")}),
+])
+def test_results_filters(client, priced_search, params, expected):
+    listed, _ = pages(client, f"/api/results/{priced_search.id}", limit=2, sort="price", **params)
+    assert {(item["hotel_chain"], item["discount_type"]) for item in listed} == expected
+    assert len(listed) == len(expected)
+
+
+def test_fields_projection_pages_by_price(client, priced_search):
+    listed, _ = pages(client, f"/api/results/{priced_search.id}", limit=4, sort="price",
+                      fields="hotel_name,total_price")
+    assert all(set(item) == {"hotel_name", "total_price"} for item in listed)
+    assert [item["total_price"] for item in listed] == [150.0, 180.0, 180.0, 180.0, 200.0, None, None]
+
+    response = client.get(f"/api/results/{priced_search.id}", params={"fields": "hotel_name,secret"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    raw_cursor({"created": 1}),
+    raw_cursor(["created"]),
+    raw_cursor(["created", 5]),
+    raw_cursor(["created", {"dt": 5}, "id"]),
+    raw_cursor(["created", {"dt": "yesterday"}, "id"]),
+    raw_cursor(["created", {"dt": "2026-01-01T00:00:00"}, 7]),
+    raw_cursor(["created", {"dt": "2026-01-01T00:00:00"}, "id", "extra"]),
+    raw_cursor(["price", 100.0, "id"]),
+], ids=["garbage", "not-a-list", "no-values", "one-value", "dt-not-a-string", "dt-unparsable",
+        "id-not-a-string", "extra-value", "wrong-kind"])
+def test_bad_search_cursors_are_rejected(client, cursor):
+    response = client.get("/api/searches", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("sort, payload", [
+    ("price", ["price", "100", "id"]),
+    ("price", ["price", True, "id"]),
+    ("price", ["price", 100.0]),
+    ("scraped_at", ["scraped_at", {"dt": [2026]}, "id"]),
+    ("scraped_at", ["price", 100.0, "id"]),
+    ("price", ["created", {"dt": "2026-01-01T00:00:00"}, "id"]),
+])
+def test_bad_result_cursors_are_rejected(client, priced_search, sort, payload):
+    response = client.get(f"/api/results/{priced_search.id}",
+                          params={"sort": sort, "limit": 2, "cursor": raw_cursor(payload)})
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+"""Parse pool: extraction in another process gives what inline extraction does"""
+import asyncio
+
+import pytest
+
+from scrapers import parse_pool
+from scrapers.extraction import SPECS, get_extractor
+
+from .test_extraction import FIXTURES, load_fixture
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """The process-wide pool with one spawned worker, so specs, pages and results are pickled"""
+    parse_pool.close_parse_pool()
+    monkeypatch.setattr(parse_pool.settings, "scraper_parse_workers", 1)
+    try:
+        yield parse_pool.get_parse_pool()
+    finally:
+        parse_pool.close_parse_pool()
+
+
+def test_pool_matches_inline_extraction(pool):
+    assert pool.workers == 1 and pool._executor is not None
+    tasks = []
+    for path in FIXTURES:
+        chain, page, expected = load_fixture(path)
+        for code in [*expected["quotes"], "NOT-OFFERED"]:
+            tasks.append((chain, page, code, expected["nights"]))
+
+    async def extract_all():
+        return await asyncio.gather(*(pool.extract(SPECS[chain], page, code, nights)
+                                      for chain, page, code, nights in tasks))
+
+    inline = [get_extractor(chain).extract(page, code, nights) for chain, page, code, nights in tasks]
+    assert asyncio.run(extract_all()) == inline
+    assert pool.extract_many([(SPECS[chain], page, code, nights) for chain, page, code, nights in tasks],
+                             batch_size=3) == inline
+    assert any(prices is None for prices in inline) and any(prices is not None for prices in inline)
@@ -0,0 +1,86 @@
+"""Price history store: top-ups from the results table and the LRU bound"""
+from datetime import datetime, timedelta
+
+from shared.database import DatabaseClient
+from shared.price_history import PriceHistoryStore, get_price_history
+
+from .factories import make_hotel, make_search, prices
+
+
+def write(db_client, search_id, hotel_id, total, scraped_at=None, discount_type="aarp"):
+    row = DatabaseClient._result_values(search_id, hotel_id, discount_type, prices(total))
+    if scraped_at is not None:
+        row["scraped_at"] = scraped_at
+    db_client._insert_result_rows([row])
+
+
+def totals(history, discount_type="aarp"):
+    return sorted(point["total_price"] for point in history.get(discount_type, []))
+
+
+def test_rows_written_by_another_process_are_read_on_the_next_query(db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    write(db_client, search.id, hotel.id, 100.0)
+
+    # Not the process's shared store, so the writes below don't reach it
+    other = PriceHistoryStore()
+    assert totals(other.query(db, hotel.id)) == [100.0]
+
+    write(db_client, search.id, hotel.id, 110.0)
+    write(db_client, search.id, hotel.id, 120.0)
+    assert totals(other.query(db, hotel.id)) == [100.0, 110.0, 120.0]
+    assert (other.backfills, other.topups) == (1, 1)
+
+
+def test_row_committed_late_with_an_earlier_scraped_at_is_read(db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    now = datetime.utcnow()
+    write(db_client, search.id, hotel.id, 100.0, scraped_at=now)
+
+    store = PriceHistoryStore(overlap_s=60)
+    assert totals(store.query(db, hotel.id)) == [100.0]
+
+    # Scraped before the watermark, committed after the query
+    write(db_client, search.id, hotel.id, 90.0, scraped_at=now - timedelta(seconds=5))
+    assert totals(store.query(db, hotel.id)) == [90.0, 100.0]
+
+
+def test_local_writes_and_top_ups_do_not_duplicate_points(db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    write(db_client, search.id, hotel.id, 100.0)
+
+    store = get_price_history(db)
+    assert totals(store.query(db, hotel.id)) == [100.0]
+
+    # Same price and scrape time from two searches: two points, each kept once
+    now = datetime.utcnow()
+    second = make_search(db_client)
+    write(db_client, search.id, hotel.id, 105.0, scraped_at=now)
+    write(db_client, second.id, hotel.id, 105.0, scraped_at=now)
+    assert store.appended == 2
+
+    assert totals(store.query(db, hotel.id)) == [100.0, 105.0, 105.0]
+    assert totals(store.query(db, hotel.id)) == [100.0, 105.0, 105.0]
+
+
+def test_least_recently_queried_hotel_is_evicted(db, db_client):
+    hotels = [make_hotel(db_client, f"Hotel {i}") for i in range(3)]
+    search = make_search(db_client)
+    for i, hotel in enumerate(hotels):
+        write(db_client, search.id, hotel.id, 100.0 + i)
+
+    store = PriceHistoryStore(max_hotels=2)
+    store.query(db, hotels[0].id)
+    store.query(db, hotels[1].id)
+    store.query(db, hotels[0].id)
+    store.query(db, hotels[2].id)
+
+    assert [store.tracks(hotel.id) for hotel in hotels] == [True, False, True]
+    assert store.stats()["hotels"] == 2
+    assert store.evictions == 1
+    # An evicted hotel is backfilled again
+    assert totals(store.query(db, hotels[1].id)) == [101.0]
+    assert store.backfills == 4
@@ -0,0 +1,182 @@
+"""Rate control: AIMD backoff and ramp-up on a fake clock, and against a local HTTP fake site"""
+import asyncio
+
+import pytest
+
+from scrapers.base import FetchError, RateLimitError, ScrapeJob
+from scrapers.fake_server import FakeSiteServer, HttpSiteFetcher
+from scrapers.fake_site import FakeSiteFetcher
+from scrapers.rate_control import InMemoryRateStore, RateControl, RateLimits
+
+LIMITS = RateLimits(initial_rps=1.0, min_rps=0.25, max_rps=50.0, burst=2.0, increase_rps=2.0, backoff=0.5,
+                    cooldown_s=5.0, max_concurrency=8, slow_s=2.0)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def job(i: int = 0, chain: str = "Hilton") -> ScrapeJob:
+    return ScrapeJob(search_id="s", hotel_id=f"hotel-{i}", hotel_name=f"Hotel {i}", chain=chain, city="Boston",
+                     discount_type="aarp", discount_code="AARP", check_in="2026-03-01",
+                     check_out="2026-03-02", guests=2)
+
+
+async def respond(control: RateControl, clock: FakeClock, latency_s: float = 0.1, exc: Exception = None,
+                  gap_s: float = 1.0):
+    """One request to Hilton taking ``latency_s`` on the fake clock, ending with ``exc`` if given"""
+    # Spaced out so the bucket has a token and nothing really sleeps
+    clock.advance(gap_s)
+    try:
+        async with control.request("Hilton"):
+            clock.advance(latency_s)
+            if exc is not None:
+                raise exc
+    except type(exc) if exc is not None else ():
+        pass
+
+
+def limits_of(control: RateControl):
+    stats = control._chains["Hilton"]
+    return stats.rps_limit, stats.concurrency_limit
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def control(clock):
+    return RateControl(InMemoryRateStore(), LIMITS, enabled=True, clock=clock, monotonic=clock)
+
+
+def ramp(control, clock, responses: int):
+    async def go():
+        for _ in range(responses):
+            await respond(control, clock)
+    asyncio.run(go())
+
+
+@pytest.mark.parametrize("failure", [
+    {"exc": RateLimitError("429")},
+    {"exc": asyncio.TimeoutError()},
+    {"latency_s": 3.0},
+], ids=["429", "timeout", "slow"])
+def test_congestion_halves_rate_and_concurrency_once_per_cooldown(control, clock, failure):
+    ramp(control, clock, 40)
+    rps, concurrency = limits_of(control)
+    assert rps > 8 and concurrency >= 4
+
+    async def congest():
+        await respond(control, clock, **failure)
+        assert limits_of(control) == (rps / 2, concurrency / 2)
+        # The rest of the same burst, inside the cooldown, counts once
+        await respond(control, clock, gap_s=0.0, **failure)
+        assert limits_of(control) == (rps / 2, concurrency / 2)
+        # After the cooldown the next failure halves again
+        await respond(control, clock, gap_s=LIMITS.cooldown_s, **failure)
+        assert limits_of(control) == (rps / 4, concurrency / 4)
+    asyncio.run(congest())
+
+
+def test_limits_ramp_back_up_after_backoff(control, clock):
+    ramp(control, clock, 40)
+    peak_rps, peak_concurrency = limits_of(control)
+
+    async def congest():
+        for _ in range(3):
+            await respond(control, clock, exc=RateLimitError("429"), gap_s=LIMITS.cooldown_s)
+    asyncio.run(congest())
+    assert limits_of(control)[0] == peak_rps / 8
+
+    ramp(control, clock, 120)
+    rps, concurrency = limits_of(control)
+    assert rps >= peak_rps
+    assert concurrency == LIMITS.max_concurrency
+
+
+def test_limits_stay_within_bounds(control, clock):
+    async def congest():
+        for _ in range(20):
+            await respond(control, clock, exc=RateLimitError("429"), gap_s=LIMITS.cooldown_s)
+    asyncio.run(congest())
+    assert limits_of(control) == (LIMITS.min_rps, 1.0)
+
+    ramp(control, clock, 2000)
+    assert limits_of(control) == (LIMITS.max_rps, LIMITS.max_concurrency)
+
+
+def test_other_errors_leave_limits_alone(control, clock):
+    ramp(control, clock, 10)
+    before = limits_of(control)
+    asyncio.run(respond(control, clock, exc=FetchError("500")))
+    assert limits_of(control) == before
+    assert control.stats()["Hilton"]["errors"] == 1
+
+
+def test_retry_after_pauses_the_bucket(clock):
+    store = InMemoryRateStore()
+
+    async def go():
+        await store.feedback("Hilton", LIMITS, clock(), "congested", retry_after_s=5.0)
+        clock.advance(2.0)
+        wait_s, _ = await store.take("Hilton", LIMITS, clock())
+        return wait_s
+    assert asyncio.run(go()) == pytest.approx(3.0)
+
+
+def test_http_fake_site_throttles_and_rate_control_backs_off():
+    site = FakeSiteFetcher(latency_ms=5, capacity_rps=10, retry_after_s=0.1, unavailable_rate=0.2, seed=3)
+    limits = RateLimits(initial_rps=40.0, min_rps=1.0, max_rps=200.0, burst=40.0, increase_rps=2.0,
+                        backoff=0.5, cooldown_s=0.2, max_concurrency=20, slow_s=2.0)
+    control = RateControl(InMemoryRateStore(), limits, enabled=True)
+    outcomes = {"ok": 0, "throttled": 0}
+
+    async def go():
+        async with FakeSiteServer(site, "Hilton") as server:
+            fetcher = HttpSiteFetcher(server.url, timeout_s=5)
+            try:
+                # Served over HTTP exactly as the in-process site quotes it
+                for i in range(10):
+                    assert await fetcher.fetch(job(i)) == site.quote(job(i))
+
+                async def attempt(i):
+                    try:
+                        async with control.request("Hilton"):
+                            await fetcher.fetch(job(i))
+                        outcomes["ok"] += 1
+                    except RateLimitError as e:
+                        assert e.retry_after_s == 0.1
+                        outcomes["throttled"] += 1
+                await asyncio.gather(*(attempt(i) for i in range(30)))
+            finally:
+                await fetcher.close()
+
+    asyncio.run(go())
+    stats = control.stats()["Hilton"]
+    assert outcomes["throttled"] > 0 and stats["throttled"] == outcomes["throttled"]
+    assert stats["rps_limit"] < limits.initial_rps
+    assert site.requests == 40
+
+
+def test_http_fetcher_maps_errors_and_timeouts():
+    async def go():
+        async with FakeSiteServer(FakeSiteFetcher(latency_ms=0, error_rate=1.0), "IHG") as failing, \
+                FakeSiteServer(FakeSiteFetcher(latency_ms=500, latency_sigma=0.0), "IHG") as slow:
+            for url, timeout_s, expected in ((failing.url, 5, FetchError),
+                                             (slow.url, 0.05, asyncio.TimeoutError)):
+                fetcher = HttpSiteFetcher(url, timeout_s=timeout_s)
+                try:
+                    with pytest.raises(expected):
+                        await fetcher.fetch(job(chain="IHG"))
+                finally:
+                    await fetcher.close()
+    asyncio.run(go())
@@ -0,0 +1,52 @@
+"""Raw payload storage: one row per distinct payload, rewritten with every result that uses it"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from shared.models import RawPayload, Result
+
+from .factories import make_hotel, make_search, prices
+
+RAW = {"rate_code": "AARP", "room": "King"}
+
+
+def payload_rows(db):
+    return db.execute(select(RawPayload.hash, RawPayload.created_at)).all()
+
+
+def test_identical_payloads_share_a_row_and_reuse_refreshes_it(client, db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    first = db_client.create_result(search.id, hotel.id, "aarp", prices(100.0, raw_data=RAW))
+    [(raw_hash, _)] = payload_rows(db)
+
+    long_ago = datetime.utcnow() - timedelta(days=30)
+    db.execute(update(RawPayload).values(created_at=long_ago))
+    db.commit()
+
+    db_client.create_results_bulk(search.id, [
+        {"hotel_id": hotel.id, "discount_type": discount_type, "prices": prices(100.0, raw_data=RAW)}
+        for discount_type in ("none", "aaa")
+    ])
+    [(same_hash, created_at)] = payload_rows(db)
+    assert same_hash == raw_hash
+    assert created_at > long_ago + timedelta(days=29)
+
+    response = client.get(f"/api/results/{search.id}/raw/{first.id}")
+    assert response.status_code == 200
+    assert response.json()["raw_data"] == RAW
+
+
+def test_payload_collected_between_writes_is_stored_again(client, db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client)
+    db_client.create_result(search.id, hotel.id, "aarp", prices(100.0, raw_data=RAW))
+
+    # Retention removed the result and its payload
+    db.execute(delete(Result))
+    db.execute(delete(RawPayload))
+    db.commit()
+
+    result = db_client.create_result(search.id, hotel.id, "aaa", prices(90.0, raw_data=RAW))
+    assert db.scalar(select(func.count()).select_from(RawPayload)) == 1
+    assert client.get(f"/api/results/{search.id}/raw/{result.id}").json()["raw_data"] == RAW
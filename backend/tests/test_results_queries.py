@@ -0,0 +1,98 @@
+"""GET /api/results/{id} reads results with a constant number of queries"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from api.routes.results import ResultItem
+from shared.async_database import async_engine
+from shared.models import Hotel
+
+from .factories import make_hotel, make_search, prices
+
+
+@contextmanager
+def count_statements(engine):
+    """Collect the SQL statements an engine executes inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_results(db_client, search_id, hotels, count):
+    db_client.create_results_bulk(search_id, [
+        {"hotel_id": hotels[i % len(hotels)].id,
+         "discount_type": ["none", "aarp", "aaa"][i % 3],
+         "prices": prices(100.0 + i, taxes=12.5, fees=25.0),
+         "available": i % 7 != 0}
+        for i in range(count)
+    ])
+
+
+def orm_items(db, db_client, search_id):
+    """Result items as the results route built them before the joined query: one hotel lookup per row"""
+    items = []
+    for result in db_client.get_results_by_search(search_id):
+        hotel = db.query(Hotel).filter(Hotel.id == result.hotel_id).first()
+        items.append(ResultItem(
+            result_id=result.id,
+            hotel_name=hotel.name if hotel else "Unknown",
+            hotel_chain=hotel.chain if hotel else "Unknown",
+            discount_type=result.discount_type,
+            original_price=result.original_price,
+            discounted_price=result.discounted_price,
+            taxes=result.taxes or 0.0,
+            fees=result.fees or 0.0,
+            total_price=result.total_price,
+            currency=result.currency,
+            available=result.available,
+            scraped_at=result.scraped_at.isoformat()
+        ).model_dump())
+    return items
+
+
+def test_query_count_does_not_grow_with_results(client, db_client):
+    hotels = [make_hotel(db_client, f"Hotel {i}") for i in range(5)]
+    small = make_search(db_client)
+    large = make_search(db_client)
+    add_results(db_client, small.id, hotels, 1)
+    add_results(db_client, large.id, hotels, 60)
+
+    counts = {}
+    for search, expected in ((small, 1), (large, 60)):
+        with count_statements(async_engine.sync_engine) as statements:
+            response = client.get(f"/api/results/{search.id}")
+        assert response.status_code == 200
+        assert response.json()["result_count"] == expected
+        counts[expected] = len(statements)
+
+    assert counts[1] == counts[60]
+    assert counts[60] <= 3
+
+
+@pytest.mark.parametrize("fields", [None, "result_id,hotel_name,total_price,available"])
+def test_joined_read_matches_orm_read(client, db, db_client, fields):
+    hotels = [make_hotel(db_client, f"Hotel {i}", chain=chain)
+              for i, chain in enumerate(["Marriott", "Hilton", "IHG"])]
+    search = make_search(db_client)
+    add_results(db_client, search.id, hotels, 20)
+
+    expected = orm_items(db, db_client, search.id)
+    response = client.get(f"/api/results/{search.id}", params={"fields": fields} if fields else None)
+    assert response.status_code == 200
+    body = response.json()
+
+    if fields:
+        names = fields.split(",")
+        expected = [{name: item[name] for name in names} for item in expected]
+    key = lambda item: item["result_id"]
+    assert sorted(body["results"], key=key) == sorted(expected, key=key)
+    assert body["result_count"] == len(expected)
+    assert body["location"] == search.location
@@ -0,0 +1,102 @@
+"""SSE result stream: nothing is skipped when writers commit out of scrape-time order, and commits wake it"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.routes import results
+from shared.database import SessionLocal, DatabaseClient
+
+from .factories import make_hotel, make_search, prices
+
+
+def parse_events(body: str) -> list:
+    """(id, event, data) of each event in an SSE body"""
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def write(search_id, hotel_id, discount_type, scraped_at):
+    """Commit one result through its own session, as a separate writer"""
+    db = SessionLocal()
+    try:
+        row = DatabaseClient._result_values(search_id, hotel_id, discount_type, prices(100.0))
+        row["scraped_at"] = scraped_at
+        DatabaseClient(db)._insert_result_rows([row])
+        return row
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(results.settings, "results_stream_poll_ms", 0)
+
+
+def test_row_committed_late_with_an_earlier_scraped_at_is_streamed(db_client, run):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client, status="processing")
+    now = datetime.utcnow()
+
+    async def scenario():
+        stream = results._stream_results(search.id, None)
+        events = []
+
+        # Writer A takes its scrape time first, writer B commits first
+        write(search.id, hotel.id, "aarp", now + timedelta(seconds=1))
+        events.append(await stream.__anext__())
+        write(search.id, hotel.id, "aaa", now)
+
+        for _ in range(20):
+            if sum("event: result" in event for event in events) == 2:
+                break
+            events.append(await stream.__anext__())
+        db_client.update_search_status(search.id, "completed")
+        events.extend([event async for event in stream])
+        return parse_events("".join(events))
+
+    events = run(scenario())
+    streamed = [data["discount_type"] for _, kind, data in events if kind == "result"]
+    assert streamed == ["aarp", "aaa"]
+    assert events[-1][1:] == ("status", {"search_id": search.id, "status": "completed", "result_count": 2})
+
+
+def test_last_event_id_resumes_after_the_version(client, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client, status="processing")
+    now = datetime.utcnow()
+    write(search.id, hotel.id, "aarp", now + timedelta(seconds=1))
+    write(search.id, hotel.id, "aaa", now)
+    write(search.id, hotel.id, "senior", now - timedelta(seconds=1))
+    db_client.update_search_status(search.id, "completed")
+
+    first = parse_events(client.get(f"/api/results/{search.id}/stream").text)
+    assert [data["discount_type"] for _, kind, data in first if kind == "result"] == ["aarp", "aaa", "senior"]
+
+    resumed = parse_events(client.get(f"/api/results/{search.id}/stream",
+                                      headers={"Last-Event-ID": first[0][0]}).text)
+    assert [data["discount_type"] for _, kind, data in resumed if kind == "result"] == ["aaa", "senior"]
+
+
+def test_commit_wakes_the_stream_before_the_poll_interval(db_client, run, monkeypatch):
+    monkeypatch.setattr(results.settings, "results_stream_poll_ms", 30000)
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    search = make_search(db_client, status="processing")
+
+    async def scenario():
+        stream = results._stream_results(search.id, None)
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        write(search.id, hotel.id, "aarp", datetime.utcnow())
+        event = await asyncio.wait_for(waiting, timeout=5)
+        await stream.aclose()
+        return parse_events(event)
+
+    [(_, kind, data)] = run(scenario())
+    assert (kind, data["discount_type"]) == ("result", "aarp")
@@ -0,0 +1,88 @@
+"""Retention: expired searches go with their results, raw payloads only once unreferenced and past the grace window"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from shared.database import engine
+from shared.models import RawPayload, Result, Search
+from shared.retention import run_retention
+
+from .factories import make_hotel, make_search, prices
+
+
+def expire(db, search_id, days=100):
+    db.execute(update(Search).where(Search.id == search_id)
+               .values(created_at=datetime.utcnow() - timedelta(days=days)))
+    db.commit()
+
+
+def age_payloads(db, seconds=7200):
+    db.execute(update(RawPayload).values(created_at=datetime.utcnow() - timedelta(seconds=seconds)))
+    db.commit()
+
+
+def payload_hashes(db):
+    db.expire_all()
+    return set(db.scalars(select(RawPayload.hash)))
+
+
+def raw_hash_of(db, result_id):
+    return db.scalar(select(Result.raw_hash).where(Result.id == result_id))
+
+
+def retain(**kwargs):
+    return run_retention(engine, days=90, pause_s=0, vacuum_pages=0, payload_grace_s=3600, **kwargs)
+
+
+def test_expired_search_goes_with_its_unshared_payloads(db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    old, kept = make_search(db_client), make_search(db_client)
+    only_old = db_client.create_result(old.id, hotel.id, "aarp", prices(100.0, raw_data={"rate_code": "OLD"}))
+    shared = db_client.create_result(old.id, hotel.id, "aaa", prices(90.0, raw_data={"rate_code": "SHARED"}))
+    db_client.create_result(kept.id, hotel.id, "aaa", prices(90.0, raw_data={"rate_code": "SHARED"}))
+    only_old_hash, shared_hash = raw_hash_of(db, only_old.id), raw_hash_of(db, shared.id)
+    expire(db, old.id)
+    age_payloads(db)
+
+    report = retain()
+    assert (report.searches, report.results, report.payloads) == (1, 2, 1)
+    assert payload_hashes(db) == {shared_hash}
+    assert only_old_hash != shared_hash
+
+
+def test_recently_written_payload_survives_until_a_later_run(db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    old = make_search(db_client)
+    result = db_client.create_result(old.id, hotel.id, "aarp", prices(100.0, raw_data={"rate_code": "NEW"}))
+    raw_hash = raw_hash_of(db, result.id)
+    expire(db, old.id)
+
+    # Written inside the grace window: a concurrent ingest may be about to use it
+    report = retain()
+    assert (report.searches, report.payloads) == (1, 0)
+    assert payload_hashes(db) == {raw_hash}
+
+    age_payloads(db)
+    report = retain()
+    assert (report.searches, report.payloads) == (0, 1)
+    assert payload_hashes(db) == set()
+
+
+def test_payload_touched_by_an_uncommitted_ingest_is_kept(client, db, db_client):
+    hotel = make_hotel(db_client, "Hilton Midtown", chain="Hilton")
+    old, new = make_search(db_client), make_search(db_client)
+    raw_data = {"rate_code": "AARP", "room": "King"}
+    db_client.create_result(old.id, hotel.id, "aarp", prices(100.0, raw_data=raw_data))
+    expire(db, old.id)
+    age_payloads(db)
+
+    # An ingest reusing the payload has written it, but retention can't see its results yet
+    row = {"raw_data": raw_data}
+    db_client._store_raw_payloads([row])
+    db.commit()
+    report = retain()
+    assert (report.searches, report.results, report.payloads) == (1, 1, 0)
+
+    result = db_client.create_result(new.id, hotel.id, "aarp", prices(100.0, raw_data=raw_data))
+    assert raw_hash_of(db, result.id) == row["raw_hash"]
+    assert client.get(f"/api/results/{new.id}/raw/{result.id}").json()["raw_data"] == raw_data
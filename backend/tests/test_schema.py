@@ -0,0 +1,37 @@
+"""Schema migrations adopt databases created by the old create_all startup"""
+from sqlalchemy import create_engine, inspect, text
+
+from shared.schema import SCHEMA_VERSION, ensure_schema
+
+# The results table and its search index as create_all built them before migrations
+LEGACY_DDL = [
+    """CREATE TABLE results (
+        id VARCHAR PRIMARY KEY, search_id VARCHAR NOT NULL, hotel_id VARCHAR NOT NULL,
+        discount_type VARCHAR NOT NULL, original_price FLOAT, discounted_price FLOAT,
+        taxes FLOAT, fees FLOAT, total_price FLOAT, currency VARCHAR, available BOOLEAN,
+        raw_data JSON, scraped_at DATETIME
+    )""",
+    "CREATE INDEX idx_search_scraped ON results (search_id, scraped_at)",
+]
+
+
+def test_legacy_database_is_adopted_and_stale_index_dropped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as connection:
+        for statement in LEGACY_DDL:
+            connection.execute(text(statement))
+
+    assert ensure_schema(engine, auto_migrate=True) == "migrated"
+    indexes = {index["name"] for index in inspect(engine).get_indexes("results")}
+    assert "idx_search_scraped" not in indexes
+    assert "idx_search_scraped_id" in indexes
+    assert ensure_schema(engine, auto_migrate=False) == "current"
+    engine.dispose()
+
+
+def test_fresh_database_migrates_to_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    assert ensure_schema(engine, auto_migrate=True) == "migrated"
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == SCHEMA_VERSION
+    engine.dispose()
@@ -0,0 +1,170 @@
+"""Search cache claims: hits, coalescing, pending claim expiry and stale-key races"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from shared import search_cache
+from shared.search_cache import InMemoryCacheBackend, RedisCacheBackend, SearchCache, search_cache_key
+
+KEY = search_cache_key("New York, NY", "2026-03-01", "2026-03-03", 2, ["aarp"])
+
+
+class FakeSearches:
+    """Stands in for DatabaseClient.get_search"""
+
+    def __init__(self):
+        self.searches = {}
+        self._lock = threading.Lock()
+
+    def add(self, search_id, status, completed_at=None):
+        self.searches[search_id] = SimpleNamespace(id=search_id, status=status, completed_at=completed_at)
+
+    def get_search(self, search_id):
+        with self._lock:
+            return self.searches.get(search_id)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryCacheBackend()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisCacheBackend(fakeredis.FakeRedis(decode_responses=True))
+
+
+def test_claim_then_coalesce_then_hit(backend):
+    cache = SearchCache(backend, ttl_s=600, pending_ttl_s=30)
+    searches = FakeSearches()
+
+    assert cache.claim(searches, KEY, "s1") is None
+    # Claimed but not created yet: attach to the pending search
+    assert cache.claim(searches, KEY, "s2").id == "s1"
+
+    searches.add("s1", "processing")
+    assert cache.confirm(KEY, "s1")
+    assert cache.claim(searches, KEY, "s3").id == "s1"
+
+    searches.add("s1", "completed", datetime.utcnow())
+    assert cache.claim(searches, KEY, "s4").id == "s1"
+    assert (cache.misses, cache.coalesced, cache.hits) == (1, 2, 1)
+
+
+def test_failed_and_stale_searches_are_replaced(backend):
+    cache = SearchCache(backend, ttl_s=600, pending_ttl_s=30)
+    searches = FakeSearches()
+
+    assert cache.claim(searches, KEY, "s1") is None
+    searches.add("s1", "failed")
+    assert cache.claim(searches, KEY, "s2") is None
+
+    searches.add("s2", "completed", datetime.utcnow() - timedelta(seconds=601))
+    assert cache.claim(searches, KEY, "s3") is None
+    assert backend.get(KEY) == "s3"
+
+
+def test_pending_claim_of_dead_owner_expires():
+    cache = SearchCache(InMemoryCacheBackend(), ttl_s=600, pending_ttl_s=1)
+    searches = FakeSearches()
+
+    # The owner of s1 dies before creating its search
+    assert cache.claim(searches, KEY, "s1") is None
+    assert cache.claim(searches, KEY, "s2").id == "s1"
+
+    time.sleep(1.05)
+    assert cache.claim(searches, KEY, "s3") is None
+
+
+def test_confirmed_claim_lasts_the_full_ttl():
+    backend = InMemoryCacheBackend()
+    cache = SearchCache(backend, ttl_s=600, pending_ttl_s=1)
+    searches = FakeSearches()
+
+    assert cache.claim(searches, KEY, "s1") is None
+    searches.add("s1", "processing")
+    assert cache.confirm(KEY, "s1")
+
+    time.sleep(1.05)
+    assert cache.claim(searches, KEY, "s2").id == "s1"
+
+
+def test_confirm_and_release_leave_other_claims_alone(backend):
+    cache = SearchCache(backend, ttl_s=600, pending_ttl_s=30)
+    searches = FakeSearches()
+
+    assert cache.claim(searches, KEY, "s1") is None
+    assert not cache.confirm(KEY, "other")
+    cache.release(KEY, "other")
+    assert backend.get(KEY) == "s1"
+
+    cache.release(KEY, "s1")
+    assert backend.get(KEY) is None
+
+
+def test_one_request_replaces_a_stale_entry(backend):
+    cache = SearchCache(backend, ttl_s=600, pending_ttl_s=30)
+    searches = FakeSearches()
+    searches.add("old", "failed")
+    assert backend.add(KEY, "old", 600)
+
+    claimants = 16
+    barrier = threading.Barrier(claimants)
+    outcomes = {}
+
+    def claim(i):
+        barrier.wait()
+        outcomes[i] = cache.claim(searches, KEY, f"new-{i}")
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(claimants)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    owners = [i for i, existing in outcomes.items() if existing is None]
+    assert len(owners) == 1
+    owner_id = f"new-{owners[0]}"
+    assert backend.get(KEY) == owner_id
+    assert all(existing.id == owner_id for existing in outcomes.values() if existing is not None)
+
+
+class LoopCheckingBackend(InMemoryCacheBackend):
+    """Records whether each call was made on a thread running an event loop, as a blocking Redis call would be"""
+
+    def __init__(self):
+        super().__init__()
+        self.on_loop = []
+
+    def _record(self):
+        try:
+            asyncio.get_running_loop()
+            self.on_loop.append(True)
+        except RuntimeError:
+            self.on_loop.append(False)
+
+    def get(self, key):
+        self._record()
+        return super().get(key)
+
+    def add(self, key, value, ttl_s):
+        self._record()
+        return super().add(key, value, ttl_s)
+
+    def refresh(self, key, value, ttl_s):
+        self._record()
+        return super().refresh(key, value, ttl_s)
+
+
+def test_search_route_reuses_a_search_and_keeps_cache_calls_off_the_loop(client, monkeypatch):
+    backend = LoopCheckingBackend()
+    monkeypatch.setattr(search_cache, "_search_cache", SearchCache(backend, ttl_s=600, pending_ttl_s=30))
+    request = {"location": "Nowhere, ZZ", "check_in": "2026-03-01", "check_out": "2026-03-03",
+               "discount_types": ["aarp"]}
+
+    first = client.post("/api/search", json=request).json()
+    second = client.post("/api/search", json=request).json()
+    assert second["search_id"] == first["search_id"]
+    assert backend.on_loop and not any(backend.on_loop)
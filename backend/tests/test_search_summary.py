@@ -0,0 +1,72 @@
+"""Search summary: aggregated in SQL, stored on completion and served from the stored row"""
+from shared.async_database import async_engine
+
+from .factories import make_hotel, make_search, prices
+from .test_results_queries import count_statements
+
+
+def add_results(db_client, search_id, rows):
+    db_client.create_results_bulk(search_id, [
+        {"hotel_id": hotel.id, "discount_type": discount_type, "prices": prices(total), "available": available}
+        for hotel, discount_type, total, available in rows
+    ])
+
+
+def summarized_search(db_client):
+    alpha, bravo, charlie = (make_hotel(db_client, name) for name in ("Alpha", "Bravo", "Charlie"))
+    search = make_search(db_client, status="processing")
+    add_results(db_client, search.id, [
+        (alpha, "none", 200.0, True),
+        (alpha, "aarp", 190.0, True),
+        (alpha, "aarp", 180.0, True),
+        (alpha, "aaa", 210.0, True),
+        # Bravo's public rate is sold out, Charlie has none at all
+        (bravo, "none", 150.0, False),
+        (bravo, "aarp", 160.0, True),
+        (charlie, "senior", 120.0, True),
+    ])
+    return search
+
+
+def test_summary_pairs_discounts_with_available_public_rates(db_client):
+    search = summarized_search(db_client)
+    summary = db_client.compute_search_summary(search.id)
+
+    assert summary["total_results"] == 7
+    assert summary["hotels_compared"] == 3
+    assert summary["by_hotel"] == {
+        "Alpha": [{"discount_type": "aaa", "total_price": 210.0, "available": True},
+                  {"discount_type": "aarp", "total_price": 180.0, "available": True},
+                  {"discount_type": "none", "total_price": 200.0, "available": True}],
+        "Bravo": [{"discount_type": "aarp", "total_price": 160.0, "available": True},
+                  {"discount_type": "none", "total_price": None, "available": False}],
+        "Charlie": [{"discount_type": "senior", "total_price": 120.0, "available": True}],
+    }
+    assert summary["best_by_hotel"] == {
+        "Alpha": {"discount_type": "aarp", "price": 180.0},
+        "Bravo": {"discount_type": "aarp", "price": 160.0},
+        "Charlie": {"discount_type": "senior", "price": 120.0},
+    }
+    assert summary["best_deal"] == {"hotel": "Charlie", "discount_type": "senior", "price": 120.0}
+    # Only Alpha has an available public rate to compare against
+    assert summary["savings_by_discount"] == {
+        "aaa": {"hotels_compared": 1, "hotels_cheaper": 0, "avg_savings": -10.0, "max_savings": -10.0,
+                "avg_savings_pct": -5.0},
+        "aarp": {"hotels_compared": 1, "hotels_cheaper": 1, "avg_savings": 20.0, "max_savings": 20.0,
+                 "avg_savings_pct": 10.0},
+    }
+
+
+def test_completed_search_summary_is_one_stored_lookup(client, db_client):
+    search = summarized_search(db_client)
+    db_client.update_search_status(search.id, "completed")
+    expected = db_client.compute_search_summary(search.id)
+
+    # A late row doesn't change the summary stored on completion
+    add_results(db_client, search.id, [(make_hotel(db_client, "Delta"), "none", 90.0, True)])
+
+    with count_statements(async_engine.sync_engine) as statements:
+        response = client.get(f"/api/results/{search.id}/summary")
+    assert response.status_code == 200
+    assert response.json() == {"status": "completed", **expected}
+    assert len(statements) == 1
@@ -0,0 +1,90 @@
+"""Concurrent searches and readers on the storage profile: no errors, no lost or duplicated results"""
+import asyncio
+import threading
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+
+from scrapers.fake_site import FakeSiteFetcher
+from scrapers.orchestrator import FAKE_SITE_CHAINS, ScrapeOrchestrator
+from scrapers.rate_control import RateControl
+from shared.database import SessionLocal, DatabaseClient
+from shared.models import Result
+
+from .factories import make_hotel
+
+SEARCHES = 12
+HOTELS_PER_CHAIN = 20
+DISCOUNT_TYPES = ["aarp", "aaa", "senior"]
+READERS = 4
+
+
+def scrape(search_id: str, errors: list):
+    fetchers = {chain: FakeSiteFetcher(latency_ms=2, unavailable_rate=0.1, seed=1) for chain in FAKE_SITE_CHAINS}
+    try:
+        report = asyncio.run(ScrapeOrchestrator(
+            fetchers, rate_control=RateControl(enabled=False), max_concurrency=20, batch_size=7
+        ).run(search_id))
+        if report.status != "completed":
+            errors.append(f"search {search_id} ended {report.status}")
+    except Exception as e:
+        errors.append(e)
+
+
+def read(search_ids: list, done: threading.Event, errors: list, reads: list):
+    db = SessionLocal()
+    try:
+        db_client = DatabaseClient(db)
+        while not done.is_set():
+            for search_id in search_ids:
+                rows = db_client.get_result_rows(search_id, sort="price", limit=50)
+                db_client.get_search_state(search_id)
+                db.rollback()
+                reads.append(len(rows))
+    except Exception as e:
+        errors.append(e)
+    finally:
+        db.close()
+
+
+@pytest.mark.slow
+def test_concurrent_searches_write_every_result_once(db_client):
+    for chain in FAKE_SITE_CHAINS:
+        for i in range(HOTELS_PER_CHAIN):
+            make_hotel(db_client, f"{chain} Stress {i}", chain=chain, city="Stress", state="XX")
+        for discount_type in DISCOUNT_TYPES:
+            db_client.create_discount_code(code=discount_type.upper(), type=discount_type, hotel_chain=chain)
+    search_ids = [
+        db_client.create_search("anonymous", "Stress, XX", f"2026-04-{day:02d}", f"2026-04-{day + 1:02d}", 2,
+                                {"discount_types": DISCOUNT_TYPES}).id
+        for day in range(1, SEARCHES + 1)
+    ]
+
+    errors, reads, done = [], [], threading.Event()
+    readers = [threading.Thread(target=read, args=(search_ids, done, errors, reads)) for _ in range(READERS)]
+    writers = [threading.Thread(target=scrape, args=(search_id, errors)) for search_id in search_ids]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join(timeout=120)
+    done.set()
+    for thread in readers:
+        thread.join(timeout=30)
+
+    assert errors == []
+    assert reads
+
+    expected = len(FAKE_SITE_CHAINS) * HOTELS_PER_CHAIN * (len(DISCOUNT_TYPES) + 1)
+    with SessionLocal() as db:
+        keys = Counter(db.execute(
+            select(Result.search_id, Result.hotel_id, Result.discount_type)
+        ).all())
+        per_search = dict(db.execute(
+            select(Result.search_id, func.count()).group_by(Result.search_id)
+        ).all())
+        for search_id in search_ids:
+            assert DatabaseClient(db).get_search(search_id).status == "completed"
+
+    assert [key for key, count in keys.items() if count > 1] == []
+    assert per_search == {search_id: expected for search_id in search_ids}
@@ -47,6 +47,7 @@ export interface ResultsResponse {
   guests: number;
   result_count: number;
   results: ResultItem[];
+  next_cursor?: string | null;
 }
 
 export const searchApi = {
@@ -62,6 +63,25 @@ export const searchApi = {
     return response.data;
   },
 
+  // Stream results as they are scraped (Server-Sent Events).
+  // The browser reconnects automatically and resumes from the last event.
+  // Returns a function that closes the stream.
+  streamResults: (
+    searchId: string,
+    onResult: (result: ResultItem) => void,
+    onDone?: (status: string) => void,
+  ): (() => void) => {
+    const source = new EventSource(`${API_BASE_URL}/api/results/${searchId}/stream`);
+    source.addEventListener('result', (event) => {
+      onResult(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('status', (event) => {
+      source.close();
+      onDone?.(JSON.parse((event as MessageEvent).data).status);
+    });
+    return () => source.close();
+  },
+
   // Get results summary
   getResultsSummary: async (searchId: string) => {
     const response = await api.get(`/api/results/${searchId}/summary`);